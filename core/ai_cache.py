@@ -0,0 +1,161 @@
+"""
+AI response cache
+=================
+Content-addressed cache for deterministic AI generations.  Catalog
+roadmaps give thousands of users the same module labels and lesson
+titles, so the same prompt is sent to the LLM again and again; this
+stores the parsed result once and serves every later request from the
+Django cache (Redis in production).
+
+Keys
+----
+``ai_cache:<kind>:v<version>:<sha256>`` where the hash covers the
+normalised inputs (whitespace collapsed, case-folded) and the model
+family (the free-model cascade).  Bump a kind's ``version`` in
+``POLICIES`` whenever its prompt template changes; old entries simply
+stop being read and expire.
+
+Only successful, parsed model output is stored — never the hard-coded
+fallbacks, which would otherwise pin a failure for the whole TTL.
+
+Bounds
+------
+Every entry carries its kind's TTL; beyond that, memory is bounded by the
+cache itself (Redis with ``maxmemory-policy allkeys-lru`` in production),
+so writes never touch shared bookkeeping.  Hit/miss counters per kind
+feed the operator endpoint via ``stats()``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from .openrouter_client import FREE_MODEL_CASCADE
+
+CACHE_PREFIX = "ai_cache"
+DAY = 24 * 3600
+
+ENABLED = os.getenv("AI_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+
+# Responses depend on which models answer; changing the cascade starts fresh.
+MODEL_FAMILY = "openrouter-free:" + ",".join(FREE_MODEL_CASCADE)
+
+# kind -> prompt template version and TTL
+POLICIES = {
+    "quiz": {"version": 1, "ttl": 7 * DAY},
+    "lesson_quiz": {"version": 1, "ttl": 7 * DAY},
+    "course_name": {"version": 1, "ttl": 30 * DAY},
+    "lesson_plan": {"version": 1, "ttl": 7 * DAY},
+    "jada_suggestion": {"version": 1, "ttl": 7 * DAY},
+}
+
+
+def _normalise(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {k: _normalise(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_normalise(v) for v in value]
+    return value
+
+
+def make_key(kind: str, inputs: dict) -> str:
+    """Cache key for *inputs* under *kind*'s current template version."""
+    policy = POLICIES[kind]
+    material = json.dumps(
+        {"inputs": _normalise(inputs), "family": MODEL_FAMILY},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    digest = hashlib.sha256(material.encode("utf-8")).hexdigest()
+    return f"{CACHE_PREFIX}:{kind}:v{policy['version']}:{digest}"
+
+
+def _count(kind: str, outcome: str, n: int = 1) -> None:
+    if n <= 0:
+        return
+    key = f"{CACHE_PREFIX}:stats:{kind}:{outcome}"
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key, n)
+    except ValueError:
+        # Evicted between add() and incr(); start over.
+        cache.set(key, n, None)
+
+
+def get(kind: str, inputs: dict) -> Any | None:
+    """Cached result for *inputs*, or None.  Counts a hit or a miss."""
+    if not ENABLED:
+        return None
+    value = cache.get(make_key(kind, inputs))
+    _count(kind, "hit" if value is not None else "miss")
+    return value
+
+
+def get_many(kind: str, inputs_list: list, count: bool = True) -> list:
+    """
+    ``get`` for several inputs in one cache round trip; None where missing.
+    ``count=False`` checks what is cached without counting hits or misses.
+    """
+    if not ENABLED:
+        return [None] * len(inputs_list)
+    keys = [make_key(kind, inputs) for inputs in inputs_list]
+    found = cache.get_many(keys)
+    values = [found.get(key) for key in keys]
+    if count:
+        hits = sum(v is not None for v in values)
+        _count(kind, "hit", hits)
+        _count(kind, "miss", len(values) - hits)
+    return values
+
+
+def put(kind: str, inputs: dict, value: Any) -> None:
+    """Store a successful generation for its kind's TTL."""
+    put_many(kind, [(inputs, value)])
+
+
+def put_many(kind: str, items: list) -> None:
+    """Store several ``(inputs, value)`` generations in one cache round trip."""
+    if not ENABLED:
+        return
+    entries = {make_key(kind, inputs): value for inputs, value in items if value is not None}
+    if entries:
+        cache.set_many(entries, POLICIES[kind]["ttl"])
+
+
+def stats() -> dict:
+    """Per-kind hits, misses and hit rate."""
+    out = {}
+    for kind in POLICIES:
+        counts = cache.get_many([
+            f"{CACHE_PREFIX}:stats:{kind}:hit",
+            f"{CACHE_PREFIX}:stats:{kind}:miss",
+        ])
+        hits = counts.get(f"{CACHE_PREFIX}:stats:{kind}:hit", 0)
+        misses = counts.get(f"{CACHE_PREFIX}:stats:{kind}:miss", 0)
+        out[kind] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+        }
+    return out
+
+
+# Async views (asgi.py) read through the same cache without blocking the loop.
+aget = sync_to_async(get, thread_sensitive=False)
+aput = sync_to_async(put, thread_sensitive=False)
+aget_many = sync_to_async(get_many, thread_sensitive=False)
+aput_many = sync_to_async(put_many, thread_sensitive=False)
+
+# (sync, async) pairs for ``ai_flow`` steps.
+GET = (get, aget)
+GET_MANY = (get_many, aget_many)
+PUT = (put, aput)
+PUT_MANY = (put_many, aput_many)
@@ -0,0 +1,79 @@
+"""
+Shared sync/async AI flows
+==========================
+Every generator (quizzes, lesson plans, roadmaps, cascades) is served to
+both the sync views and the async ones behind ``asgi.py``.  The flow —
+cache lookup, single-flight, cascade, fallback, parsing — is written once
+as a generator that yields each blocking step instead of calling it:
+
+    raw, _ = yield ai_flow.call(CASCADE, messages=..., timeout=60)
+
+where ``CASCADE`` is a ``(sync_fn, async_fn)`` pair.  ``run`` drives a
+flow with the sync halves, ``arun`` awaits the async halves; a step's
+return value is sent back into the flow and its exception is raised at
+the ``yield``, so ordinary ``try``/``except`` works inside a flow (a
+cancelled task's ``CancelledError`` too, so a flow can record it before
+it propagates).
+
+* ``call``         — a step on a transport pair.
+* ``single_flight`` — run a nested flow under ``single_flight``'s lock.
+* ``run`` / ``arun`` — execute a flow; the flow's ``return`` value is theirs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Callable, Generator, Tuple
+
+from . import single_flight as _single_flight
+
+Flow = Generator[tuple, Any, Any]
+
+SLEEP = (time.sleep, asyncio.sleep)
+
+
+def call(pair: Tuple[Callable, Callable], *args, **kwargs) -> tuple:
+    """A step running ``pair[0]`` (sync) or awaiting ``pair[1]`` (async) with these arguments."""
+    return pair, args, kwargs
+
+
+def _sync_single_flight(key: str, make_flow: Callable[[], Flow]) -> Any:
+    return _single_flight.run(key, lambda: run(make_flow()))
+
+
+async def _async_single_flight(key: str, make_flow: Callable[[], Flow]) -> Any:
+    return await _single_flight.arun(key, lambda: arun(make_flow()))
+
+
+def single_flight(key: str, make_flow: Callable[[], Flow]) -> tuple:
+    """A step running ``make_flow()`` once per *key* across processes (see ``single_flight``)."""
+    return call((_sync_single_flight, _async_single_flight), key, make_flow)
+
+
+def run(flow: Flow) -> Any:
+    """Drive *flow* with the blocking half of every step."""
+    value, error = None, None
+    while True:
+        try:
+            (pair, args, kwargs) = flow.throw(error) if error is not None else flow.send(value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            value, error = pair[0](*args, **kwargs), None
+        except BaseException as e:
+            value, error = None, e
+
+
+async def arun(flow: Flow) -> Any:
+    """Drive *flow* on the event loop, awaiting the async half of every step."""
+    value, error = None, None
+    while True:
+        try:
+            (pair, args, kwargs) = flow.throw(error) if error is not None else flow.send(value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            value, error = await pair[1](*args, **kwargs), None
+        except BaseException as e:
+            value, error = None, e
@@ -0,0 +1,381 @@
+"""
+AI concurrency governor
+=======================
+Bounds how hard the whole fleet — every web worker and Celery process,
+through the shared Django cache — leans on each LLM provider.  Before a
+request goes out the caller takes a lease (``slot`` / ``aslot``):
+
+* a concurrency slot for the provider and one for the model
+  (``AI_CONCURRENCY`` / ``AI_MODEL_CONCURRENCY``).  The semaphore is a set
+  of ``cache.add`` slot keys that expire on their own if the holder dies.
+* one request from the provider's per-minute quota
+  (``AI_RATE_PER_MINUTE``), counted in fixed windows with ``cache.incr``.
+* no active cooldown: a 429 puts the model on cooldown for its
+  ``Retry-After`` so every worker backs off together, instead of each one
+  sleeping and retrying into the same limit.
+
+Priority classes
+----------------
+``interactive`` (JADA chat) may use every slot and the whole quota.
+``standard`` (the default: quiz, lesson and roadmap requests) is held to
+``STANDARD_SHARE`` of them, and ``background`` (prefetch, plan refresh,
+summaries, the question bank) to ``AI_BACKGROUND_SHARE``; the rest stays
+free for the classes above.  A caller that can't get in waits in line —
+polling, interactive most eagerly — until its class's queue deadline
+(``AI_QUEUE_WAIT``), the caller's own *deadline* or the request's
+(``deadlines``), whichever comes first.  Then ``Saturated`` is
+raised, so a cascade moves on to its next model instead of piling up.
+
+``prioritized`` / ``set_priority`` set the class for everything called
+underneath (a context variable, like ``ai_ledger.tagged``).  With the
+LocMem cache (no Redis) the limits apply per process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from functools import wraps
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+
+from . import deadlines
+
+CACHE_PREFIX = "ai_gov"
+
+PRIORITIES = ("interactive", "standard", "background")
+DEFAULT_PRIORITY = "standard"
+
+
+def _env_map(name: str, default: str) -> Dict[str, float]:
+    """``"openrouter=16,gemini=4"`` → ``{"openrouter": 16.0, "gemini": 4.0}``."""
+    out = {}
+    for part in os.getenv(name, default).split(","):
+        key, sep, value = part.partition("=")
+        if sep:
+            try:
+                out[key.strip()] = float(value)
+            except ValueError:
+                pass
+    return out
+
+
+ENABLED = os.getenv("AI_GOVERNOR_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+CONCURRENCY = _env_map("AI_CONCURRENCY", "openrouter=16,gemini=4")        # per provider; 0 = unbounded
+MODEL_CONCURRENCY = int(os.getenv("AI_MODEL_CONCURRENCY", "8"))            # per model; 0 = unbounded
+RATE_PER_MINUTE = _env_map("AI_RATE_PER_MINUTE", "openrouter=20,gemini=15")  # free-tier limits; 0 = unbounded
+QUEUE_WAIT = _env_map("AI_QUEUE_WAIT", "interactive=10,standard=20,background=120")
+BACKGROUND_SHARE = float(os.getenv("AI_BACKGROUND_SHARE", "0.5"))
+STANDARD_SHARE = 0.8
+
+POLL_INTERVAL = {"interactive": 0.05, "standard": 0.1, "background": 0.5}
+DEFAULT_COOLDOWN = 10.0         # 429 without a usable Retry-After
+MAX_COOLDOWN = 120.0
+HOLD_MARGIN = 30                # slot TTL beyond the caller's request timeout
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("ai_priority", default=DEFAULT_PRIORITY)
+
+
+class Saturated(RuntimeError):
+    """No slot/quota within the queue deadline, or the model is cooling down after a 429."""
+
+
+# ── Priority classes ──────────────────────────────────────────────
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def set_priority(priority: str) -> None:
+    """Set the class for the rest of the current task/request (for generators)."""
+    _priority.set(priority if priority in PRIORITIES else DEFAULT_PRIORITY)
+
+
+def prioritized(priority: str):
+    """Decorator: model calls made inside the function run in class *priority*."""
+    def decorator(fn):
+        if iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                token = _priority.set(priority)
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    _priority.reset(token)
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            token = _priority.set(priority)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _priority.reset(token)
+        return wrapper
+    return decorator
+
+
+def _allowance(limit: int, priority: str) -> int:
+    """Share of *limit* a class may use; interactive gets all of it."""
+    if priority == "interactive":
+        return limit
+    share = BACKGROUND_SHARE if priority == "background" else STANDARD_SHARE
+    return max(1, math.ceil(limit * share))
+
+
+# ── Keys ──────────────────────────────────────────────────────────
+
+def _slot_keys(scope: str, limit: int) -> List[str]:
+    return [f"{CACHE_PREFIX}:slot:{scope}:{i}" for i in range(limit)]
+
+
+def _cooldown_key(provider: str, model: str) -> str:
+    return f"{CACHE_PREFIX}:cooldown:{provider}:{model}"
+
+
+def _rate_key(provider: str, window: int) -> str:
+    return f"{CACHE_PREFIX}:rate:{provider}:{window}"
+
+
+# ── Leases ────────────────────────────────────────────────────────
+
+class Lease:
+    """Held slot keys; ``release`` frees them (idempotent)."""
+
+    def __init__(self, held: Optional[List[Tuple[str, str]]] = None):
+        self.held = held or []
+
+    def release(self) -> None:
+        held, self.held = self.held, []
+        for key, token in held:
+            # Only delete our own claim: a slot whose TTL lapsed may be someone else's now.
+            if cache.get(key) == token:
+                cache.delete(key)
+
+
+def _take_slot(scope: str, limit: int, priority: str, hold: int) -> Optional[Tuple[str, str]]:
+    """Claim a free slot of *scope*; interactive callers try the reserved top slots first."""
+    if limit <= 0:
+        return None
+    keys = _slot_keys(scope, limit)[:_allowance(limit, priority)]
+    if priority == "interactive":
+        keys.reverse()
+    taken = cache.get_many(keys)
+    token = uuid.uuid4().hex
+    for key in keys:
+        if key not in taken and cache.add(key, token, hold):
+            return key, token
+    return None
+
+
+def _take_quota(provider: str, priority: str) -> Optional[float]:
+    """Count one request against this minute's quota; returns seconds to wait if over it."""
+    limit = int(RATE_PER_MINUTE.get(provider, 0))
+    if limit <= 0:
+        return None
+    now = time.time()
+    key = _rate_key(provider, int(now // 60))
+    cache.add(key, 0, 120)
+    try:
+        used = cache.incr(key)
+    except ValueError:          # window key evicted between add and incr
+        cache.add(key, 1, 120)
+        used = 1
+    if used <= _allowance(limit, priority):
+        return None
+    cache.decr(key)
+    return 60 - now % 60
+
+
+def _try_acquire(provider: str, model: str, priority: str, hold: int) -> Tuple[Optional[Lease], float]:
+    """One admission attempt: ``(lease, 0)`` or ``(None, seconds worth waiting)``."""
+    until = cache.get(_cooldown_key(provider, model))
+    if until and until > time.time():
+        return None, until - time.time()
+
+    poll = POLL_INTERVAL.get(priority, POLL_INTERVAL[DEFAULT_PRIORITY])
+    lease = Lease()
+    for scope, limit in ((provider, int(CONCURRENCY.get(provider, 0))), (f"{provider}:{model}", MODEL_CONCURRENCY)):
+        if limit <= 0:
+            continue
+        claim = _take_slot(scope, limit, priority, hold)
+        if claim is None:
+            lease.release()
+            return None, poll
+        lease.held.append(claim)
+
+    wait = _take_quota(provider, priority)
+    if wait is not None:
+        lease.release()
+        return None, wait
+    return lease, 0.0
+
+
+def _queue_deadline(priority: str, deadline: Optional[float]) -> float:
+    queue_wait = QUEUE_WAIT.get(priority, QUEUE_WAIT.get(DEFAULT_PRIORITY, 20))
+    limits = (time.monotonic() + queue_wait, deadline, deadlines.call_deadline())
+    return min(limit for limit in limits if limit is not None)
+
+
+def _jitter(seconds: float) -> float:
+    return seconds * random.uniform(0.75, 1.25)
+
+
+def acquire(
+    provider: str,
+    model: str,
+    *,
+    hold: float = 120,
+    deadline: Optional[float] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> Lease:
+    """
+    Wait in line for a lease on *model*.  *hold* is the longest the call can
+    take (the slot expires after it plus a margin); *deadline* is a
+    ``time.monotonic()`` instant the caller can't wait past.  Raises
+    ``Saturated`` once neither allows a wait, or when *cancel_event* is set.
+    """
+    if not ENABLED:
+        return Lease()
+    priority = current_priority()
+    give_up = _queue_deadline(priority, deadline)
+    ttl = int(hold) + HOLD_MARGIN
+    while True:
+        lease, wait = _try_acquire(provider, model, priority, ttl)
+        if lease is not None:
+            return lease
+        remaining = give_up - time.monotonic()
+        if wait > remaining:
+            raise Saturated(f"{provider}/{model} busy: no {priority} slot within {max(remaining, 0):.1f}s")
+        delay = _jitter(min(wait, remaining))
+        if cancel_event is not None:
+            if cancel_event.wait(delay):
+                raise Saturated(f"{provider}/{model}: cancelled while queued")
+        else:
+            time.sleep(delay)
+
+
+_atry_acquire = sync_to_async(_try_acquire, thread_sensitive=False)
+
+
+async def aacquire(provider: str, model: str, *, hold: float = 120, deadline: Optional[float] = None) -> Lease:
+    """Async ``acquire``; a cancelled task simply leaves the line."""
+    if not ENABLED:
+        return Lease()
+    priority = current_priority()
+    give_up = _queue_deadline(priority, deadline)
+    ttl = int(hold) + HOLD_MARGIN
+    while True:
+        lease, wait = await _atry_acquire(provider, model, priority, ttl)
+        if lease is not None:
+            return lease
+        remaining = give_up - time.monotonic()
+        if wait > remaining:
+            raise Saturated(f"{provider}/{model} busy: no {priority} slot within {max(remaining, 0):.1f}s")
+        await asyncio.sleep(_jitter(min(wait, remaining)))
+
+
+@contextmanager
+def slot(provider: str, model: str, **kwargs):
+    """``with slot("openrouter", model, hold=timeout): ...`` — see ``acquire``."""
+    lease = acquire(provider, model, **kwargs)
+    try:
+        yield lease
+    finally:
+        lease.release()
+
+
+@asynccontextmanager
+async def aslot(provider: str, model: str, **kwargs):
+    lease = await aacquire(provider, model, **kwargs)
+    try:
+        yield lease
+    finally:
+        await sync_to_async(lease.release, thread_sensitive=False)()
+
+
+# ── Rate-limit feedback ───────────────────────────────────────────
+
+def _retry_after(headers) -> float:
+    try:
+        seconds = float((headers or {}).get("Retry-After", ""))
+    except (TypeError, ValueError):
+        seconds = DEFAULT_COOLDOWN
+    return min(max(seconds, 1.0), MAX_COOLDOWN)
+
+
+def cool_down(provider: str, model: str, seconds: float = DEFAULT_COOLDOWN) -> None:
+    """Keep every worker off *model* for *seconds*."""
+    if not ENABLED:
+        return
+    print(f"[AI] {provider}/{model} rate limited; cooling down {seconds:.0f}s")
+    cache.set(_cooldown_key(provider, model), time.time() + seconds, math.ceil(seconds))
+
+
+def note_response(provider: str, model: str, response) -> bool:
+    """Start a cooldown if *response* (requests or httpx) is a 429; returns whether it was."""
+    if response is None or getattr(response, "status_code", None) != 429:
+        return False
+    cool_down(provider, model, _retry_after(getattr(response, "headers", None)))
+    return True
+
+
+def note_error(provider: str, model: str, error: BaseException) -> bool:
+    """``note_response`` for an HTTP error raised by ``raise_for_status``."""
+    return note_response(provider, model, getattr(error, "response", None))
+
+
+anote_response = sync_to_async(note_response, thread_sensitive=False)
+anote_error = sync_to_async(note_error, thread_sensitive=False)
+
+
+# ── Operator view ─────────────────────────────────────────────────
+
+def snapshot(models: Iterable[Tuple[str, str]]) -> dict:
+    """Slots in use, quota used this minute and cooldowns, for ``ai_model_health``."""
+    models = list(dict.fromkeys(models))
+    providers = list(dict.fromkeys(p for p, _ in models))
+    keys = []
+    for provider in providers:
+        keys += _slot_keys(provider, int(CONCURRENCY.get(provider, 0)))
+        keys.append(_rate_key(provider, int(time.time() // 60)))
+    for provider, model in models:
+        keys += _slot_keys(f"{provider}:{model}", MODEL_CONCURRENCY)
+        keys.append(_cooldown_key(provider, model))
+    found = cache.get_many(keys)
+
+    def in_use(scope, limit):
+        return sum(1 for key in _slot_keys(scope, limit) if key in found)
+
+    now = time.time()
+    return {
+        "enabled": ENABLED,
+        "providers": {
+            provider: {
+                "in_flight": in_use(provider, int(CONCURRENCY.get(provider, 0))),
+                "concurrency": int(CONCURRENCY.get(provider, 0)) or None,
+                "requests_this_minute": found.get(_rate_key(provider, int(now // 60)), 0),
+                "rate_per_minute": int(RATE_PER_MINUTE.get(provider, 0)) or None,
+            }
+            for provider in providers
+        },
+        "models": [
+            {
+                "provider": provider,
+                "model": model,
+                "in_flight": in_use(f"{provider}:{model}", MODEL_CONCURRENCY),
+                "cooldown_seconds": max(0, round((found.get(_cooldown_key(provider, model)) or 0) - now, 1)),
+            }
+            for provider, model in models
+        ],
+        "queue_wait": QUEUE_WAIT,
+    }
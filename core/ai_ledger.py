@@ -0,0 +1,250 @@
+"""
+AI call ledger
+==============
+Telemetry for every OpenRouter / Gemini call: provider, model, call site,
+prompt/completion tokens, latency, retries and outcome, stored as
+``AICallLog`` rows so cascades can be tuned from data.
+
+* ``record``      — called by the clients after each model call.  It only
+  appends to an in-process buffer; a daemon thread bulk-inserts the buffer
+  every ``AI_LEDGER_FLUSH_SECONDS`` or once ``FLUSH_SIZE`` entries pile up,
+  so the request path never waits on the database.
+* ``tagged`` / ``set_call_site`` — name the call site (``quiz``,
+  ``jada_chat`` ...) for everything called underneath.  A context variable,
+  so it follows asyncio tasks and ``sync_to_async``; thread pools must run
+  work in a copied context (see ``openrouter_client._race_cascade``).
+* ``summarize``   — per model × call site counts, success rate, p50/p95
+  latency and token totals for ``ai_call_report`` and the operator endpoint.
+* ``prune``       — delete rows older than ``AI_LEDGER_RETENTION_DAYS``
+  (``tasks.prune_ai_call_log``, daily, or ``python manage.py prune_ai_call_log``).
+
+The buffer is bounded (``MAX_BUFFER``); if the database is unreachable the
+oldest entries are dropped rather than growing memory.  Entries still
+buffered when a process is killed without running ``atexit`` are lost —
+acceptable for telemetry.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import os
+import threading
+from datetime import timedelta
+from functools import wraps
+from typing import Any, Dict, List, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .model_health import _percentile
+
+ENABLED = os.getenv("AI_LEDGER_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+FLUSH_SIZE = 50
+FLUSH_INTERVAL = float(os.getenv("AI_LEDGER_FLUSH_SECONDS", "5"))
+MAX_BUFFER = 5000
+ERROR_MAX_CHARS = 300
+RETENTION_DAYS = int(os.getenv("AI_LEDGER_RETENTION_DAYS", "30"))
+PRUNE_BATCH = 5000
+
+_call_site: contextvars.ContextVar[str] = contextvars.ContextVar("ai_call_site", default="unknown")
+
+_buffer: List[Dict[str, Any]] = []
+_lock = threading.Lock()
+_wake = threading.Event()
+_flusher: Optional[threading.Thread] = None
+
+
+# ── Call sites ────────────────────────────────────────────────────
+
+def current_call_site() -> str:
+    return _call_site.get()
+
+
+def set_call_site(site: str) -> None:
+    """Tag the rest of the current task/request (for generators, where ``tagged`` can't wrap)."""
+    _call_site.set(site)
+
+
+def tagged(site: str):
+    """Decorator: calls made inside the function are recorded under *site*."""
+    def decorator(fn):
+        if iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                token = _call_site.set(site)
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    _call_site.reset(token)
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            token = _call_site.set(site)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _call_site.reset(token)
+        return wrapper
+    return decorator
+
+
+# ── Recording ─────────────────────────────────────────────────────
+
+def openrouter_usage(data: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    usage = data.get("usage") or {}
+    return usage.get("prompt_tokens"), usage.get("completion_tokens")
+
+
+def gemini_usage(data: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    usage = data.get("usageMetadata") or {}
+    return usage.get("promptTokenCount"), usage.get("candidatesTokenCount")
+
+
+def record(
+    *,
+    provider: str,
+    model: str,
+    latency: float,
+    outcome: str,
+    retries: int = 0,
+    prompt_tokens: Optional[int] = None,
+    completion_tokens: Optional[int] = None,
+    streamed: bool = False,
+    error: str = "",
+) -> None:
+    """Buffer one call (*latency* in seconds); never blocks on the database."""
+    if not ENABLED:
+        return
+    entry = {
+        "provider": provider,
+        "model": model[:100],
+        "call_site": _call_site.get()[:50],
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "latency_ms": max(0, int(latency * 1000)),
+        "retries": retries,
+        "outcome": outcome,
+        "streamed": streamed,
+        "error": (error or "")[:ERROR_MAX_CHARS],
+        "created_at": timezone.now(),
+    }
+    with _lock:
+        _buffer.append(entry)
+        if len(_buffer) > MAX_BUFFER:
+            del _buffer[: len(_buffer) - MAX_BUFFER]
+        pending = len(_buffer)
+    _ensure_flusher()
+    if pending >= FLUSH_SIZE:
+        _wake.set()
+
+
+def flush() -> int:
+    """Write everything buffered in one bulk insert; returns the row count."""
+    global _buffer
+    with _lock:
+        batch, _buffer = _buffer, []
+    if not batch:
+        return 0
+
+    from .models import AICallLog
+
+    try:
+        AICallLog.objects.bulk_create([AICallLog(**entry) for entry in batch], batch_size=500)
+    except Exception as e:
+        print(f"[AI] Ledger flush failed ({len(batch)} entries kept): {e}")
+        with _lock:
+            _buffer[:0] = batch
+            if len(_buffer) > MAX_BUFFER:
+                del _buffer[: len(_buffer) - MAX_BUFFER]
+        return 0
+    finally:
+        close_old_connections()
+    return len(batch)
+
+
+def _run_flusher() -> None:
+    while True:
+        _wake.wait(FLUSH_INTERVAL)
+        _wake.clear()
+        flush()
+
+
+def _ensure_flusher() -> None:
+    # Started lazily so Celery prefork children each get their own thread.
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_run_flusher, name="ai-ledger-flush", daemon=True)
+            _flusher.start()
+
+
+atexit.register(flush)
+
+
+# ── Reporting ─────────────────────────────────────────────────────
+
+def summarize(hours: float = 24, by: Tuple[str, ...] = ("provider", "model", "call_site")) -> List[dict]:
+    """
+    Aggregate the last *hours* of calls grouped by *by*.  Latency percentiles
+    cover successful calls only, so failures and timeouts don't hide in them.
+    """
+    from .models import AICallLog
+
+    since = timezone.now() - timedelta(hours=hours)
+    rows = AICallLog.objects.filter(created_at__gte=since).values_list(
+        *by, "outcome", "latency_ms", "retries", "prompt_tokens", "completion_tokens",
+    )
+    groups: Dict[tuple, dict] = {}
+    for row in rows.iterator():
+        key = row[: len(by)]
+        outcome, latency_ms, retries, prompt_tokens, completion_tokens = row[len(by):]
+        g = groups.setdefault(key, {
+            "calls": 0, "ok": 0, "error": 0, "cancelled": 0, "retries": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "latencies": [],
+        })
+        g["calls"] += 1
+        g[outcome] = g.get(outcome, 0) + 1
+        g["retries"] += retries
+        g["prompt_tokens"] += prompt_tokens or 0
+        g["completion_tokens"] += completion_tokens or 0
+        if outcome == "ok":
+            g["latencies"].append(latency_ms)
+
+    out = []
+    for key, g in groups.items():
+        decided = g["ok"] + g["error"]
+        latencies = g.pop("latencies")
+        out.append({
+            **dict(zip(by, key)),
+            **g,
+            "success_rate": round(g["ok"] / decided, 3) if decided else None,
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "avg_retries": round(g["retries"] / g["calls"], 2),
+        })
+    out.sort(key=lambda r: (-r["calls"], *[str(r[k]) for k in by]))
+    return out
+
+
+# ── Retention ─────────────────────────────────────────────────────
+
+def prune(days: int = RETENTION_DAYS) -> int:
+    """Delete calls older than *days*; returns the rows deleted."""
+    from .models import AICallLog
+
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted = 0
+    # Small batches so a large backlog never holds one long delete.
+    while True:
+        ids = list(AICallLog.objects.filter(created_at__lt=cutoff).values_list("id", flat=True)[:PRUNE_BATCH])
+        if not ids:
+            break
+        deleted += AICallLog.objects.filter(id__in=ids).delete()[0]
+    if deleted:
+        print(f"[AI] Pruned {deleted} ledger rows older than {days} days")
+    return deleted
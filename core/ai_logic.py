@@ -1,31 +1,87 @@
 import os
-import json
+import httpx
 import requests
 import time
-from jsonschema import validate, ValidationError
 from dotenv import load_dotenv
 
-from .openrouter_client import chat_completions, chat_completions_cascade, OpenRouterError
+from .http_client import http_post, ahttp_post
+from .openrouter_client import OpenRouterError, HEDGE_DELAY_SECONDS
+from .openrouter_async import CASCADE
+from . import ai_cache, ai_flow, ai_governor, ai_ledger, deadlines, quiz_engine, structured_output
+from .structured_output import StructuredOutputError
 
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 # Use the latest available Gemini 2.5 Flash model
-GEMINI_URL = f"https://generativelanguage.googleapis.com/v1/models/gemini-2.5-flash:generateContent?key={GEMINI_API_KEY}"
+GEMINI_MODEL = "gemini-2.5-flash"
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com").rstrip("/")
+GEMINI_URL = f"{GEMINI_API_BASE}/v1/models/{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}"
 
 
-def _call_gemini_text(prompt: str, *, temperature: float, timeout=(10, 90)) -> str:
+def _record_gemini(started: float, *, result=None, error: str = "") -> None:
+    prompt_tokens, completion_tokens = ai_ledger.gemini_usage(result or {})
+    ai_ledger.record(
+        provider="gemini", model=GEMINI_MODEL, latency=time.monotonic() - started,
+        outcome="error" if error else "ok", error=error,
+        prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+    )
+
+
+def _read_timeout(timeout) -> float:
+    return timeout[1] if isinstance(timeout, tuple) else timeout
+
+
+def _gemini_request(prompt: str, temperature: float, timeout):
+    """``(payload, timeout)`` for a Gemini call; raises if there's no key or no time left."""
     payload = {
         "contents": [{"parts": [{"text": prompt}]}],
         "generationConfig": {"temperature": temperature},
     }
     if not GEMINI_API_KEY:
         raise RuntimeError("GEMINI_API_KEY is missing")
+    return payload, deadlines.timeout(timeout, "Gemini")
+
 
-    response = requests.post(GEMINI_URL, json=payload, timeout=timeout)
+def _gemini_text(response, started: float) -> str:
     response.raise_for_status()
     result = response.json()
-    return result['candidates'][0]['content']['parts'][0]['text']
+    text = result['candidates'][0]['content']['parts'][0]['text']
+    _record_gemini(started, result=result)
+    return text
+
+
+def _call_gemini_text(prompt: str, *, temperature: float, timeout=(10, 90)) -> str:
+    payload, timeout = _gemini_request(prompt, temperature, timeout)
+
+    started = time.monotonic()
+    try:
+        with ai_governor.slot("gemini", GEMINI_MODEL, hold=_read_timeout(timeout)):
+            response = http_post(GEMINI_URL, json=payload, timeout=timeout)
+        ai_governor.note_response("gemini", GEMINI_MODEL, response)
+        return _gemini_text(response, started)
+    except Exception as e:
+        _record_gemini(started, error=str(e))
+        raise
+
+
+async def _acall_gemini_text(prompt: str, *, temperature: float, timeout=(10, 90)) -> str:
+    """Async ``_call_gemini_text`` for views served through asgi.py."""
+    payload, timeout = _gemini_request(prompt, temperature, timeout)
+
+    started = time.monotonic()
+    try:
+        async with ai_governor.aslot("gemini", GEMINI_MODEL, hold=_read_timeout(timeout)):
+            response = await ahttp_post(GEMINI_URL, json=payload, timeout=timeout)
+        await ai_governor.anote_response("gemini", GEMINI_MODEL, response)
+        return _gemini_text(response, started)
+    except Exception as e:
+        _record_gemini(started, error=str(e))
+        raise
+
+
+GEMINI = (_call_gemini_text, _acall_gemini_text)
+_GEMINI_TIMEOUTS = (requests.exceptions.ReadTimeout, requests.exceptions.ConnectTimeout, httpx.TimeoutException)
 
 # JSON Schema for validating AI-generated roadmap modules
 MODULE_SCHEMA = {
@@ -62,28 +118,41 @@ ROADMAP_SCHEMA = {
     "minItems": 1
 }
 
-def generate_detailed_roadmap(niche, uni_course, budget, return_meta: bool = False):
-    """
-    Generates a highly specific, context-aware roadmap.
-    """
+QUIZ_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "question": {"type": "string", "minLength": 1},
+            "options": {"type": "array", "items": {"type": "string"}, "minItems": 2},
+            "correct": {"type": "integer", "minimum": 0},
+            "explanation": {"type": "string"}
+        },
+        "required": ["question", "options", "correct", "explanation"]
+    },
+    "minItems": 1
+}
 
-    def _return(modules, meta):
-        print(
-            f"[AI] roadmap_generation provider={meta.get('provider')} model={meta.get('model')} "
-            f"fallback_used={meta.get('fallback_used')}"
-        )
-        return (modules, meta) if return_meta else modules
-
-    def _fallback(reason: str):
-        modules = get_fallback_roadmap(niche, uni_course)
-        meta = {
-            "provider": "fallback",
-            "model": None,
-            "fallback_used": True,
-            "reason": reason,
-        }
-        return _return(modules, meta)
-    
+def _roadmap_return(modules, meta, return_meta):
+    print(
+        f"[AI] roadmap_generation provider={meta.get('provider')} model={meta.get('model')} "
+        f"fallback_used={meta.get('fallback_used')}"
+    )
+    return (modules, meta) if return_meta else modules
+
+
+def _roadmap_fallback(niche, uni_course, reason: str, return_meta):
+    modules = get_fallback_roadmap(niche, uni_course)
+    meta = {
+        "provider": "fallback",
+        "model": None,
+        "fallback_used": True,
+        "reason": reason,
+    }
+    return _roadmap_return(modules, meta, return_meta)
+
+
+def _build_roadmap_prompt(niche, uni_course, budget):
     uni_context = ""
     if uni_course and len(uni_course) > 2:
         uni_context = f"The user is currently studying '{uni_course}' in University. You MUST include at least 2 'Bridge Modules' that show how their degree applies to {niche}."
@@ -166,15 +235,81 @@ def generate_detailed_roadmap(niche, uni_course, budget, return_meta: bool = Fal
         }}
     ]
     """
+    return prompt
+
+
+_ROADMAP_FALLBACK_REASONS = {
+    "empty": "empty_ai_response",
+    "json": "json_parse_failed",
+    "schema": "schema_validation_failed",
+}
+
+
+def _parse_roadmap(text):
+    """Extract, normalise and validate roadmap modules; raises StructuredOutputError."""
+    modules = structured_output.extract_json(text, expect=list)
+    print(f"[AI] Parsed {len(modules)} modules from API")
+
+    # --- Normalise common LLM variations before schema validation ---
+    _MV_MAP = {
+        "low": "Low", "medium": "Med", "med": "Med", "high": "High",
+        "low-med": "Low-Med", "low-medium": "Low-Med",
+        "med-high": "Med-High", "medium-high": "Med-High",
+    }
+    _STATUS_MAP = {"lock": "locked", "active": "active", "complete": "completed", "completed": "completed", "locked": "locked"}
+    try:
+        for mod in modules:
+            mv = (mod.get("market_value") or "Med").strip()
+            mod["market_value"] = _MV_MAP.get(mv.lower(), "Med")
+            st = (mod.get("status") or "locked").strip()
+            mod["status"] = _STATUS_MAP.get(st.lower(), "locked")
+            # Clamp numeric ranges for lessons
+            for lesson in mod.get("lessons") or []:
+                lesson["phase"] = max(1, min(3, int(lesson.get("phase", 1))))
+                lesson["order"] = max(1, min(20, int(lesson.get("order", 1))))
+                lesson["estimated_minutes"] = max(10, min(90, int(lesson.get("estimated_minutes", 30))))
+    except (AttributeError, TypeError, ValueError) as e:
+        raise StructuredOutputError(f"malformed module: {e}", kind="schema")
+
+    structured_output.check(modules, ROADMAP_SCHEMA)
+    print(f"[AI] Schema validation passed")
+    return modules
+
+
+def _finish_roadmap(text, meta, niche, uni_course, return_meta):
+    """Parse, normalise and validate raw roadmap text from any provider."""
+    if text:
+        print(f"[AI] Raw response length: {len(text)}")
+        print(f"[AI] Raw response first 300 chars: {repr(text[:300])}")
+    try:
+        modules_list = _parse_roadmap(text)
+    except StructuredOutputError as e:
+        print(f"[AI] Roadmap output rejected ({e.kind}): {e}; using fallback")
+        return _roadmap_fallback(niche, uni_course, _ROADMAP_FALLBACK_REASONS[e.kind], return_meta)
+
+    # Optimization: Skip separate YouTube API calls to reduce generation time.
+    # We rely on Gemini to provide the video links in the 'resources' field.
+
+    modules_out = layout_engine(modules_list)
+    meta = meta or {"provider": "unknown", "model": None, "fallback_used": False}
+    return _roadmap_return(modules_out, meta, return_meta)
+
+
+def _roadmap_flow(niche, uni_course, budget, return_meta):
+    """Roadmap generation as an ``ai_flow`` flow, shared by the sync and async entry points."""
+    prompt = _build_roadmap_prompt(niche, uni_course, budget)
 
     try:
         text = None
         meta = None
 
         try:
-            # Primary: free model cascade (Gemma 3 27B → DeepSeek R1)
-            text, model_used = chat_completions_cascade(
+            # Primary: free model cascade, streamed so an invalid answer moves
+            # on to the next model at the first bad token
+            modules, model_used = yield ai_flow.call(
+                structured_output.STREAM_CASCADE,
                 messages=[{"role": "user", "content": prompt}],
+                parse_fn=_parse_roadmap,
                 temperature=0.7,
                 max_tokens=8192,
                 timeout=120,
@@ -184,13 +319,14 @@ def generate_detailed_roadmap(niche, uni_course, budget, return_meta: bool = Fal
                 "model": model_used,
                 "fallback_used": False,
             }
+            return _roadmap_return(layout_engine(modules), meta, return_meta)
         except OpenRouterError as e:
             print(f"[AI] OpenRouter failed, falling back to Gemini: {e}")
             # Fallback: Gemini
             last_error = None
             for attempt in range(2):
                 try:
-                    text = _call_gemini_text(prompt, temperature=0.7, timeout=(10, 90))
+                    text = yield ai_flow.call(GEMINI, prompt, temperature=0.7, timeout=(10, 90))
                     meta = {
                         "provider": "gemini",
                         "model": "gemini-2.5-flash",
@@ -199,99 +335,50 @@ def generate_detailed_roadmap(niche, uni_course, budget, return_meta: bool = Fal
                     }
                     last_error = None
                     break
-                except (requests.exceptions.ReadTimeout, requests.exceptions.ConnectTimeout) as ex:
+                except _GEMINI_TIMEOUTS as ex:
                     last_error = ex
                     backoff = 1.5 ** attempt
+                    if not deadlines.allows(backoff):
+                        break
                     print(f"[AI] Timeout calling Gemini (attempt {attempt + 1}/2). Retrying in {backoff:.1f}s...")
-                    time.sleep(backoff)
+                    yield ai_flow.call(ai_flow.SLEEP, backoff)
             if last_error is not None:
                 raise last_error
 
-        if not text:
-            return _fallback("empty_ai_response")
-
-        print(f"[AI] Raw response length: {len(text)}")
-        print(f"[AI] Raw response first 300 chars: {repr(text[:300])}")
-
-        clean_text = safe_parse_json(text)
-        
-        if clean_text is None:
-            print(f"[AI] Failed to parse JSON; using fallback")
-            print(f"[AI] Full raw text for debug: {repr(text[:1000])}")
-            return _fallback("json_parse_failed")
-        
-        print(f"[AI] Parsed {len(clean_text)} modules from API")
-
-        # --- Normalise common LLM variations before schema validation ---
-        _MV_MAP = {
-            "low": "Low", "medium": "Med", "med": "Med", "high": "High",
-            "low-med": "Low-Med", "low-medium": "Low-Med",
-            "med-high": "Med-High", "medium-high": "Med-High",
-        }
-        _STATUS_MAP = {"lock": "locked", "active": "active", "complete": "completed", "completed": "completed", "locked": "locked"}
-        for mod in clean_text:
-            mv = (mod.get("market_value") or "Med").strip()
-            mod["market_value"] = _MV_MAP.get(mv.lower(), "Med")
-            st = (mod.get("status") or "locked").strip()
-            mod["status"] = _STATUS_MAP.get(st.lower(), "locked")
-            # Clamp numeric ranges for lessons
-            for lesson in mod.get("lessons") or []:
-                lesson["phase"] = max(1, min(3, int(lesson.get("phase", 1))))
-                lesson["order"] = max(1, min(20, int(lesson.get("order", 1))))
-                lesson["estimated_minutes"] = max(10, min(90, int(lesson.get("estimated_minutes", 30))))
-
-        # Validate against schema
-        try:
-            validate(instance=clean_text, schema=ROADMAP_SCHEMA)
-            print(f"[AI] Schema validation passed")
-        except ValidationError as e:
-            print(f"[AI] Schema validation failed: {e}")
-            return _fallback("schema_validation_failed")
-        
-        modules_list = clean_text
-        
-        # Optimization: Skip separate YouTube API calls to reduce generation time.
-        # We rely on Gemini to provide the video links in the 'resources' field.
-        
-        modules_out = layout_engine(modules_list)
-        meta = meta or {"provider": "unknown", "model": None, "fallback_used": False}
-        return _return(modules_out, meta)
+        return _finish_roadmap(text, meta, niche, uni_course, return_meta)
 
+    except deadlines.DeadlineExceeded as e:
+        print(f"[AI] Roadmap out of time, using fallback: {e}")
+        return _roadmap_fallback(niche, uni_course, "deadline", return_meta)
     except Exception as e:
         print(f"[AI] AI Logic Failed: {type(e).__name__}: {e}")
         import traceback
         traceback.print_exc()
-        return _fallback("exception")
+        return _roadmap_fallback(niche, uni_course, "exception", return_meta)
+
+
+@ai_ledger.tagged("roadmap")
+def generate_detailed_roadmap(niche, uni_course, budget, return_meta: bool = False):
+    """
+    Generates a highly specific, context-aware roadmap.
+    """
+    return ai_flow.run(_roadmap_flow(niche, uni_course, budget, return_meta))
+
+
+@ai_ledger.tagged("roadmap")
+async def agenerate_detailed_roadmap(niche, uni_course, budget, return_meta: bool = False):
+    """Async ``generate_detailed_roadmap``."""
+    return await ai_flow.arun(_roadmap_flow(niche, uni_course, budget, return_meta))
+
 
 def safe_parse_json(text):
     """
-    Safely parse JSON from AI output with error handling.
+    Safely parse a JSON array from AI output; None if there isn't one.
     """
     try:
-        # Find the first '[' and last ']'
-        start_idx = text.find('[')
-        end_idx = text.rfind(']')
-        
-        if start_idx == -1 or end_idx == -1:
-            print("[AI] Error: No JSON array found in response")
-            return None
-            
-        clean_text = text[start_idx:end_idx+1]
-        
-        # Parse and validate JSON
-        data = json.loads(clean_text)
-        
-        # Ensure it's a list
-        if not isinstance(data, list):
-            print("JSON is not a list")
-            return None
-        
-        return data
-    except json.JSONDecodeError as e:
-        print(f"JSON decode error: {e}")
-        return None
-    except Exception as e:
-        print(f"Unexpected error during JSON parsing: {e}")
+        return structured_output.extract_json(text, expect=list)
+    except StructuredOutputError as e:
+        print(f"[AI] JSON parse error: {e}")
         return None
 
 def layout_engine(modules_list):
@@ -394,14 +481,7 @@ def get_fallback_roadmap(niche, uni_course):
         item['resources']['is_fallback'] = True
     return roadmap_data
 
-def normalize_university_course(raw_course):
-    """
-    Uses AI to normalize raw university course input (e.g. "Bsc Accounting" -> "Accounting").
-    Returns a clean, standard version of the course name.
-    """
-    if not raw_course or len(raw_course.strip()) < 2:
-        return ""
-    
+def _course_name_flow(raw_course):
     prompt = f"""
     Normalize this university course name into a standard, clean format.
     Input: "{raw_course}"
@@ -413,30 +493,50 @@ def normalize_university_course(raw_course):
     
     Return just the clean name, no quotes or extra text:
     """
-    
-    try:
-        try:
-            text, _ = chat_completions_cascade(
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=64,
-                timeout=30,
-            )
-            text = text.strip()
-        except OpenRouterError as e:
-            print(f"Course normalization OpenRouter failed, falling back to Gemini: {e}")
-            text = _call_gemini_text(prompt, temperature=0.3, timeout=10).strip()
 
-        cleaned = text.strip('"\'').strip()
-        return cleaned if cleaned else raw_course
-    except Exception as e:
-        print(f"Course normalization error: {e}")
-        return raw_course
+    cache_inputs = {"course": raw_course}
+    cached = yield ai_flow.call(ai_cache.GET, "course_name", cache_inputs)
+    if cached is not None:
+        return cached
 
-def generate_quiz(module_label, description):
+    def _generate():
+        try:
+            try:
+                text, _ = yield ai_flow.call(
+                    CASCADE,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.3,
+                    max_tokens=64,
+                    timeout=30,
+                )
+                text = text.strip()
+            except OpenRouterError as e:
+                print(f"Course normalization OpenRouter failed, falling back to Gemini: {e}")
+                text = (yield ai_flow.call(GEMINI, prompt, temperature=0.3, timeout=10)).strip()
+
+            cleaned = text.strip('"\'').strip()
+            if cleaned:
+                yield ai_flow.call(ai_cache.PUT, "course_name", cache_inputs, cleaned)
+            return cleaned if cleaned else raw_course
+        except Exception as e:
+            print(f"Course normalization error: {e}")
+            return raw_course
+
+    return (yield ai_flow.single_flight(ai_cache.make_key("course_name", cache_inputs), _generate))
+
+
+@ai_ledger.tagged("course_name")
+def normalize_university_course(raw_course):
     """
-    Generate a 5-question multiple choice quiz using Gemini AI.
+    Uses AI to normalize raw university course input (e.g. "Bsc Accounting" -> "Accounting").
+    Returns a clean, standard version of the course name.
     """
+    if not raw_course or len(raw_course.strip()) < 2:
+        return ""
+    return ai_flow.run(_course_name_flow(raw_course))
+
+
+def _quiz_prompt(module_label, description):
     prompt = f"""
     Create a 5-question multiple choice quiz for this programming module:
     
@@ -460,51 +560,65 @@ def generate_quiz(module_label, description):
       }}
     ]
     """
-    
-    try:
-        try:
-            raw_text, _ = chat_completions_cascade(
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.5,
-                max_tokens=1200,
-                timeout=60,
-            )
-        except OpenRouterError as e:
-            print(f"Quiz generation OpenRouter failed, falling back to Gemini: {e}")
-            raw_text = _call_gemini_text(prompt, temperature=0.5, timeout=(10, 60))
-        
-        raw_text = raw_text.strip()
-        if raw_text.startswith('```'):
-            raw_text = raw_text.split('\n', 1)[1]
-            raw_text = raw_text.rsplit('```', 1)[0]
-        raw_text = raw_text.strip()
-        
-        quiz_data = json.loads(raw_text)
-        return quiz_data
-        
-    except Exception as e:
-        print(f"Quiz Generation Error: {e}")
-        return [
-            {
-                "question": f"What is the main purpose of {module_label}?",
-                "options": [
-                    "To build applications",
-                    "To write documentation",
-                    "To design interfaces",
-                    "To manage databases"
-                ],
-                "correct": 0,
-                "explanation": f"{module_label} is primarily used for building applications."
-            }
-        ]
+    return prompt
+
+
+def _fallback_quiz(module_label, description=""):
+    # Rule-based quiz from catalog data so the user isn't blocked
+    return quiz_engine.module_quiz(module_label, description)
+
+
+def _quiz_flow(module_label, description, variant):
+    cache_inputs = {"module": module_label, "description": description, "variant": variant}
+    cached = yield ai_flow.call(ai_cache.GET, "quiz", cache_inputs)
+    if cached is not None:
+        return cached
 
+    def _generate():
+        prompt = _quiz_prompt(module_label, description)
 
-def generate_lesson_quiz(module_label: str, lesson_title: str, lesson_description: str = ""):
+        try:
+            try:
+                raw_text, _ = yield ai_flow.call(
+                    CASCADE,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.5,
+                    max_tokens=1200,
+                    timeout=60,
+                    hedge_delay=HEDGE_DELAY_SECONDS,
+                )
+            except OpenRouterError as e:
+                print(f"Quiz generation OpenRouter failed, falling back to Gemini: {e}")
+                raw_text = yield ai_flow.call(GEMINI, prompt, temperature=0.5, timeout=(10, 60))
+
+            quiz_data = structured_output.parse(raw_text, QUIZ_SCHEMA, expect=list)
+            yield ai_flow.call(ai_cache.PUT, "quiz", cache_inputs, quiz_data)
+            return quiz_data
+
+        except Exception as e:
+            print(f"Quiz Generation Error: {e}")
+            return _fallback_quiz(module_label, description)
+
+    return (yield ai_flow.single_flight(ai_cache.make_key("quiz", cache_inputs), _generate))
+
+
+@ai_ledger.tagged("quiz")
+def generate_quiz(module_label, description, variant: int = 0):
     """
-    Generate a 5-question MCQ quiz scoped to a single lesson.
-    Used as a gate before a lesson can be marked complete.
-    Cascade → Gemini fallback, same pattern as generate_quiz().
+    Generate a 5-question multiple choice quiz using Gemini AI.
+    Results are shared through ai_cache; pass a different *variant* to get
+    a different (but still shared) set of questions.
     """
+    return ai_flow.run(_quiz_flow(module_label, description, variant))
+
+
+@ai_ledger.tagged("quiz")
+async def agenerate_quiz(module_label, description, variant: int = 0):
+    """Async ``generate_quiz``."""
+    return await ai_flow.arun(_quiz_flow(module_label, description, variant))
+
+
+def _lesson_quiz_prompt(module_label, lesson_title, lesson_description):
     prompt = f"""
     Create a 5-question multiple choice quiz for this specific lesson:
 
@@ -531,94 +645,220 @@ def generate_lesson_quiz(module_label: str, lesson_title: str, lesson_descriptio
       }}
     ]
     """
+    return prompt
+
+
+def _parse_lesson_quiz(raw_text):
+    quiz_data = structured_output.parse(raw_text, QUIZ_SCHEMA, expect=list)
+    return quiz_data[:5]  # cap at 5
+
+
+def _fallback_lesson_quiz(module_label, lesson_title, lesson_description=""):
+    # Rule-based quiz from catalog data so the user isn't blocked
+    return quiz_engine.lesson_quiz(module_label, lesson_title, lesson_description)
+
+
+def _lesson_quiz_flow(module_label, lesson_title, lesson_description, variant):
+    cache_inputs = {
+        "module": module_label, "lesson": lesson_title,
+        "description": lesson_description, "variant": variant,
+    }
+    cached = yield ai_flow.call(ai_cache.GET, "lesson_quiz", cache_inputs)
+    if cached is not None:
+        return cached
+
+    def _generate():
+        prompt = _lesson_quiz_prompt(module_label, lesson_title, lesson_description)
 
-    try:
         try:
-            raw_text, _ = chat_completions_cascade(
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.6,
-                max_tokens=1400,
-                timeout=60,
-            )
-        except OpenRouterError as e:
-            print(f"Lesson quiz OpenRouter failed, falling back to Gemini: {e}")
-            raw_text = _call_gemini_text(prompt, temperature=0.6, timeout=(10, 60))
+            try:
+                raw_text, _ = yield ai_flow.call(
+                    CASCADE,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.6,
+                    max_tokens=1400,
+                    timeout=60,
+                    hedge_delay=HEDGE_DELAY_SECONDS,
+                )
+            except OpenRouterError as e:
+                print(f"Lesson quiz OpenRouter failed, falling back to Gemini: {e}")
+                raw_text = yield ai_flow.call(GEMINI, prompt, temperature=0.6, timeout=(10, 60))
+
+            quiz_data = _parse_lesson_quiz(raw_text)
+            yield ai_flow.call(ai_cache.PUT, "lesson_quiz", cache_inputs, quiz_data)
+            return quiz_data
+
+        except Exception as e:
+            print(f"Lesson Quiz Generation Error: {e}")
+            return _fallback_lesson_quiz(module_label, lesson_title, lesson_description)
+
+    return (yield ai_flow.single_flight(ai_cache.make_key("lesson_quiz", cache_inputs), _generate))
+
+
+@ai_ledger.tagged("lesson_quiz")
+def generate_lesson_quiz(module_label: str, lesson_title: str, lesson_description: str = "", variant: int = 0):
+    """
+    Generate a 5-question MCQ quiz scoped to a single lesson.
+    Used as a gate before a lesson can be marked complete.
+    Cascade → Gemini fallback, same pattern as generate_quiz(), including
+    the shared ai_cache lookup keyed by *variant*.
+    """
+    return ai_flow.run(_lesson_quiz_flow(module_label, lesson_title, lesson_description, variant))
 
-        raw_text = raw_text.strip()
-        if raw_text.startswith('```'):
-            raw_text = raw_text.split('\n', 1)[1]
-            raw_text = raw_text.rsplit('```', 1)[0]
-        raw_text = raw_text.strip()
 
-        quiz_data = json.loads(raw_text)
+@ai_ledger.tagged("lesson_quiz")
+async def agenerate_lesson_quiz(module_label: str, lesson_title: str, lesson_description: str = "", variant: int = 0):
+    """Async ``generate_lesson_quiz``."""
+    return await ai_flow.arun(_lesson_quiz_flow(module_label, lesson_title, lesson_description, variant))
 
-        # Validate structure
-        if not isinstance(quiz_data, list) or len(quiz_data) == 0:
-            raise ValueError("Quiz data is not a non-empty list")
 
-        for q in quiz_data:
-            if not all(k in q for k in ('question', 'options', 'correct', 'explanation')):
-                raise ValueError(f"Missing required keys in question: {q}")
+async def acached_quiz(module_label, description, variant: int = 0):
+    """The generated module quiz if ai_cache already holds it, else None — never calls a model."""
+    return await ai_cache.aget("quiz", {"module": module_label, "description": description, "variant": variant})
 
-        return quiz_data[:5]  # cap at 5
 
+async def acached_lesson_quiz(module_label, lesson_title, lesson_description=""):
+    """The generated lesson quiz if ai_cache already holds it, else None — never calls a model."""
+    lesson = {"title": lesson_title, "description": lesson_description}
+    return await ai_cache.aget("lesson_quiz", _lesson_quiz_inputs(module_label, lesson))
+
+
+# Lessons per batched completion; catalog modules have 10-14 lessons.
+LESSON_QUIZ_BATCH_SIZE = int(os.getenv("LESSON_QUIZ_BATCH_SIZE", "14"))
+BATCH_QUIZ_TOKENS_PER_LESSON = 650
+
+
+def _lesson_quizzes_prompt(module_label, lessons):
+    listing = "\n".join(
+        f"    L{i}. {lesson['title']}: {lesson.get('description') or 'N/A'}"
+        for i, lesson in enumerate(lessons, 1)
+    )
+    prompt = f"""
+    Create a 5-question multiple choice quiz for EACH lesson of this module:
+
+    Module: {module_label}
+    Lessons:
+{listing}
+
+    Requirements (for every lesson):
+    - 5 questions testing practical understanding of THAT lesson's topic only
+    - 4 options per question (A, B, C, D)
+    - Mix of conceptual and practical questions
+    - Include brief explanations for correct answers
+    - Questions should be clear and unambiguous
+
+    Return ONLY valid JSON (no markdown, no code blocks): one object with a key
+    per lesson id ("L1", "L2", ...), each holding that lesson's questions:
+    {{
+      "L1": [
+        {{
+          "question": "Question text here?",
+          "options": ["Option A", "Option B", "Option C", "Option D"],
+          "correct": 0,
+          "explanation": "Why this is correct"
+        }}
+      ]
+    }}
+    """
+    return prompt
+
+
+def _lesson_quiz_inputs(module_label, lesson):
+    # Same cache entry generate_lesson_quiz reads for variant 0.
+    return {
+        "module": module_label, "lesson": lesson["title"],
+        "description": lesson.get("description", ""), "variant": 0,
+    }
+
+
+def _valid_quiz_blocks(blocks, batch):
+    """``{title: questions}`` for each lesson block that validates on its own."""
+    quizzes = {}
+    for i, lesson in enumerate(batch, 1):
+        try:
+            quizzes[lesson["title"]] = _parse_lesson_quiz_block(blocks.get(f"L{i}"))
+        except StructuredOutputError as e:
+            print(f"[AI] Batched quiz for '{lesson['title']}' rejected: {e}")
+    return quizzes
+
+
+def _parse_lesson_quiz_block(block):
+    return structured_output.check(block, QUIZ_SCHEMA)[:5]
+
+
+def _parse_quiz_blocks(raw_text):
+    return structured_output.extract_json(raw_text, expect=dict)
+
+
+def _lesson_quiz_batch_flow(module_label, batch):
+    prompt = _lesson_quizzes_prompt(module_label, batch)
+    try:
+        try:
+            blocks, model_used = yield ai_flow.call(
+                structured_output.STREAM_CASCADE,
+                messages=[{"role": "user", "content": prompt}],
+                parse_fn=_parse_quiz_blocks,
+                temperature=0.6,
+                max_tokens=BATCH_QUIZ_TOKENS_PER_LESSON * len(batch) + 200,
+                timeout=120,
+            )
+            print(f"[AI] Batched {len(batch)} lesson quizzes with {model_used}")
+        except OpenRouterError as e:
+            print(f"Lesson quiz batch OpenRouter failed, falling back to Gemini: {e}")
+            blocks = _parse_quiz_blocks((yield ai_flow.call(GEMINI, prompt, temperature=0.6, timeout=(10, 120))))
     except Exception as e:
-        print(f"Lesson Quiz Generation Error: {e}")
-        # Hardcoded fallback so the user isn't blocked
-        return [
-            {
-                "question": f"What is the primary focus of the lesson '{lesson_title}'?",
-                "options": [
-                    f"Understanding {lesson_title} concepts",
-                    "Database administration",
-                    "Network security fundamentals",
-                    "Mobile app deployment",
-                ],
-                "correct": 0,
-                "explanation": f"This lesson focuses on {lesson_title} within {module_label}.",
-            },
-            {
-                "question": f"Which best describes a key concept from '{lesson_title}'?",
-                "options": [
-                    "A practical skill taught in this lesson",
-                    "An unrelated historical fact",
-                    "A deprecated technology",
-                    "A hardware specification",
-                ],
-                "correct": 0,
-                "explanation": "The lesson teaches practical, relevant skills.",
-            },
-            {
-                "question": f"After completing '{lesson_title}', you should be able to:",
-                "options": [
-                    f"Apply {lesson_title} concepts in real projects",
-                    "Write a complete operating system",
-                    "Design physical circuit boards",
-                    "Manage an enterprise data center",
-                ],
-                "correct": 0,
-                "explanation": "Lessons focus on applicable, project-ready knowledge.",
-            },
-            {
-                "question": f"How does '{lesson_title}' relate to {module_label}?",
-                "options": [
-                    f"It builds foundational knowledge for {module_label}",
-                    "It is completely unrelated",
-                    "It only covers advanced topics",
-                    "It replaces the need for practice",
-                ],
-                "correct": 0,
-                "explanation": f"Each lesson builds toward mastery of {module_label}.",
-            },
-            {
-                "question": "What is the best approach to mastering this lesson's content?",
-                "options": [
-                    "Study the resources and practice hands-on",
-                    "Memorize definitions without context",
-                    "Skip to the next module immediately",
-                    "Only read the title of each resource",
-                ],
-                "correct": 0,
-                "explanation": "Hands-on practice reinforces theoretical knowledge.",
-            },
-        ]
\ No newline at end of file
+        print(f"Lesson Quiz Batch Error: {e}")
+        return {}
+    return _valid_quiz_blocks(blocks, batch)
+
+
+def _module_lesson_quizzes_flow(module_label, lessons, retries):
+    lessons = [lesson for lesson in lessons if lesson.get("title")]
+    cached = yield ai_flow.call(
+        ai_cache.GET_MANY, "lesson_quiz", [_lesson_quiz_inputs(module_label, l) for l in lessons],
+    )
+    quizzes = {lesson["title"]: quiz for lesson, quiz in zip(lessons, cached) if quiz is not None}
+    pending = [lesson for lesson, quiz in zip(lessons, cached) if quiz is None]
+    if not pending:
+        return quizzes
+
+    def _generate():
+        generated = {}
+        todo = pending
+        for _ in range(retries + 1):
+            for start in range(0, len(todo), LESSON_QUIZ_BATCH_SIZE):
+                generated.update((yield from _lesson_quiz_batch_flow(
+                    module_label, todo[start:start + LESSON_QUIZ_BATCH_SIZE],
+                )))
+            todo = [lesson for lesson in todo if lesson["title"] not in generated]
+            if not todo:
+                break
+        yield ai_flow.call(ai_cache.PUT_MANY, "lesson_quiz", [
+            (_lesson_quiz_inputs(module_label, lesson), generated[lesson["title"]])
+            for lesson in pending if lesson["title"] in generated
+        ])
+        return generated
+
+    batch_key = ai_cache.make_key("lesson_quiz", {"module": module_label, "batch": [l["title"] for l in pending]})
+    quizzes.update((yield ai_flow.single_flight(batch_key, _generate)))
+    return quizzes
+
+
+@ai_ledger.tagged("lesson_quiz_batch")
+def generate_module_lesson_quizzes(module_label, lessons, retries: int = 1):
+    """
+    Quizzes for every lesson of a module, ``{lesson_title: questions}``.
+    Lessons already in ai_cache are reused; the rest are generated in
+    batched completions (``LESSON_QUIZ_BATCH_SIZE`` lessons each) whose
+    per-lesson blocks are validated independently, and only the failed
+    blocks are retried.  Results land in ai_cache with one bulk write, so
+    later ``generate_lesson_quiz`` calls hit.  Lessons that failed every
+    attempt are left out for the caller to generate singly.
+    """
+    return ai_flow.run(_module_lesson_quizzes_flow(module_label, lessons, retries))
+
+
+@ai_ledger.tagged("lesson_quiz_batch")
+async def agenerate_module_lesson_quizzes(module_label, lessons, retries: int = 1):
+    """Async ``generate_module_lesson_quizzes``."""
+    return await ai_flow.arun(_module_lesson_quizzes_flow(module_label, lessons, retries))
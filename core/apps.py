@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from allauth.account.apps import AccountConfig
 
 
 class CoreConfig(AppConfig):
+    default = True  # 'core' in INSTALLED_APPS; this module also defines AllauthAccountConfig
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (connects the receivers)
+
+
+class AllauthAccountConfig(AccountConfig):
+    """
+    allauth's account app, accepting our async-capable AccountMiddleware
+    subclass (allauth 0.57 insists on its own dotted path in MIDDLEWARE).
+    """
+
+    def ready(self):
+        required_mw = "core.middleware.AsyncAccountMiddleware"
+        if required_mw not in settings.MIDDLEWARE:
+            raise ImproperlyConfigured(f"{required_mw} must be added to settings.MIDDLEWARE")
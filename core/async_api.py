@@ -0,0 +1,115 @@
+"""
+Async API views
+===============
+DRF's ``@api_view`` only runs sync views, so an endpoint that waits on an
+LLM holds a worker for the whole call.  ``async_api_view`` turns a plain
+Django ``async def`` view into an API endpoint with the parts of DRF the
+AI endpoints rely on, and the view awaits ``openrouter_async`` instead of
+blocking:
+
+* JWT auth (simplejwt) → ``request.user``; a bad token is a 401
+* ``IsAuthenticated`` by default, ``allow_any=True`` for ``AllowAny``
+* ``DEFAULT_THROTTLE_CLASSES`` from ``REST_FRAMEWORK`` settings → 429
+* JSON / form body → ``request.data`` (``{}`` for bodiless requests)
+* ``Http404`` (e.g. from ``aget_object_or_404``) → ``{"detail": ...}`` 404
+* CSRF exempt, as with DRF token-authenticated views
+
+Views return ``JsonResponse`` (or ``StreamingHttpResponse``) and must be
+served through ``asgi.py`` to actually free the worker while they wait.
+"""
+
+import json
+import math
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+
+def authenticate_jwt(request):
+    """
+    Resolve the JWT user for plain (non-DRF) views.
+    Returns (user_or_None, error_payload_or_None); no header means guest.
+    """
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework.exceptions import AuthenticationFailed
+
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed as exc:
+        detail = exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail}
+        return None, detail
+    return (result[0] if result else None), None
+
+
+def _throttle_wait(request, throttle_classes):
+    """Seconds until the request would be allowed, or None if it is allowed now."""
+    from rest_framework.settings import api_settings
+
+    waits = []
+    for throttle_class in throttle_classes or api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, None):
+            waits.append(throttle.wait() or 0)
+    return max(waits) if waits else None
+
+
+def _request_data(request):
+    """JSON or form body as a dict; raises ValueError on malformed JSON."""
+    if request.content_type == 'application/json':
+        data = json.loads(request.body) if request.body else {}
+        return data if isinstance(data, dict) else {}
+    if request.method == 'POST':
+        return request.POST.dict()
+    return {}
+
+
+def _unauthorized(payload):
+    response = JsonResponse(payload, status=401)
+    response['WWW-Authenticate'] = 'Bearer realm="api"'
+    return response
+
+
+def async_api_view(methods, *, allow_any=False, throttle_classes=None):
+    """Decorator for ``async def`` API views; see the module docstring."""
+    allowed = {m.upper() for m in methods}
+
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in allowed:
+                return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+
+            user, auth_error = await sync_to_async(authenticate_jwt)(request)
+            if auth_error:
+                return _unauthorized(auth_error)
+            if user is None and not allow_any:
+                return _unauthorized({"detail": "Authentication credentials were not provided."})
+            request.user = user or AnonymousUser()
+
+            wait = await sync_to_async(_throttle_wait)(request, throttle_classes)
+            if wait is not None:
+                wait = math.ceil(wait)
+                response = JsonResponse(
+                    {"detail": f"Request was throttled. Expected available in {wait} seconds."},
+                    status=429,
+                )
+                response['Retry-After'] = str(wait)
+                return response
+
+            try:
+                request.data = _request_data(request)
+            except ValueError:
+                return JsonResponse({"detail": "JSON parse error"}, status=400)
+
+            try:
+                return await view(request, *args, **kwargs)
+            except Http404 as exc:
+                return JsonResponse({"detail": str(exc) or "Not found."}, status=404)
+
+        return wrapper
+
+    return decorator
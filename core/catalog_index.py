@@ -0,0 +1,196 @@
+"""
+Catalog retrieval index
+=======================
+JADA only sees the current module's label and description, so it
+re-explains the curriculum from scratch — long, slow answers that can
+drift from what the roadmap actually teaches.  This is an in-process BM25
+index over every module, lesson and resource in ``ROLE_CATALOG``, used to
+ground each turn in a few relevant catalog snippets instead.
+
+* ``get_index``   — the index, built once per process (``asgi.py`` warms
+  it at startup; anything else builds it on first use).
+* ``search``      — top-k documents for a query; documents of the
+  learner's current module get a boost.
+* ``grounding``   — those snippets as one system message, cut to
+  ``GROUNDING_TOKENS``.
+
+``python manage.py catalog_index_benchmark`` reports build time, lookup
+latency and grounding sizes.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+GROUNDING_K = int(os.getenv("JADA_GROUNDING_K", "4"))
+GROUNDING_TOKENS = int(os.getenv("JADA_GROUNDING_TOKENS", "300"))
+
+# BM25 parameters (the usual defaults) and per-field repetition weights.
+K1 = 1.2
+B = 0.75
+TITLE_WEIGHT = 2
+MODULE_BOOST = 1.5          # score multiplier for the learner's current module
+MIN_SCORE = 4.0             # below this a match is one weak term, not a topic
+MAX_SNIPPET_CHARS = 240
+
+KIND_LABELS = {"module": "Module", "lesson": "Lesson", "resource": "Resource"}
+GROUNDING_HEADER = (
+    "Relevant WHAT'S NEXT curriculum (point the learner to these lessons and resources "
+    "instead of re-explaining them; only cite URLs listed here):\n"
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOPWORDS = frozenset(
+    "a about all also an and any are as at be but by can could do does far for from get give got "
+    "had has have help how i if im in into is it its just know learn learned learning like me more "
+    "much my need next no not now of on one or please should so some start tell than thanks that "
+    "the their them then there these this to up use using want was what whats when where which "
+    "who why will with would yes you your".split()
+)
+
+_index: Optional["CatalogIndex"] = None
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def _clip(text: str) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= MAX_SNIPPET_CHARS else text[:MAX_SNIPPET_CHARS - 1].rstrip() + "…"
+
+
+class CatalogIndex:
+    """Inverted index with BM25 scoring over catalog documents."""
+
+    def __init__(self, documents: List[dict]):
+        started = time.perf_counter()
+        self.documents = documents
+        self.postings: Dict[str, List[tuple]] = {}
+        self.lengths: List[int] = []
+        for doc_id, doc in enumerate(documents):
+            terms = Counter(doc.pop("terms"))
+            self.lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self.postings.setdefault(term, []).append((doc_id, tf))
+        count = len(documents) or 1
+        self.avg_length = sum(self.lengths) / count or 1.0
+        self.idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+        self.build_seconds = time.perf_counter() - started
+
+    def search(self, query: str, k: int = GROUNDING_K, module: Optional[str] = None) -> List[dict]:
+        """Best *k* documents scoring at least ``MIN_SCORE`` for *query*, best first."""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[term]:
+                norm = K1 * (1 - B + B * self.lengths[doc_id] / self.avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+        if module:
+            for doc_id in scores:
+                if self.documents[doc_id]["module"] == module:
+                    scores[doc_id] *= MODULE_BOOST
+        ranked = sorted(
+            (item for item in scores.items() if item[1] >= MIN_SCORE),
+            key=lambda item: (-item[1], item[0]),
+        )
+        results, seen = [], set()
+        for doc_id, score in ranked:
+            doc = self.documents[doc_id]
+            # The same lesson or resource is listed under several roles' modules.
+            if (doc["kind"], doc["title"]) in seen:
+                continue
+            seen.add((doc["kind"], doc["title"]))
+            results.append(dict(doc, score=round(score, 2)))
+            if len(results) == k:
+                break
+        return results
+
+
+# ── Building ──────────────────────────────────────────────────────
+
+def _documents() -> List[dict]:
+    """One document per distinct module, lesson and resource in the catalog."""
+    from .role_catalog import ROLE_CATALOG
+    from .quiz_engine import RESOURCE_TYPES
+
+    documents, seen = [], set()
+
+    def add(kind, module, title, snippet, text):
+        key = (kind, module, title)
+        if title and key not in seen:
+            seen.add(key)
+            documents.append({
+                "kind": kind, "module": module, "title": title,
+                "snippet": _clip(snippet), "terms": tokenize(text),
+            })
+
+    for template in ROLE_CATALOG.values():
+        for module in template.get("modules", []):
+            label = module.get("label") or ""
+            description = module.get("description") or ""
+            project = module.get("project_prompt") or ""
+            add("module", label, label, f"{description} Project: {project}" if project else description,
+                " ".join([label] * TITLE_WEIGHT + [description, project]))
+            for lesson in module.get("lessons") or []:
+                title = lesson.get("title") or ""
+                add("lesson", label, title, lesson.get("description") or "",
+                    " ".join([title] * TITLE_WEIGHT + [lesson.get("description") or "", label]))
+            for resources in (module.get("resources") or {}).values():
+                for resource in resources if isinstance(resources, list) else []:
+                    title = resource.get("title") or ""
+                    kind = RESOURCE_TYPES.get(resource.get("type"), resource.get("type") or "")
+                    add("resource", label, title, f"{kind}: {resource.get('url', '')}".strip(": "),
+                        " ".join([title] * TITLE_WEIGHT + [kind, label]))
+    return documents
+
+
+def build() -> CatalogIndex:
+    return CatalogIndex(_documents())
+
+
+def get_index() -> CatalogIndex:
+    """The process-wide index, built on first use."""
+    global _index
+    if _index is None:
+        _index = build()
+        print(f"[AI] Catalog index built: {len(_index.documents)} documents, "
+              f"{len(_index.postings)} terms in {_index.build_seconds * 1000:.0f}ms")
+    return _index
+
+
+# ── Lookup ────────────────────────────────────────────────────────
+
+def search(query: str, k: int = GROUNDING_K, module: Optional[str] = None) -> List[dict]:
+    return get_index().search(query, k=k, module=module)
+
+
+def grounding(query: str, module: Optional[str] = None, max_tokens: int = GROUNDING_TOKENS) -> str:
+    """
+    A system message of the catalog snippets most relevant to *query*
+    (at most *max_tokens*), or "" when nothing in the catalog matches.
+    """
+    from .jada_memory import estimate_tokens
+
+    lines = []
+    used = estimate_tokens(GROUNDING_HEADER)
+    for doc in search(query, module=module):
+        line = f"- {KIND_LABELS[doc['kind']]} \"{doc['title']}\" ({doc['module']}): {doc['snippet']}"
+        if doc["kind"] == "module":
+            line = f"- Module \"{doc['title']}\": {doc['snippet']}"
+        cost = estimate_tokens(line)
+        if used + cost > max_tokens:
+            break
+        lines.append(line)
+        used += cost
+    return GROUNDING_HEADER + "\n".join(lines) if lines else ""
@@ -0,0 +1,140 @@
+"""
+Request deadlines
+=================
+One time budget per request, shared by every outbound call made on its
+behalf, instead of ad-hoc per-call timeouts that add up past gunicorn's
+120s worker timeout (a 120s cascade followed by two 90s Gemini attempts
+got the worker killed mid-write).
+
+* ``RequestDeadlineMiddleware`` (``core.middleware``) opens a
+  ``REQUEST_DEADLINE_SECONDS`` budget around each request.
+* ``timeout`` — shrink a call's timeout (seconds or ``(connect, read)``)
+  to what is left; raises ``DeadlineExceeded`` once too little is left
+  for a call to be worth starting.  ``http_client`` applies it to every
+  outbound request, so OpenRouter, Gemini, GitHub and the feed fetchers
+  are all bounded without threading a parameter through each of them.
+* ``expired`` / ``allows`` — for loops (cascades, retries, feeds) to stop
+  early and return their best fallback while there is still time to;
+  ``past_due`` for waits on calls already in flight.
+* ``budget`` — open (or narrow: nested budgets never extend the outer
+  one) a budget around any block; ``call_deadline`` exposes the instant
+  to code with its own waits (the AI governor's queue, single-flight).
+
+``FALLBACK_RESERVE`` seconds at the end of the budget are kept back from
+calls for building the fallback and writing the response.  The budget is
+a context variable, so it follows asyncio tasks and ``sync_to_async``;
+thread pools must run work in a copied context.  Outside a request
+(Celery, management commands) there is no deadline and every function
+is a no-op.
+
+Read timeouts in ``requests`` / ``httpx`` bound each socket read, not the
+whole response, so a trickling stream can overrun a shrunk timeout;
+streaming loops check ``expired`` between chunks for that reason.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Optional
+
+REQUEST_BUDGET = float(os.getenv("REQUEST_DEADLINE_SECONDS", "100"))   # < gunicorn --timeout 120
+FALLBACK_RESERVE = float(os.getenv("REQUEST_DEADLINE_RESERVE", "3"))
+# Not worth opening a connection with less than this left.
+MIN_CALL_SECONDS = 1.0
+
+_deadline: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's budget is spent; return a fallback instead of calling out."""
+
+
+class Deadline:
+    def __init__(self, seconds: float, reserve: float = FALLBACK_RESERVE):
+        self.expires_at = time.monotonic() + seconds
+        self.reserve = min(reserve, seconds / 2)
+
+    @property
+    def call_deadline(self) -> float:
+        """Instant outbound calls must finish by."""
+        return self.expires_at - self.reserve
+
+    def remaining(self) -> float:
+        """Seconds left for outbound calls."""
+        return max(self.call_deadline - time.monotonic(), 0.0)
+
+
+# ── Reading the budget ────────────────────────────────────────────
+
+def current() -> Optional[Deadline]:
+    return _deadline.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for outbound calls, or None without a deadline."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline.remaining()
+
+
+def call_deadline() -> Optional[float]:
+    """``time.monotonic()`` instant calls must finish by, or None."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline.call_deadline
+
+
+def expired() -> bool:
+    """True once there's no longer time to start another call."""
+    left = remaining()
+    return left is not None and left < MIN_CALL_SECONDS
+
+
+def past_due() -> bool:
+    """True once calls should already have finished (in-flight ones can be abandoned)."""
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def allows(seconds: float) -> bool:
+    """True if *seconds* can be spent (a backoff, a wait) and a call still fit afterwards."""
+    left = remaining()
+    return left is None or left >= seconds + MIN_CALL_SECONDS
+
+
+def check(what: str = "call") -> None:
+    if expired():
+        raise DeadlineExceeded(f"request deadline reached before {what}")
+
+
+def cap(seconds: Optional[float]) -> Optional[float]:
+    """*seconds* shrunk to the remaining budget (None means unbounded)."""
+    left = remaining()
+    if left is None:
+        return seconds
+    return left if seconds is None else min(seconds, left)
+
+
+def timeout(value: Any, what: str = "call") -> Any:
+    """A float or ``(connect, read)`` timeout shrunk to the remaining budget."""
+    check(what)
+    if isinstance(value, tuple):
+        return tuple(cap(part) for part in value)
+    return cap(value)
+
+
+# ── Opening a budget ──────────────────────────────────────────────
+
+@contextmanager
+def budget(seconds: float = REQUEST_BUDGET):
+    """Run the block with at most *seconds* of budget (never more than an enclosing one)."""
+    outer = _deadline.get()
+    deadline = Deadline(seconds)
+    if outer is not None and outer.call_deadline <= deadline.call_deadline:
+        deadline = outer
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
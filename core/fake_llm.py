@@ -0,0 +1,374 @@
+"""
+Offline LLM stand-in
+====================
+A local HTTP server that speaks just enough of the OpenRouter
+chat-completions API (plain and SSE streaming) and Gemini
+``generateContent`` for every AI path in the app, so load tests and
+benchmarks (``manage.py fake_llm_server`` + ``manage.py ai_benchmark``)
+run on a disconnected machine.
+
+Point the app at it with::
+
+    OPENROUTER_API_URL=http://127.0.0.1:8090/api/v1/chat/completions
+    GEMINI_API_BASE=http://127.0.0.1:8090
+    OPENROUTER_API_KEY=fake  GEMINI_API_KEY=fake
+
+Responses
+---------
+* **Synthetic** — chosen from the prompt: roadmap, lesson plan, module /
+  lesson quiz, course name, JADA summary or a JADA chat reply.  Each is
+  valid for the parser that consumes it.
+* **Recorded** — ``recordings`` is a list of ``{"match", "content",
+  "model"?}``; the first entry whose ``match`` occurs in the prompt (and
+  whose ``model``, if given, equals the requested model) wins.
+
+Behaviour
+---------
+Latency is drawn per request from a distribution spec (``parse_latency``)
+with optional per-model overrides.  ``error_rate`` answers HTTP 503,
+``empty_rate`` an empty message and ``malformed_rate`` a truncated one
+(half the content — broken JSON for structured prompts).  Draws come from
+a RNG seeded by ``seed``, model, prompt and how many times that prompt
+was seen, so a replayed request sequence gets the same latencies and
+failures whatever the thread interleaving.
+
+``GET /__stats`` returns request counts, outcomes, in-flight and peak
+concurrency; ``POST /__reset`` zeroes them.  The Gemini SDK fallback in
+``lesson_generator`` can't be redirected and is not covered.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+OUTCOMES = ("ok", "error", "empty", "malformed")
+
+
+# ── Latency distributions ────────────────────────────────────────
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Seconds-per-request sampler for *spec*:
+
+    ``0.4`` / ``fixed:0.4``, ``uniform:LO,HI``, ``normal:MEAN,STD``,
+    ``lognormal:MEDIAN,SIGMA`` or ``pareto:MIN,ALPHA`` (heavy tail).
+    """
+    kind, _, args = spec.strip().partition(":")
+    if not args:
+        kind, args = "fixed", kind
+    try:
+        params = [float(a) for a in args.split(",")]
+    except ValueError:
+        raise ValueError(f"Bad latency spec {spec!r}") from None
+
+    if kind == "fixed" and len(params) == 1:
+        return lambda rng: params[0]
+    if kind == "uniform" and len(params) == 2:
+        return lambda rng: rng.uniform(*params)
+    if kind == "normal" and len(params) == 2:
+        return lambda rng: max(0.0, rng.gauss(*params))
+    if kind == "lognormal" and len(params) == 2:
+        mu = math.log(params[0])
+        return lambda rng: rng.lognormvariate(mu, params[1])
+    if kind == "pareto" and len(params) == 2:
+        return lambda rng: params[0] * rng.paretovariate(params[1])
+    raise ValueError(f"Bad latency spec {spec!r}")
+
+
+# ── Synthetic responses ───────────────────────────────────────────
+
+def _quoted(prompt: str, field: str, default: str) -> str:
+    match = re.search(rf"{field}:\s*(.+)", prompt)
+    return match.group(1).strip().strip('"') if match else default
+
+
+def _quiz(topic: str, rng: random.Random) -> list:
+    return [
+        {
+            "question": f"Which statement about {topic} is correct? (#{i + 1})",
+            "options": [f"{topic} fact {i}-{n}" for n in range(4)],
+            "correct": rng.randrange(4),
+            "explanation": f"Option {i} reflects how {topic} behaves in practice.",
+        }
+        for i in range(5)
+    ]
+
+
+def _lessons(topic: str, count: int, *, full: bool) -> list:
+    lessons = []
+    for i in range(count):
+        lesson = {
+            "title": f"{topic}: part {i + 1}",
+            "description": f"Hands-on practice with {topic}, step {i + 1}.",
+            "phase": min(3, i // 3 + 1),
+            "order": i + 1,
+            "estimated_minutes": 30,
+        }
+        if full:
+            lesson["xp_reward"] = 20
+            lesson["resources"] = {
+                "primary": {"title": f"{topic} docs", "url": "https://developer.mozilla.org/", "type": "docs"},
+                "supplementary": [],
+            }
+        lessons.append(lesson)
+    return lessons
+
+
+def _roadmap(niche: str) -> list:
+    return [
+        {
+            "label": f"{niche} module {m + 1}",
+            "description": f"Core {niche} skill {m + 1}. Needed before moving on.",
+            "status": "active" if m == 0 else "locked",
+            "market_value": "Med",
+            "resources": {
+                "primary": [{"title": "freeCodeCamp", "url": "https://www.freecodecamp.org/", "type": "interactive"}],
+                "additional": [],
+            },
+            "project_prompt": f"Build a small {niche} project using module {m + 1}.",
+            "lessons": _lessons(f"{niche} {m + 1}", 8, full=False),
+        }
+        for m in range(6)
+    ]
+
+
+def synthesize(prompt: str, rng: random.Random) -> str:
+    """A plausible, parseable answer for any prompt the app sends."""
+    if "Senior Technical Career Coach" in prompt:
+        return json.dumps(_roadmap(_quoted(prompt, "TARGET CAREER PATH", "Engineering")))
+    if "lesson plan" in prompt:
+        topic = _quoted(prompt, "- Title", "Module")
+        return json.dumps(_lessons(topic, 6, full=True))
+    if "quiz for EACH lesson" in prompt:
+        lessons = re.findall(r"^\s*(L\d+)\. ([^:\n]+)", prompt, re.MULTILINE)
+        return json.dumps({lesson_id: _quiz(title.strip(), rng) for lesson_id, title in lessons})
+    if "multiple choice quiz" in prompt:
+        topic = _quoted(prompt, "Lesson", "") or _quoted(prompt, "Module", "this topic")
+        return json.dumps(_quiz(topic, rng))
+    if "Normalize this university course" in prompt:
+        return _quoted(prompt, "Input", "Computer Science").title()
+    if "EXISTING SUMMARY" in prompt:
+        return "The learner is working through their roadmap and asked about core concepts."
+    return (
+        "Good question! Break it into small steps, try each one in a scratch "
+        "project, and check the official docs when something surprises you."
+    )
+
+
+# ── Server ────────────────────────────────────────────────────────
+
+class FakeLLM:
+    """Configuration, RNG and counters shared by every request handler."""
+
+    def __init__(
+        self,
+        *,
+        latency: str = "lognormal:0.8,0.5",
+        model_latency: Optional[Dict[str, str]] = None,
+        error_rate: float = 0.0,
+        empty_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        model_error_rate: Optional[Dict[str, float]] = None,
+        stream_chunk_delay: float = 0.02,
+        recordings: Optional[List[Dict[str, Any]]] = None,
+        seed: int = 0,
+    ):
+        self.latency = parse_latency(latency)
+        self.model_latency = {m: parse_latency(s) for m, s in (model_latency or {}).items()}
+        self.error_rate = error_rate
+        self.empty_rate = empty_rate
+        self.malformed_rate = malformed_rate
+        self.model_error_rate = model_error_rate or {}
+        self.stream_chunk_delay = stream_chunk_delay
+        self.recordings = recordings or []
+        self.seed = seed
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            in_flight = getattr(self, "stats", {}).get("in_flight", 0)   # still being served
+            self._seen: Dict[str, int] = {}
+            self.stats = {
+                "requests": 0,
+                "in_flight": in_flight,
+                "peak_in_flight": 0,
+                "outcomes": dict.fromkeys(OUTCOMES, 0),
+                "by_model": {},
+            }
+
+    def _rng(self, model: str, prompt: str) -> random.Random:
+        digest = hashlib.sha256(f"{model}\x00{prompt}".encode()).hexdigest()[:16]
+        with self._lock:
+            n = self._seen.get(digest, 0)
+            self._seen[digest] = n + 1
+        return random.Random(f"{self.seed}:{digest}:{n}")
+
+    def plan(self, model: str, prompt: str) -> Dict[str, Any]:
+        """Decide latency, outcome and content for one request."""
+        rng = self._rng(model, prompt)
+        delay = self.model_latency.get(model, self.latency)(rng)
+        roll = rng.random()
+        error_rate = self.model_error_rate.get(model, self.error_rate)
+        if roll < error_rate:
+            outcome = "error"
+        elif roll < error_rate + self.empty_rate:
+            outcome = "empty"
+        elif roll < error_rate + self.empty_rate + self.malformed_rate:
+            outcome = "malformed"
+        else:
+            outcome = "ok"
+
+        content = ""
+        if outcome in ("ok", "malformed"):
+            content = next(
+                (
+                    r["content"] for r in self.recordings
+                    if r.get("match", "") in prompt and r.get("model", model) == model
+                ),
+                None,
+            ) or synthesize(prompt, rng)
+            if outcome == "malformed":
+                content = content[: max(1, len(content) // 2)]
+        return {"delay": delay, "outcome": outcome, "content": content}
+
+    def enter(self, model: str) -> None:
+        with self._lock:
+            s = self.stats
+            s["requests"] += 1
+            s["in_flight"] += 1
+            s["peak_in_flight"] = max(s["peak_in_flight"], s["in_flight"])
+            s["by_model"][model] = s["by_model"].get(model, 0) + 1
+
+    def leave(self, outcome: str) -> None:
+        with self._lock:
+            self.stats["in_flight"] -= 1
+            self.stats["outcomes"][outcome] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+    def make_server(self, host: str = "127.0.0.1", port: int = 8090) -> ThreadingHTTPServer:
+        handler = type("Handler", (_Handler,), {"fake": self})
+        server = ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+        return server
+
+    def start(self, host: str = "127.0.0.1", port: int = 8090) -> ThreadingHTTPServer:
+        """Serve on a daemon thread (for tests and in-process benchmarks)."""
+        server = self.make_server(host, port)
+        threading.Thread(target=server.serve_forever, name="fake-llm", daemon=True).start()
+        return server
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake: FakeLLM
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass    # the client gave up mid-stream (e.g. an aborted structured output)
+
+    def _send_json(self, status: int, body: Any) -> None:
+        out = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def do_GET(self):
+        if self.path.startswith("/__stats"):
+            return self._send_json(200, self.fake.snapshot())
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send_json(400, {"error": "invalid JSON"})
+
+        if self.path.startswith("/__reset"):
+            self.fake.reset()
+            return self._send_json(200, {"status": "reset"})
+        if ":generateContent" in self.path:
+            model = self.path.split("/models/")[-1].split(":")[0]
+            prompt = "\n".join(
+                p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", [])
+            )
+            return self._answer(model, prompt, self._gemini)
+        if self.path.rstrip("/").endswith("/chat/completions"):
+            messages = body.get("messages") or [{}]
+            prompt = messages[-1].get("content", "")
+            model = body.get("model", "unknown")
+            if body.get("stream"):
+                return self._answer(model, prompt, self._openrouter_stream)
+            return self._answer(model, prompt, self._openrouter)
+        self._send_json(404, {"error": "not found"})
+
+    def _answer(self, model: str, prompt: str, respond) -> None:
+        plan = self.fake.plan(model, prompt)
+        self.fake.enter(model)
+        try:
+            time.sleep(plan["delay"])
+            if plan["outcome"] == "error":
+                return self._send_json(503, {"error": {"code": 503, "message": "fake provider overloaded"}})
+            respond(plan["content"], _usage(prompt, plan["content"]))
+        finally:
+            self.fake.leave(plan["outcome"])
+
+    def _openrouter(self, content: str, usage: Dict[str, int]) -> None:
+        self._send_json(200, {
+            "choices": [{"message": {"role": "assistant", "content": content}}],
+            "usage": usage,
+        })
+
+    def _gemini(self, content: str, usage: Dict[str, int]) -> None:
+        self._send_json(200, {
+            "candidates": [{"content": {"parts": [{"text": content}]}}],
+            "usageMetadata": {
+                "promptTokenCount": usage["prompt_tokens"],
+                "candidatesTokenCount": usage["completion_tokens"],
+            },
+        })
+
+    def _openrouter_stream(self, content: str, usage: Dict[str, int]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write(frame: str) -> None:
+            data = frame.encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        write(": OPENROUTER PROCESSING\n\n")
+        words = re.findall(r"\S+\s*", content)
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(self.fake.stream_chunk_delay)
+            write("data: " + json.dumps({"choices": [{"delta": {"content": word}}]}) + "\n\n")
+        write("data: " + json.dumps({"choices": [], "usage": usage}) + "\n\n")
+        write("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+
+def _usage(prompt: str, content: str) -> Dict[str, int]:
+    # ~4 characters per token, like jada_memory.estimate_tokens
+    return {"prompt_tokens": len(prompt) // 4 + 1, "completion_tokens": len(content) // 4}
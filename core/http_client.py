@@ -0,0 +1,182 @@
+"""
+Shared outbound HTTP transport
+===============================
+One ``requests.Session`` per process with keep-alive connection pools
+mounted per upstream host, so repeated calls to OpenRouter, Gemini,
+GitHub, YouTube, Hacker News and Loops.so reuse warm TCP+TLS
+connections instead of handshaking on every request.
+
+Every integration should go through ``http_get`` / ``http_post`` (or
+``get_session()`` for anything more exotic) rather than calling
+``requests.get`` / ``requests.post`` directly.
+
+Policy
+------
+* **Pools** — each known host gets its own adapter with a bounded number
+  of kept-alive connections (``pool_maxsize``).  Unknown hosts share the
+  default adapter.  ``pool_block=False`` means a burst beyond the bound
+  opens a temporary extra connection rather than queueing.
+* **Timeouts** — ``DEFAULT_TIMEOUT`` (connect, read) applies whenever the
+  caller does not pass one.  Inside a request either is shrunk to the
+  request's remaining budget (``deadlines.timeout``), and a call with no
+  budget left raises ``deadlines.DeadlineExceeded`` without going out.
+* **Retries** — transport-level retries only cover connection failures
+  and 502/503/504 on idempotent methods.  POSTs are never replayed here;
+  callers such as ``openrouter_client`` keep their own retry loops.
+
+Async
+-----
+``get_async_client()`` is the asyncio counterpart used by the async AI
+gateway (``openrouter_async``): one ``httpx.AsyncClient`` per event loop,
+so every in-flight LLM call under the ASGI server shares one connection
+pool instead of holding a worker thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import deadlines
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (5, 30)
+
+# What ``http_get`` / ``http_post`` raise on transport errors, so callers
+# can catch it without importing ``requests`` themselves.
+RequestException = requests.exceptions.RequestException
+
+# Connections kept alive per host.  Gunicorn sync workers only issue one
+# request at a time, but threaded callers (hedged cascades, feed fetchers)
+# can fan out a few concurrent calls to the same host.
+DEFAULT_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+
+# Per-host overrides — the hosts we talk to on every AI / scoring request.
+HOST_POOL_SIZES = {
+    "openrouter.ai": 20,
+    "generativelanguage.googleapis.com": 10,
+    "api.github.com": 10,
+    "www.googleapis.com": 5,
+    "hn.algolia.com": 5,
+    "news.google.com": 5,
+    "weworkremotely.com": 2,
+    "remotive.com": 2,
+    "app.loops.so": 2,
+}
+
+# Keep-alive connections shared by all coroutines on one event loop.
+ASYNC_MAX_CONNECTIONS = int(os.getenv("HTTP_ASYNC_MAX_CONNECTIONS", "200"))
+ASYNC_MAX_KEEPALIVE = int(os.getenv("HTTP_ASYNC_MAX_KEEPALIVE", "40"))
+
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_lock = threading.Lock()
+
+
+def _retry_policy() -> Retry:
+    return Retry(
+        total=2,
+        connect=2,
+        read=0,
+        status=2,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        raise_on_status=False,
+    )
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    default_adapter = HTTPAdapter(
+        pool_connections=len(HOST_POOL_SIZES) + 4,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        max_retries=_retry_policy(),
+    )
+    session.mount("https://", default_adapter)
+    session.mount("http://", default_adapter)
+
+    for host, size in HOST_POOL_SIZES.items():
+        session.mount(
+            f"https://{host}/",
+            HTTPAdapter(pool_connections=1, pool_maxsize=size, max_retries=_retry_policy()),
+        )
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return this process's pooled session, creating it on first use.
+
+    The session is rebuilt after a fork so gunicorn / Celery children never
+    share sockets with their parent.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                _session = _build_session()
+                _session_pid = pid
+    return _session
+
+
+def http_get(url: str, *, timeout: Any = None, **kwargs) -> requests.Response:
+    """``requests.get`` over the shared pooled session."""
+    return get_session().get(url, timeout=deadlines.timeout(timeout or DEFAULT_TIMEOUT), **kwargs)
+
+
+def http_post(url: str, *, timeout: Any = None, **kwargs) -> requests.Response:
+    """``requests.post`` over the shared pooled session."""
+    return get_session().post(url, timeout=deadlines.timeout(timeout or DEFAULT_TIMEOUT), **kwargs)
+
+
+# httpx clients are bound to the loop they were first used on.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _timeout_to_httpx(timeout: Any) -> httpx.Timeout:
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the pooled ``httpx.AsyncClient`` for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=_timeout_to_httpx(DEFAULT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=ASYNC_MAX_KEEPALIVE,
+            ),
+            transport=httpx.AsyncHTTPTransport(retries=1),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def ahttp_post(url: str, *, timeout: Any = None, **kwargs) -> httpx.Response:
+    """Async POST over the event loop's pooled client."""
+    return await get_async_client().post(
+        url, timeout=_timeout_to_httpx(deadlines.timeout(timeout or DEFAULT_TIMEOUT)), **kwargs
+    )
+
+
+def ahttp_stream(method: str, url: str, *, timeout: Any = None, **kwargs):
+    """Async streaming request (``async with ahttp_stream(...) as resp``)."""
+    return get_async_client().stream(
+        method, url, timeout=_timeout_to_httpx(deadlines.timeout(timeout or DEFAULT_TIMEOUT)), **kwargs
+    )
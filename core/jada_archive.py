@@ -0,0 +1,177 @@
+"""
+JADA cold storage
+=================
+Every chat turn adds two free-text ``JadaMessage`` rows and guest sessions
+are rarely resumed, so the hot table grows without bound while almost all
+of it is never read again.  Conversations idle for ``ARCHIVE_AFTER_DAYS``
+have their messages packed into a single compressed ``JadaMessageArchive``
+row and deleted from the hot table, keeping its indexes small.
+
+* ``archive_idle``     — the periodic job (``tasks.archive_idle_jada_conversations``,
+  or ``python manage.py archive_jada_conversations``).
+* ``messages_before``  — a page of an archived conversation, read straight
+  from the blob; the history endpoints use it transparently.
+* ``restore``          — unpack back into ``JadaMessage`` rows (original ids
+  and timestamps) when an archived conversation gets a new message, so
+  ``jada_memory`` and everything else that writes or replays a
+  conversation only ever sees the hot table.
+
+The blob is zlib-compressed JSON of ``[id, role, content, model_used,
+created_at]`` rows; ``codec`` names the format so another one can be added
+without rewriting existing archives.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("JADA_ARCHIVE_AFTER_DAYS", "30"))
+COMPRESSION_LEVEL = 9
+RESTORE_BATCH = 500
+
+FIELDS = ("id", "role", "content", "model_used", "created_at")
+CODECS = {
+    "zlib": (lambda raw: zlib.compress(raw, COMPRESSION_LEVEL), zlib.decompress),
+}
+DEFAULT_CODEC = "zlib"
+
+
+# ── Packing ───────────────────────────────────────────────────────
+
+def pack(rows, codec: str = DEFAULT_CODEC):
+    """Compress ``FIELDS``-ordered message rows; returns ``(payload, raw_bytes)``."""
+    raw = json.dumps(
+        [[*row[:-1], row[-1].isoformat()] for row in rows],
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+    compress, _ = CODECS[codec]
+    return compress(raw), len(raw)
+
+
+def unpack(archive) -> List[Dict]:
+    """Messages of *archive* as dicts of ``FIELDS``, oldest first."""
+    _, decompress = CODECS[archive.codec]
+    rows = json.loads(decompress(bytes(archive.payload)))
+    messages = []
+    for row in rows:
+        message = dict(zip(FIELDS, row))
+        message["created_at"] = datetime.fromisoformat(message["created_at"])
+        messages.append(message)
+    return messages
+
+
+# ── Archiving ─────────────────────────────────────────────────────
+
+def archive_conversation(conversation_id, cutoff) -> Optional[Dict[str, int]]:
+    """
+    Move the messages of one conversation idle since before *cutoff* into
+    an archive; None if it was resumed, already archived, or empty.
+    """
+    from .models import JadaConversation, JadaMessage, JadaMessageArchive
+
+    with transaction.atomic():
+        # The row lock makes a concurrent restore / new turn wait for us.
+        convo = JadaConversation.objects.select_for_update().filter(
+            id=conversation_id, archived_at__isnull=True, last_message_at__lt=cutoff,
+        ).only("id").first()
+        if convo is None:
+            return None
+        rows = list(
+            JadaMessage.objects.filter(conversation_id=convo.id)
+            .order_by("id").values_list(*FIELDS)
+        )
+        if not rows:
+            return None
+
+        payload, raw_bytes = pack(rows)
+        JadaMessageArchive.objects.create(
+            conversation_id=convo.id, codec=DEFAULT_CODEC, payload=payload,
+            message_count=len(rows), raw_bytes=raw_bytes,
+        )
+        JadaMessage.objects.filter(conversation_id=convo.id).delete()
+        JadaConversation.objects.filter(pk=convo.pk).update(archived_at=timezone.now())
+    return {"messages": len(rows), "raw_bytes": raw_bytes, "stored_bytes": len(payload)}
+
+
+def archive_idle(days: int = ARCHIVE_AFTER_DAYS, limit: Optional[int] = None) -> Dict[str, int]:
+    """Archive every conversation with no message for *days* (at most *limit* of them)."""
+    from .models import JadaConversation
+
+    cutoff = timezone.now() - timedelta(days=days)
+    ids = (
+        JadaConversation.objects
+        .filter(archived_at__isnull=True, last_message_at__lt=cutoff, message_count__gt=0)
+        .order_by("last_message_at")
+        .values_list("id", flat=True)
+    )
+    if limit:
+        ids = ids[:limit]
+
+    totals = {"conversations": 0, "messages": 0, "raw_bytes": 0, "stored_bytes": 0}
+    # One transaction per conversation so a long run never holds many locks.
+    for conversation_id in list(ids):
+        stats = archive_conversation(conversation_id, cutoff)
+        if stats:
+            totals["conversations"] += 1
+            for key, value in stats.items():
+                totals[key] += value
+    if totals["conversations"]:
+        print(f"[JADA] Archived {totals['messages']} messages from {totals['conversations']} "
+              f"idle conversations ({totals['raw_bytes']} -> {totals['stored_bytes']} bytes)")
+    return totals
+
+
+# ── Reading and restoring ─────────────────────────────────────────
+
+def messages_before(conversation, before: Optional[int], count: int) -> Optional[List[Dict]]:
+    """
+    Up to *count* archived messages with ``id < before``, newest first;
+    None if the conversation isn't archived (any more).
+    """
+    from .models import JadaMessageArchive
+
+    archive = JadaMessageArchive.objects.filter(conversation_id=conversation.pk).first()
+    if archive is None:
+        return None
+    messages = unpack(archive)
+    if before is not None:
+        messages = [m for m in messages if m["id"] < before]
+    messages.reverse()
+    return messages[:count]
+
+
+def restore(conversation) -> int:
+    """Unpack an archived *conversation* back into the hot table; returns messages restored."""
+    from .models import JadaConversation, JadaMessage, JadaMessageArchive
+
+    if conversation.archived_at is None:
+        return 0
+    with transaction.atomic():
+        JadaConversation.objects.select_for_update().filter(pk=conversation.pk).only("id").first()
+        archive = JadaMessageArchive.objects.filter(conversation_id=conversation.pk).first()
+        restored = []
+        if archive is not None:
+            rows = unpack(archive)
+            restored = [
+                JadaMessage(
+                    id=row["id"], conversation_id=conversation.pk, role=row["role"],
+                    content=row["content"], model_used=row["model_used"],
+                )
+                for row in rows
+            ]
+            JadaMessage.objects.bulk_create(restored, batch_size=RESTORE_BATCH)
+            # bulk_create stamps auto_now_add fields with "now"; put the originals back.
+            for message, row in zip(restored, rows):
+                message.created_at = row["created_at"]
+            JadaMessage.objects.bulk_update(restored, ["created_at"], batch_size=RESTORE_BATCH)
+            archive.delete()
+        JadaConversation.objects.filter(pk=conversation.pk).update(archived_at=None)
+    conversation.archived_at = None
+    return len(restored)
@@ -0,0 +1,173 @@
+"""
+JADA learner context
+====================
+The "what the learner is doing" system block for each JADA turn — module,
+lesson progress, quiz, project, skipped topics, recent resources, overall
+progress.  Building it takes about eight queries and the answer rarely
+changes between turns, so the assembled text is cached per (user, module)
+and only rebuilt after the rows behind it change.
+
+* ``for_conversation`` — the block for a conversation's user and module;
+  a hit costs one cache round trip and no queries.
+* ``build``            — assemble the block from the database.
+* ``invalidate_user`` / ``invalidate_module`` — called by the receivers in
+  ``core.signals`` when progress, quizzes, resource clicks, tech debt or
+  roadmap items change.
+
+Invalidation bumps a generation token (one per user, one per module)
+instead of deleting cached blocks: each block is stored with the tokens
+that were current when its build started, so a block built while a change
+was being committed is never served afterwards.  Bumps run on commit, so
+a rebuild can't read the old rows under the new token either.
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from functools import partial
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+CACHE_PREFIX = "jada_ctx"
+CONTEXT_TTL = int(os.getenv("JADA_CONTEXT_TTL", "3600"))
+GENERATION_TTL = CONTEXT_TTL * 2    # outlives every block stamped with it
+
+# Fields the block is built from; saves that touch none of them keep it.
+MODULE_FIELDS = {"label", "description", "status", "resources", "project_submission_link"}
+LESSON_FIELDS = {"is_completed", "lesson_title"}
+QUIZ_FIELDS = {"score", "passed", "attempts"}
+
+
+def _context_key(user_id, module_id) -> str:
+    return f"{CACHE_PREFIX}:{user_id}:{module_id or 'none'}"
+
+
+def _user_generation_key(user_id) -> str:
+    return f"{CACHE_PREFIX}:gen:user:{user_id}"
+
+
+def _module_generation_key(module_id) -> str:
+    return f"{CACHE_PREFIX}:gen:module:{module_id}"
+
+
+# ── Building ──────────────────────────────────────────────────────
+
+def build(user, module) -> str:
+    """Build rich context block for JADA's system prompt including lesson progress."""
+    from .models import LessonProgress, ResourceClick, UserRoadmapItem, UserTechDebt
+
+    parts = []
+
+    if module:
+        parts.insert(0,
+            f"IMPORTANT: The user has ALREADY selected their module — '{module.label}'. "
+            f"Do NOT ask them which module they are working on. "
+            f"Start helping immediately based on this module context. "
+            f"You know their module, their progress, and their status — use it."
+        )
+        parts.append(
+            f"User is working on module: {module.label} — {module.description}. "
+            f"Status: {module.status}."
+        )
+
+        # Lesson progress for this module
+        lp_qs = LessonProgress.objects.filter(user=user, roadmap_item=module)
+        done = lp_qs.filter(is_completed=True).count()
+        total = lp_qs.count()
+        if total:
+            parts.append(f"Lesson progress: {done}/{total} lessons completed in this module.")
+            # List incomplete lessons so JADA can nudge
+            incomplete = lp_qs.filter(is_completed=False).values_list('lesson_title', flat=True)[:5]
+            if incomplete:
+                parts.append(f"Remaining lessons: {', '.join(incomplete)}.")
+        else:
+            # Use lesson_outline count from resources
+            outline = (module.resources or {}).get('lesson_outline') or []
+            if outline:
+                parts.append(f"Module has {len(outline)} lessons (none started yet).")
+
+        # Quiz info
+        quiz = getattr(module, 'quiz', None)
+        if quiz:
+            parts.append(
+                f"Module quiz: {'Passed' if quiz.passed else 'Not passed'} "
+                f"(score: {quiz.score}, attempts: {quiz.attempts})."
+            )
+
+        # Project submission
+        if module.project_submission_link:
+            parts.append(f"Project submitted: {module.project_submission_link}")
+        else:
+            parts.append("Project: Not submitted yet.")
+
+        # Tech debt
+        debts = UserTechDebt.objects.filter(user=user, resolved=False)[:3]
+        if debts:
+            topics = ', '.join(d.topic for d in debts)
+            parts.append(f"Skipped topics to revisit: {topics}.")
+
+        # Recent resource clicks
+        clicks = ResourceClick.objects.filter(user=user, module=module).order_by('-clicked_at')[:3]
+        if clicks:
+            titles = ', '.join(c.title[:40] for c in clicks if c.title)
+            if titles:
+                parts.append(f"Recently viewed resources: {titles}.")
+
+    # Global progress
+    completed_count = UserRoadmapItem.objects.filter(user=user, status='completed').count()
+    total_count = UserRoadmapItem.objects.filter(user=user).count()
+    if total_count:
+        parts.append(f"Overall progress: {completed_count}/{total_count} modules completed.")
+
+    return "\n".join(parts)
+
+
+# ── Cached lookup ─────────────────────────────────────────────────
+
+def _generation(key: str, found: Dict[str, str]) -> str:
+    """Token at *key*, minting one if it was never set or got evicted."""
+    token = found.get(key)
+    if token is None:
+        token = uuid.uuid4().hex
+        if not cache.add(key, token, GENERATION_TTL):
+            token = cache.get(key) or token
+    return token
+
+
+def for_conversation(user, conversation) -> str:
+    """Context block for *user* and the conversation's module, from cache when current."""
+    module_id = conversation.context_module_id
+    context_key = _context_key(user.id, module_id)
+    generation_keys: List[str] = [_user_generation_key(user.id)]
+    if module_id:
+        generation_keys.append(_module_generation_key(module_id))
+
+    found = cache.get_many([context_key, *generation_keys])
+    stamp = [_generation(key, found) for key in generation_keys]
+    cached: Optional[dict] = found.get(context_key)
+    if cached is not None and cached.get("stamp") == stamp:
+        return cached["text"]
+
+    text = build(user, conversation.context_module)
+    cache.set(context_key, {"stamp": stamp, "text": text}, CONTEXT_TTL)
+    return text
+
+
+# ── Invalidation ──────────────────────────────────────────────────
+
+def _bump(key: str) -> None:
+    cache.set(key, uuid.uuid4().hex, GENERATION_TTL)
+
+
+def invalidate_user(user_id) -> None:
+    """Every cached block of *user_id* (overall progress, tech debt) is stale."""
+    transaction.on_commit(partial(_bump, _user_generation_key(user_id)))
+
+
+def invalidate_module(module_id) -> None:
+    """Cached blocks for *module_id* (lessons, quiz, resource clicks) are stale."""
+    if module_id:
+        transaction.on_commit(partial(_bump, _module_generation_key(module_id)))
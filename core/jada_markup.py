@@ -0,0 +1,300 @@
+"""
+JADA reply markup
+=================
+JADA replies carry structured elements as bracketed markers — a quiz
+between ``[QUIZ_START]`` and ``[QUIZ_END]`` (questions opened by
+``[QUIZ_Qn]``), one ``[SINGLE_SELECT]`` / ``[MULTI_SELECT]`` /
+``[TRUE_FALSE]`` question, or a consultant ``[CAREER_RECOMMENDATION]``.
+Each reply used to be run through several ``[\\s\\S]*?`` regexes, each one
+re-scanning the whole text from every position; long replies with code
+blocks spent more time there than in the rest of the turn.
+
+* ``MarkupParser`` — ``feed`` it streamed chunks as they arrive; one
+  precompiled scan finds the markers (a marker split across chunks is
+  held back until it completes), and ``close`` extracts the quiz and the
+  interactive question from the collected offsets with plain string
+  slicing.
+* ``parse``        — the same for a complete reply.
+
+Both return ``(quiz_data, interactive_data, clean_reply)``, the payload
+structures of ``jada_chat``: the quiz is taken out first, then the
+interactive question from what is left, then the legacy "Choose one:"
+option list.  ``python manage.py jada_markup_benchmark`` times this against
+the regex extractors it replaced and checks both give the same output.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+_MARKER = re.compile(
+    r'\[(QUIZ_START|QUIZ_END|QUIZ_Q(\d+)|SINGLE_SELECT|MULTI_SELECT|TRUE_FALSE|CAREER_RECOMMENDATION)\]',
+    re.IGNORECASE,
+)
+# An unfinished marker at the end of a chunk: hold it back for the next one.
+_PARTIAL_MARKER = re.compile(r'\[[A-Za-z_0-9]*')
+_MAX_MARKER_LEN = 32
+
+_WHITESPACE = re.compile(r'\s*')
+_OPTION = re.compile(r'\s*\d+\.\s+.+\n?')
+_OPTION_START = re.compile(r'\s*\d+\.\s+')
+_OPTION_PREFIX = re.compile(r'^\s*\d+\.\s*')
+_BOLD_LABEL_DESC = re.compile(r'\*\*(.+?)\*\*\s*[-–—]\s*(.+)')
+_BOLD_LABEL = re.compile(r'\*\*(.+?)\*\*')
+_LEGACY_TRIGGER = re.compile(
+    r'(?:Choose one|Pick an option|Select one|Which would you prefer)[:\s]*\n',
+    re.IGNORECASE,
+)
+
+_SELECT_TYPES = {'SINGLE_SELECT': 'single', 'MULTI_SELECT': 'multi', 'TRUE_FALSE': 'boolean'}
+_TRUE_FALSE_OPTIONS = (('True', ''), ('False', ''))
+
+# (name, start, end, question number) — offsets into the reply text.
+Marker = Tuple[str, int, int, Optional[str]]
+
+
+def parse_option_line(line: str) -> Dict[str, str]:
+    """Parse '1. **Label** - Description' or '1. Label' into {label, description}."""
+    cleaned = _OPTION_PREFIX.sub('', line, count=1).strip()
+    m = _BOLD_LABEL_DESC.match(cleaned)
+    if m:
+        return {'label': m.group(1).strip(), 'description': m.group(2).strip()}
+    m = _BOLD_LABEL.match(cleaned)
+    if m:
+        return {'label': m.group(1).strip(), 'description': ''}
+    if ' - ' in cleaned:
+        label, description = cleaned.split(' - ', 1)
+        return {'label': label.strip(), 'description': description.strip()}
+    return {'label': cleaned, 'description': ''}
+
+
+def _true_false_options() -> List[Dict[str, str]]:
+    return [{'label': label, 'description': desc} for label, desc in _TRUE_FALSE_OPTIONS]
+
+
+def _options_end(text: str, pos: int, to_end: bool = False) -> Optional[int]:
+    """End of a run of two or more numbered option lines at *pos* (optionally closing the text)."""
+    count, end = 0, pos
+    m = _OPTION.match(text, end)
+    while m:
+        count, end = count + 1, m.end()
+        m = _OPTION.match(text, end)
+    if count < 2 or (to_end and text[end:].strip()):
+        return None
+    return end
+
+
+def _parse_options(block: str) -> List[Dict[str, str]]:
+    return [parse_option_line(line) for line in block.strip().splitlines() if line.strip()]
+
+
+def _lines_after_marker(text: str, marker_end: int):
+    """
+    Candidate bounds ``(start, end)`` of the line a marker introduces, best
+    first: only whitespace may follow the marker on its own line, and the
+    line starts after one of the newlines in that whitespace (the last one
+    first) with at least one character on it.  *end* is at the line's
+    newline or the text's end.
+    """
+    ws_end = _WHITESPACE.match(text, marker_end).end()
+    newline = text.rfind('\n', marker_end, ws_end)
+    while newline != -1:
+        start = newline + 1
+        if start < len(text) and text[start] != '\n':
+            end = text.find('\n', start)
+            yield start, len(text) if end == -1 else end
+        newline = text.rfind('\n', marker_end, newline)
+
+
+def _splice(text: str, markers: List[Marker], start: int, end: int) -> Tuple[str, List[Marker]]:
+    """
+    ``(text[:start].rstrip() + '\\n' + text[end:].strip()).strip()`` — the
+    reply with an extracted block cut out — and the markers outside the
+    block moved to their offsets in it.
+    """
+    before = text[:start].rstrip()
+    after_raw = text[end:]
+    after = after_raw.strip()
+    before_lead = len(before) - len(before.lstrip())
+    after_shift = (len(before) + 1 - before_lead if before else 0) - end - (len(after_raw) - len(after_raw.lstrip()))
+    moved = []
+    for name, m_start, m_end, number in markers:
+        if m_end <= start:
+            moved.append((name, m_start - before_lead, m_end - before_lead, number))
+        elif m_start >= end:
+            moved.append((name, m_start + after_shift, m_end + after_shift, number))
+    return (before + '\n' + after).strip(), moved
+
+
+# ── Extraction ────────────────────────────────────────────────────
+
+def _quiz_question(text: str, markers: List[Marker], number: str, start: int, end: int) -> Dict:
+    inner = [m for m in markers if start <= m[1] and m[2] <= end and m[0] in _SELECT_TYPES]
+    q_type, chosen = 'single', []
+    for name in ('SINGLE_SELECT', 'MULTI_SELECT', 'TRUE_FALSE'):
+        chosen = [m for m in inner if m[0] == name]
+        if chosen:
+            q_type = _SELECT_TYPES[name]
+            break
+
+    # Drop the type markers (and the whitespace after them) from the question body.
+    pieces, pos = [], start
+    for _, m_start, m_end, _ in chosen:
+        pieces.append(text[pos:m_start])
+        pos = _WHITESPACE.match(text, m_end, end).end()
+    pieces.append(text[pos:end])
+    content = ''.join(pieces).strip()
+
+    question_text = ''
+    option_lines = []
+    for line in content.splitlines():
+        if _OPTION_START.match(line):
+            option_lines.append(line)
+        elif not option_lines:
+            question_text += (' ' + line.strip()) if question_text else line.strip()
+
+    options = [parse_option_line(line) for line in option_lines]
+    if q_type == 'boolean' and not options:
+        options = _true_false_options()
+    return {'id': f'q{number}', 'type': q_type, 'question_text': question_text, 'options': options}
+
+
+def _extract_quiz(text: str, markers: List[Marker]):
+    start_marker = next((m for m in markers if m[0] == 'QUIZ_START'), None)
+    if start_marker is None:
+        return None, text, markers
+    title_end = text.find('\n', start_marker[2])
+    if title_end == -1:
+        return None, text, markers
+    end_marker = next((m for m in markers if m[0] == 'QUIZ_END' and m[1] > title_end), None)
+    if end_marker is None:
+        return None, text, markers
+
+    title = text[start_marker[2]:title_end].strip() or 'Quiz'
+    body = [m for m in markers if title_end < m[1] and m[2] <= end_marker[1]]
+    # Question markers are matched case-sensitively, as the quiz format spells them.
+    starts = [m for m in body if m[0] == 'QUIZ_Q' and text.startswith('[QUIZ_Q', m[1])]
+    questions = [
+        _quiz_question(text, body, q[3], q[2], nxt[1] if nxt else end_marker[1])
+        for q, nxt in zip(starts, starts[1:] + [None])
+    ]
+    if not questions:
+        return None, text, markers
+
+    clean, rest = _splice(text, markers, start_marker[1], end_marker[2])
+    return {'title': title, 'questions': questions}, clean, rest
+
+
+def _extract_select(text: str, markers: List[Marker]):
+    for name, m_start, m_end, _ in markers:
+        if name not in ('SINGLE_SELECT', 'MULTI_SELECT'):
+            continue
+        for line in _lines_after_marker(text, m_end):
+            opts_end = _options_end(text, line[1] + 1) if line[1] < len(text) else None
+            if opts_end is not None:
+                break
+        else:
+            continue
+        return {
+            'type': _SELECT_TYPES[name],
+            'question_text': text[line[0]:line[1]].strip(),
+            'options': _parse_options(text[line[1] + 1:opts_end]),
+            'include_other': True,
+        }, _splice(text, [], m_start, opts_end)[0]
+    return None
+
+
+def _extract_true_false(text: str, markers: List[Marker]):
+    for name, m_start, m_end, _ in markers:
+        if name != 'TRUE_FALSE':
+            continue
+        line = next(_lines_after_marker(text, m_end), None)
+        if line is None:
+            continue
+        after = text[line[1] + 1:].strip()
+        clean = (text[:m_start].rstrip() + ('\n' + after if after else '')).strip()
+        return {
+            'type': 'boolean',
+            'question_text': text[line[0]:line[1]].strip(),
+            'options': _true_false_options(),
+            'include_other': False,
+        }, clean
+    return None
+
+
+def _extract_legacy_choice(text: str):
+    # The option list has to close the reply, so only look for a trigger if it does.
+    tail = text.rstrip()
+    if not _OPTION.match(tail[tail.rfind('\n') + 1:]):
+        return None
+    for m in _LEGACY_TRIGGER.finditer(text):
+        opts_end = _options_end(text, m.end(), to_end=True)
+        if opts_end is None:
+            continue
+        question_text = ''
+        before_text = text[:m.start()].rstrip()
+        before_lines = before_text.splitlines()
+        if before_lines and before_lines[-1].strip().endswith('?'):
+            question_text = before_lines[-1].strip()
+            before_text = '\n'.join(before_lines[:-1]).rstrip()
+        return {
+            'type': 'single',
+            'question_text': question_text,
+            'options': _parse_options(text[m.end():opts_end]),
+            'include_other': True,
+        }, before_text
+    return None
+
+
+def _extract_interactive(text: str, markers: List[Marker]):
+    found = (
+        _extract_select(text, markers)
+        or _extract_true_false(text, markers)
+        or _extract_legacy_choice(text)
+    )
+    return found or (None, text)
+
+
+# ── Parsing ───────────────────────────────────────────────────────
+
+class MarkupParser:
+    """Incremental marker scan over a streamed reply; ``close`` extracts the structures."""
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0            # characters committed to _parts
+        self._pending = ''          # possible start of a marker split across chunks
+        self.markers: List[Marker] = []
+
+    def feed(self, chunk: str) -> None:
+        buffer = self._pending + chunk
+        scanned = 0
+        for m in _MARKER.finditer(buffer):
+            self.markers.append((
+                'QUIZ_Q' if m.group(2) else m.group(1).upper(),
+                self._length + m.start(),
+                self._length + m.end(),
+                m.group(2),
+            ))
+            scanned = m.end()
+        hold = buffer.rfind('[', scanned)
+        if hold == -1 or len(buffer) - hold > _MAX_MARKER_LEN or not _PARTIAL_MARKER.fullmatch(buffer, hold):
+            hold = len(buffer)
+        self._parts.append(buffer[:hold])
+        self._length += hold
+        self._pending = buffer[hold:]
+
+    def close(self):
+        """``(quiz_data, interactive_data, clean_reply)`` for everything fed."""
+        text = ''.join(self._parts) + self._pending
+        quiz_data, text, markers = _extract_quiz(text, self.markers)
+        interactive_data, text = _extract_interactive(text, markers)
+        return quiz_data, interactive_data, text
+
+
+def parse(reply: str):
+    """``(quiz_data, interactive_data, clean_reply)`` for a complete reply."""
+    parser = MarkupParser()
+    parser.feed(reply)
+    return parser.close()
@@ -0,0 +1,224 @@
+"""
+JADA conversation memory
+========================
+Replaying the last 20 messages verbatim made long technical threads (code
+blocks, stack traces) produce prompts that free models answer slowly or
+truncate.  Each ``JadaConversation`` instead keeps a rolling ``summary``
+of everything up to ``summarized_until``; a turn sends:
+
+    system prompt(s) + "Conversation so far: <summary>" + raw messages
+    after ``summarized_until`` + the new user message
+
+* ``history_messages``  — the summary + raw tail for a conversation.
+* ``maybe_refresh``     — called after each turn; once
+  ``SUMMARY_EVERY`` turns have piled up past the summary it schedules
+  ``tasks.refresh_jada_summary`` (Celery) to fold all but the last
+  ``RECENT_MESSAGES`` into the summary.
+* ``refresh_summary``   — the fold itself, run by that task.
+* ``fit_to_budget``     — enforces the prompt token budget of the
+  smallest-budget model in the cascade before the call.
+
+Token counts are estimated (~4 characters per token); the budgets sit well
+below the models' context windows so an estimate is good enough.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, Iterable, List
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from . import ai_governor, ai_ledger
+
+SUMMARY_EVERY = int(os.getenv("JADA_SUMMARY_EVERY", "4"))          # turns
+RECENT_MESSAGES = int(os.getenv("JADA_RECENT_MESSAGES", "6"))      # kept raw after a fold
+MAX_RAW_MESSAGES = 20       # tail cap if summaries fall behind (worker down)
+SUMMARY_MAX_TOKENS = 400
+SUMMARY_INPUT_CHARS = 2000  # per message, when folding into the summary
+
+# Prompt budget (input tokens) per model.  Free endpoints slow down and cut
+# replies short well before their advertised context window.
+MODEL_TOKEN_BUDGETS = {
+    "openrouter/aurora-alpha": 12000,
+    "stepfun/step-3.5-flash:free": 12000,
+    "nvidia/nemotron-3-nano-30b-a3b:free": 8000,
+    "gemini": 16000,
+}
+DEFAULT_TOKEN_BUDGET = int(os.getenv("JADA_PROMPT_TOKEN_BUDGET", "6000"))
+
+PENDING_TTL = 300
+TRUNCATION_MARK = "\n…[truncated]…\n"
+
+SUMMARY_PROMPT = (
+    "You maintain the running memory of a conversation between a learner and JADA, "
+    "an AI career coach. Merge the new messages into the existing summary.\n"
+    "Keep: the learner's goals, background, decisions made, open questions, "
+    "code/tools they are working with, and advice already given.\n"
+    "Drop: greetings, filler and full code listings (name the file/function instead).\n"
+    "Write at most 200 words of plain bullet points. Return only the summary.\n\n"
+    "EXISTING SUMMARY:\n{summary}\n\nNEW MESSAGES:\n{messages}\n"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text or "") // 4 + 1
+
+
+def _payload_tokens(messages: Iterable[Dict[str, str]]) -> int:
+    # ~4 tokens of framing per chat message
+    return sum(estimate_tokens(m["content"]) + 4 for m in messages)
+
+
+def budget_for(models: Iterable[str]) -> int:
+    """Budget that fits every model the payload may be sent to."""
+    return min(
+        (MODEL_TOKEN_BUDGETS.get(m, DEFAULT_TOKEN_BUDGET) for m in models),
+        default=DEFAULT_TOKEN_BUDGET,
+    )
+
+
+def history_messages(conversation) -> List[Dict[str, str]]:
+    """Chat-format history for *conversation*: summary + unsummarized tail."""
+    out: List[Dict[str, str]] = []
+    if conversation.summary:
+        out.append({
+            "role": "system",
+            "content": f"Conversation so far (summary of earlier messages):\n{conversation.summary}",
+        })
+    tail = list(
+        conversation.messages
+        .filter(id__gt=conversation.summarized_until)
+        .order_by('-created_at')[:MAX_RAW_MESSAGES]
+    )
+    tail.reverse()
+    for msg in tail:
+        out.append({
+            "role": "user" if msg.role == "user" else "assistant",
+            "content": msg.content,
+        })
+    return out
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Keep the head and tail of *text* within roughly *max_tokens*."""
+    max_chars = max(max_tokens, 1) * 4
+    if len(text) <= max_chars:
+        return text
+    keep = max(max_chars - len(TRUNCATION_MARK), 0)
+    head = keep * 2 // 3
+    return text[:head] + TRUNCATION_MARK + text[len(text) - (keep - head):]
+
+
+def fit_to_budget(messages: List[Dict[str, str]], budget: int) -> List[Dict[str, str]]:
+    """
+    Trim a chat payload to *budget* estimated tokens.
+
+    Leading system messages and the final user message are always kept.
+    The oldest history messages are dropped first (always keeping the
+    latest one), then the longest remaining messages are shortened.
+    """
+    if _payload_tokens(messages) <= budget:
+        return messages
+
+    lead = 0
+    while lead < len(messages) - 1 and messages[lead]["role"] == "system":
+        lead += 1
+    head, history, last = messages[:lead], list(messages[lead:-1]), messages[-1]
+
+    while len(history) > 1 and _payload_tokens(head + history + [last]) > budget:
+        history.pop(0)
+
+    trimmed = [dict(m) for m in head + history + [last]]
+    while _payload_tokens(trimmed) > budget:
+        longest = max(trimmed, key=lambda m: len(m["content"]))
+        excess = _payload_tokens(trimmed) - budget
+        target = estimate_tokens(longest["content"]) - excess
+        if target < 64 or len(longest["content"]) <= 256:
+            break       # nothing sensible left to cut; let the model cope
+        longest["content"] = _truncate(longest["content"], target)
+
+    dropped = len(messages) - len(trimmed)
+    print(f"[AI] JADA prompt trimmed to ~{_payload_tokens(trimmed)} tokens "
+          f"(budget {budget}, {dropped} messages dropped)")
+    return trimmed
+
+
+def _pending_key(conversation_id) -> str:
+    return f"jada_summary:pending:{conversation_id}"
+
+
+def maybe_refresh(conversation) -> bool:
+    """Schedule a summary refresh if enough turns piled up; True if scheduled."""
+    unsummarized = conversation.messages.filter(id__gt=conversation.summarized_until).count()
+    if unsummarized < RECENT_MESSAGES + 2 * SUMMARY_EVERY:
+        return False
+    # One refresh in flight per conversation.
+    if not cache.add(_pending_key(conversation.id), 1, PENDING_TTL):
+        return False
+
+    conversation_id = conversation.id
+    if os.getenv("CELERY_BROKER_URL"):
+        from .tasks import refresh_jada_summary
+        transaction.on_commit(lambda: refresh_jada_summary.delay(conversation_id))
+    else:
+        # No broker in local dev: fold on a daemon thread so the reply isn't delayed.
+        transaction.on_commit(lambda: threading.Thread(
+            target=refresh_summary, args=(conversation_id,), daemon=True,
+        ).start())
+    return True
+
+
+@ai_governor.prioritized("background")
+@ai_ledger.tagged("jada_summary")
+def refresh_summary(conversation_id) -> bool:
+    """Fold all but the last ``RECENT_MESSAGES`` unsummarized messages into the summary."""
+    from .models import JadaConversation
+    from .openrouter_client import chat_completions_cascade, OpenRouterError
+
+    try:
+        conversation = JadaConversation.objects.filter(id=conversation_id).first()
+        if conversation is None:
+            return False
+        pending = list(
+            conversation.messages
+            .filter(id__gt=conversation.summarized_until)
+            .order_by('created_at')
+        )
+        to_fold = pending[:-RECENT_MESSAGES] if RECENT_MESSAGES else pending
+        if not to_fold:
+            return False
+
+        transcript = "\n\n".join(
+            f"{'Learner' if m.role == 'user' else 'JADA'}: {_truncate(m.content, SUMMARY_INPUT_CHARS // 4)}"
+            for m in to_fold
+        )
+        prompt = SUMMARY_PROMPT.format(summary=conversation.summary or "(none yet)", messages=transcript)
+        try:
+            summary, model_used = chat_completions_cascade(
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.3,
+                max_tokens=SUMMARY_MAX_TOKENS,
+                timeout=60,
+            )
+        except OpenRouterError as e:
+            print(f"[AI] JADA summary refresh failed for conversation {conversation_id}: {e}")
+            return False
+
+        # Concurrent refreshes can't double-fold: only advance from the cursor we read.
+        updated = JadaConversation.objects.filter(
+            id=conversation.id, summarized_until=conversation.summarized_until,
+        ).update(
+            summary=summary.strip(),
+            summarized_until=to_fold[-1].id,
+            summary_updated_at=timezone.now(),
+        )
+        if updated:
+            print(f"[AI] JADA summary for conversation {conversation_id} folded "
+                  f"{len(to_fold)} messages with {model_used}")
+        return bool(updated)
+    finally:
+        cache.delete(_pending_key(conversation_id))
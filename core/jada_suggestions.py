@@ -0,0 +1,166 @@
+"""
+Pre-answered JADA suggestions
+=============================
+``views._generate_suggestions`` offers the same follow-up prompts to
+everyone on a module ("What are the key concepts in {label}?"), and
+learners click them constantly — each click a full cascade call whose
+answer only depends on the module.  Those templated prompts are answered
+once per (module label, template), kept in ``ai_cache`` and served
+without a model call when a message matches one exactly.
+
+* ``lookup``   — the cached answer for a message, if it is one of its
+  module's ``TEMPLATES``; stale or missing answers get a background
+  refresh.
+* ``warm``     — called when suggestions are offered, so an answer is
+  usually ready before the first click.
+* ``refresh``  — generate one answer (``tasks.refresh_jada_suggestion``,
+  low priority).
+
+Answers are generic to the module — no learner progress or conversation
+history goes into them — which is why only suggestions that don't ask
+about the learner are templated here.  Failed generations are not
+stored; the click then simply goes through the cascade as before.
+"""
+
+import os
+import threading
+import time
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+from . import ai_cache, ai_governor, ai_ledger, catalog_index
+
+CACHE_KIND = "jada_suggestion"
+REFRESH_AFTER = int(os.getenv("JADA_SUGGESTION_REFRESH_HOURS", "24")) * 3600
+REFRESH_PRIORITY = 9
+DEDUPE_TTL = 600
+
+# Suggestions whose answer depends only on the module, by template key.
+TEMPLATES = {
+    "key_concepts": "What are the key concepts in {label}?",
+    "project": "What project should I build for this module?",
+    "advanced_tips": "Give me advanced tips for {label}",
+}
+
+GENERIC_CONTEXT = (
+    "The learner is working on the module '{label}' — {description}. "
+    "This answer is shared by every learner on the module: do not assume their progress, "
+    "do not refer to earlier messages, and do not ask which module they mean."
+)
+
+
+def text(template_key: str, module) -> str:
+    """The suggestion as offered for *module*."""
+    return TEMPLATES[template_key].format(label=module.label or "this module")
+
+
+def _norm(value: str) -> str:
+    return " ".join((value or "").split()).casefold()
+
+
+def _inputs(template_key: str, module_label: str) -> dict:
+    return {"template": template_key, "module_label": module_label}
+
+
+def _is_stale(answer: dict) -> bool:
+    return time.time() - answer.get("generated_at", 0) > REFRESH_AFTER
+
+
+def match(message: str, module) -> Optional[str]:
+    """Template key of *module*'s suggestion that *message* is, or None."""
+    if module is None or not module.label:
+        return None
+    wanted = _norm(message)
+    return next((key for key in TEMPLATES if _norm(text(key, module)) == wanted), None)
+
+
+# ── Serving ───────────────────────────────────────────────────────
+
+def lookup(message: str, module) -> Optional[dict]:
+    """``{"reply", "model_used", "generated_at"}`` if *message* is a pre-answered suggestion."""
+    template_key = match(message, module)
+    if template_key is None:
+        return None
+    answer = ai_cache.get(CACHE_KIND, _inputs(template_key, module.label))
+    if answer is None or _is_stale(answer):
+        schedule_refresh(template_key, module)
+    return answer
+
+
+def warm(module, suggestions: Iterable[str]) -> None:
+    """Queue answers for the templated *suggestions* offered on *module* that aren't cached."""
+    if module is None or not module.label:
+        return
+    offered = set(suggestions)
+    keys = [key for key in TEMPLATES if text(key, module) in offered]
+    if not keys:
+        return
+    found = ai_cache.get_many(CACHE_KIND, [_inputs(key, module.label) for key in keys], count=False)
+    for key, answer in zip(keys, found):
+        if answer is None or _is_stale(answer):
+            schedule_refresh(key, module)
+
+
+# ── Background refresh ────────────────────────────────────────────
+
+def _dispatch(*args):
+    from .tasks import refresh_jada_suggestion
+
+    if not os.getenv("CELERY_BROKER_URL"):
+        threading.Thread(target=refresh, args=args, daemon=True).start()
+        return
+    try:
+        refresh_jada_suggestion.apply_async(args=list(args), priority=REFRESH_PRIORITY, retry=False)
+    except Exception as e:
+        print(f"[AI] Could not queue JADA suggestion refresh {args[:2]}: {e}")
+
+
+def schedule_refresh(template_key: str, module) -> None:
+    """Queue a regeneration of one answer (at most once per ``DEDUPE_TTL``)."""
+    dedupe_key = ai_cache.make_key(CACHE_KIND, _inputs(template_key, module.label)) + ":refresh"
+    if cache.add(dedupe_key, 1, DEDUPE_TTL):
+        args = (template_key, module.label, module.description or "")
+        transaction.on_commit(lambda: _dispatch(*args))
+
+
+@ai_governor.prioritized("background")
+@ai_ledger.tagged("jada_suggestion")
+def refresh(template_key: str, module_label: str, module_description: str) -> bool:
+    """Generate and cache the answer to one templated suggestion."""
+    from .model_health import rank_models
+    from .openrouter_client import OpenRouterError, chat_completions_cascade
+    from .views import JADA_CASUAL_CASCADE, JADA_SYSTEM_PROMPT
+
+    question = TEMPLATES[template_key].format(label=module_label)
+    messages = [
+        {"role": "system", "content": JADA_SYSTEM_PROMPT},
+        {"role": "system", "content": GENERIC_CONTEXT.format(label=module_label, description=module_description)},
+    ]
+    grounding = catalog_index.grounding(question, module=module_label)
+    if grounding:
+        messages.append({"role": "system", "content": grounding})
+    messages.append({"role": "user", "content": question})
+
+    try:
+        reply, model_used = chat_completions_cascade(
+            messages=messages,
+            models=rank_models(list(JADA_CASUAL_CASCADE)),
+            temperature=0.7,
+            max_tokens=1024,
+            timeout=60,
+        )
+    except OpenRouterError as e:
+        print(f"[AI] JADA suggestion '{template_key}' for {module_label} failed: {e}")
+        return False
+    if not (reply or "").strip():
+        return False
+
+    ai_cache.put(CACHE_KIND, _inputs(template_key, module_label), {
+        "reply": reply,
+        "model_used": model_used,
+        "generated_at": time.time(),
+    })
+    print(f"[AI] JADA suggestion '{template_key}' for {module_label} answered by {model_used}")
+    return True
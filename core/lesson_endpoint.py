@@ -1,23 +1,22 @@
 # Add this to core/views.py
 
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
-from .lesson_generator import generate_lessons_for_module
+from django.http import JsonResponse
+from .async_api import async_api_view
+from .lesson_plans import aget_or_generate, lessons_for_item
 from .posthog_client import ph_capture
-from django.utils import timezone
-from datetime import timedelta
+from .throttles import ai_throttles
 
-@api_view(['POST', 'GET'])
-@permission_classes([IsAuthenticated])
-def generate_module_lessons(request, module_id):
+@async_api_view(['POST', 'GET'], throttle_classes=ai_throttles())
+async def generate_module_lessons(request, module_id):
     """
-    Generate or retrieve cached AI-powered lessons for a specific module.
+    Generate or retrieve AI-powered lessons for a specific module.
     
-    GET /api/modules/{module_id}/generate-lessons/  — retrieve cached lessons
-    POST /api/modules/{module_id}/generate-lessons/ — regenerate new lessons
+    GET /api/modules/{module_id}/generate-lessons/  — retrieve stored lessons
+    POST /api/modules/{module_id}/generate-lessons/ — attach the shared lesson plan,
+                                                      generating it on first use
     
-    Implements TTL caching: lessons cached for 24 hours before regeneration.
+    Lessons come from a LessonPlan shared by every user with the same module,
+    level, platform and tech stack; stale plans are refreshed in the background.
     
     Returns: List of lesson objects with resources
     """
@@ -26,61 +25,58 @@ def generate_module_lessons(request, module_id):
     try:
         # Get the module
         from .models import UserRoadmapItem
-        module = UserRoadmapItem.objects.get(id=module_id, user=user)
+        module = await UserRoadmapItem.objects.select_related('lesson_plan').aget(id=module_id, user=user)
         
-        # Check if we have valid cached lessons (GET or if cache is fresh)
-        if request.method == 'GET' or (
-            module.lesson_data 
-            and module.lesson_cached_at 
-            and (timezone.now() - module.lesson_cached_at) < timedelta(hours=24)
-        ):
-            # Return cached lessons
-            lessons = module.lesson_data or []
-            
-            return Response({
+        if request.method == 'GET':
+            # Return stored lessons (shared plan, or legacy per-item data)
+            lessons = lessons_for_item(module)
+            plan = module.lesson_plan
+            return JsonResponse({
                 "module_id": module_id,
                 "lessons": lessons,
                 "count": len(lessons),
                 "cached": True,
-                "cached_at": module.lesson_cached_at,
+                "cached_at": plan.generated_at if plan else module.lesson_cached_at,
+                "version": plan.version if plan else None,
             })
         
-        # Generate new lessons (POST or cache expired)
-        lessons = generate_lessons_for_module(
+        plan, lessons, generated = await aget_or_generate(
             module_title=module.label,
             module_description=module.description,
             user_level=user.current_level or "intermediate",
-            learning_platform=request.data.get('platform', 'freeCodeCamp'),
-            tech_stack=module.label.split()[0] if module.label else "JavaScript"
+            platform=request.data.get('platform', 'freeCodeCamp'),
+            tech_stack=module.label.split()[0] if module.label else "JavaScript",
         )
         
-        # Cache the lessons
-        module.lesson_data = lessons
-        module.lesson_cached_at = timezone.now()
-        module.save(update_fields=['lesson_data', 'lesson_cached_at'])
+        # Point the item at the shared plan (fallback lessons are not stored)
+        if plan is not None and module.lesson_plan_id != plan.id:
+            module.lesson_plan = plan
+            await module.asave(update_fields=['lesson_plan'])
 
-        # PostHog: track lesson generation
-        ph_capture(user, 'lesson_generated', {
-            'module_id': module_id,
-            'module_label': module.label,
-            'lesson_count': len(lessons),
-        })
+        if generated:
+            # PostHog: track lesson generation
+            ph_capture(user, 'lesson_generated', {
+                'module_id': module_id,
+                'module_label': module.label,
+                'lesson_count': len(lessons),
+            })
         
-        return Response({
+        return JsonResponse({
             "module_id": module_id,
             "lessons": lessons,
             "count": len(lessons),
-            "cached": False,
+            "cached": not generated,
+            "cached_at": plan.generated_at if plan else None,
+            "version": plan.version if plan else None,
         })
         
     except UserRoadmapItem.DoesNotExist:
-        return Response({"error": "Module not found"}, status=404)
+        return JsonResponse({"error": "Module not found"}, status=404)
     except Exception as e:
         import traceback
         print(f"Lesson generation error: {e}")
         traceback.print_exc()
-        return Response({
+        return JsonResponse({
             "error": str(e),
             "type": type(e).__name__
         }, status=500)
-
@@ -3,12 +3,27 @@ AI Lesson Generation Service
 Generates personalized micro-learning content for roadmap modules
 """
 
-import json
 import os
+import time
 from typing import List, Dict, Any
 import google.generativeai as genai
 
-from .openrouter_client import chat_completions_cascade, OpenRouterError
+from .openrouter_client import OpenRouterError, HEDGE_DELAY_SECONDS
+from .openrouter_async import CASCADE
+from . import ai_cache, ai_flow, ai_governor, ai_ledger, deadlines, structured_output
+
+LESSON_PLAN_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "title": {"type": "string", "minLength": 1},
+            "description": {"type": "string"},
+        },
+        "required": ["title", "description"],
+    },
+    "minItems": 1,
+}
 
 # Configure Gemini API
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
@@ -16,27 +31,13 @@ if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
 
 
-def generate_lessons_for_module(
+def _lesson_plan_prompt(
     module_title: str,
     module_description: str,
-    user_level: str = "intermediate",
-    learning_platform: str = "freeCodeCamp",
-    tech_stack: str = "JavaScript"
-) -> List[Dict[str, Any]]:
-    """
-    Generate AI-powered lesson plan for a module
-    
-    Args:
-        module_title: Title of the module
-        module_description: Description of what the module covers
-        user_level: User's experience level (novice, apprentice, pro, expert)
-        learning_platform: User's preferred learning platform
-        tech_stack: Primary technology/language for the module
-    
-    Returns:
-        List of lesson dictionaries with structure matching frontend expectations
-    """
-    
+    user_level: str,
+    learning_platform: str,
+    tech_stack: str,
+) -> str:
     prompt = f"""You are an expert curriculum designer creating a micro-learning lesson plan.
 
 **Module Information:**
@@ -123,51 +124,142 @@ Example structure:
 ]
 
 Generate the complete lesson plan now:"""
+    return prompt
+
+
+def _parse_lessons(lessons_json: str) -> List[Dict[str, Any]]:
+    """Decode the model's JSON array and add the per-user progress fields."""
+    lessons = structured_output.parse(lessons_json, LESSON_PLAN_SCHEMA, expect=list)
 
+    # Validate and enrich lessons
+    for lesson in lessons:
+        lesson['is_completed'] = False
+        lesson['confidence_rating'] = None
+        lesson['completed_at'] = None
+
+    return lessons
+
+
+def _sdk_lesson_text(prompt: str) -> str:
+    """Gemini SDK fallback for the sync path."""
+    if not GEMINI_API_KEY:
+        raise RuntimeError("No OpenRouter response and GEMINI_API_KEY missing")
+    model = genai.GenerativeModel('gemini-pro')
+    sdk_timeout = deadlines.timeout(120, "Gemini")
+    started = time.monotonic()
     try:
-        lessons_json = None
+        with ai_governor.slot("gemini", "gemini-pro", hold=sdk_timeout):
+            response = model.generate_content(prompt, request_options={"timeout": sdk_timeout})
+        text = response.text or ''
+    except Exception as e:
+        ai_ledger.record(provider="gemini", model="gemini-pro", latency=time.monotonic() - started,
+                         outcome="error", error=str(e))
+        raise
+    usage = getattr(response, "usage_metadata", None)
+    ai_ledger.record(
+        provider="gemini", model="gemini-pro", latency=time.monotonic() - started, outcome="ok",
+        prompt_tokens=getattr(usage, "prompt_token_count", None),
+        completion_tokens=getattr(usage, "candidates_token_count", None),
+    )
+    return text
+
+
+async def _rest_lesson_text(prompt: str) -> str:
+    """Gemini over REST for the async path (the SDK has no asyncio client)."""
+    from .ai_logic import _acall_gemini_text
+    return await _acall_gemini_text(prompt, temperature=0.7)
+
+
+def _lesson_plan_flow(module_title, module_description, user_level, learning_platform, tech_stack, variant):
+    cache_inputs = {
+        "module": module_title, "description": module_description, "level": user_level,
+        "platform": learning_platform, "stack": tech_stack, "variant": variant,
+    }
+    cached = yield ai_flow.call(ai_cache.GET, "lesson_plan", cache_inputs)
+    if cached is not None:
+        return cached
+
+    def _generate():
+        prompt = _lesson_plan_prompt(module_title, module_description, user_level, learning_platform, tech_stack)
 
-        # Primary: Free model cascade (DeepSeek R1 → Gemma 3 27B)
         try:
-            lessons_json, model_used = chat_completions_cascade(
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=2200,
-                timeout=90,
-            )
-            lessons_json = lessons_json.strip()
-            print(f"[AI] Lesson generation succeeded with {model_used}")
-        except OpenRouterError as e:
-            print(f"OpenRouter lesson generation failed, falling back to Gemini SDK: {e}")
-
-        # Fallback: Gemini SDK (existing)
-        if not lessons_json:
-            if not GEMINI_API_KEY:
-                raise RuntimeError("No OpenRouter response and GEMINI_API_KEY missing")
-            model = genai.GenerativeModel('gemini-pro')
-            response = model.generate_content(prompt)
-            lessons_json = (response.text or '').strip()
-
-        # Remove markdown code blocks if present
-        if lessons_json.startswith('```'):
-            lessons_json = lessons_json.split('```')[1]
-            if lessons_json.startswith('json'):
-                lessons_json = lessons_json[4:]
-
-        lessons = json.loads(lessons_json)
-
-        # Validate and enrich lessons
-        for lesson in lessons:
-            lesson['is_completed'] = False
-            lesson['confidence_rating'] = None
-            lesson['completed_at'] = None
-
-        return lessons
-        
-    except Exception as e:
-        print(f"Error generating lessons: {e}")
-        # Return fallback lessons if AI fails
-        return generate_fallback_lessons(module_title, module_description)
+            lessons_json = None
+
+            # Primary: Free model cascade (DeepSeek R1 → Gemma 3 27B)
+            try:
+                lessons_json, model_used = yield ai_flow.call(
+                    CASCADE,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.7,
+                    max_tokens=2200,
+                    timeout=90,
+                    hedge_delay=HEDGE_DELAY_SECONDS,
+                )
+                lessons_json = lessons_json.strip()
+                print(f"[AI] Lesson generation succeeded with {model_used}")
+            except OpenRouterError as e:
+                print(f"OpenRouter lesson generation failed, falling back to Gemini: {e}")
+
+            # Fallback: Gemini
+            if not lessons_json:
+                lessons_json = (yield ai_flow.call(GEMINI_LESSON_TEXT, prompt)).strip()
+
+            lessons = _parse_lessons(lessons_json)
+            yield ai_flow.call(ai_cache.PUT, "lesson_plan", cache_inputs, lessons)
+            return lessons
+
+        except Exception as e:
+            print(f"Error generating lessons: {e}")
+            # Return fallback lessons if AI fails
+            return generate_fallback_lessons(module_title, module_description)
+
+    return (yield ai_flow.single_flight(ai_cache.make_key("lesson_plan", cache_inputs), _generate))
+
+
+GEMINI_LESSON_TEXT = (_sdk_lesson_text, _rest_lesson_text)
+
+
+@ai_ledger.tagged("lesson_plan")
+def generate_lessons_for_module(
+    module_title: str,
+    module_description: str,
+    user_level: str = "intermediate",
+    learning_platform: str = "freeCodeCamp",
+    tech_stack: str = "JavaScript",
+    variant: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Generate AI-powered lesson plan for a module
+    
+    Args:
+        module_title: Title of the module
+        module_description: Description of what the module covers
+        user_level: User's experience level (novice, apprentice, pro, expert)
+        learning_platform: User's preferred learning platform
+        tech_stack: Primary technology/language for the module
+        variant: Different (still shared) generation; bumped to refresh a LessonPlan
+    
+    Returns:
+        List of lesson dictionaries with structure matching frontend expectations
+    """
+    return ai_flow.run(_lesson_plan_flow(
+        module_title, module_description, user_level, learning_platform, tech_stack, variant,
+    ))
+
+
+@ai_ledger.tagged("lesson_plan")
+async def agenerate_lessons_for_module(
+    module_title: str,
+    module_description: str,
+    user_level: str = "intermediate",
+    learning_platform: str = "freeCodeCamp",
+    tech_stack: str = "JavaScript",
+    variant: int = 0,
+) -> List[Dict[str, Any]]:
+    """Async ``generate_lessons_for_module`` for views served through asgi.py."""
+    return await ai_flow.arun(_lesson_plan_flow(
+        module_title, module_description, user_level, learning_platform, tech_stack, variant,
+    ))
 
 
 def generate_fallback_lessons(module_title: str, module_description: str) -> List[Dict[str, Any]]:
@@ -0,0 +1,197 @@
+"""
+Shared lesson plans
+===================
+AI lesson plans used to live in ``UserRoadmapItem.lesson_data`` with a 24h
+TTL, so every user regenerated the same module every day.  A ``LessonPlan``
+is now stored once per (module label, user level, platform, tech stack)
+and roadmap items point at it.
+
+* ``get_or_generate`` / ``aget_or_generate`` — the plan for a key,
+  generating it on first use.  Stale plans are returned immediately and
+  refreshed in the background (stale-while-revalidate).
+* ``refresh``        — regenerate a plan as ``version + 1``; run by
+  ``tasks.refresh_lesson_plan`` at low priority.
+* ``lessons_for_item`` — an item's lessons: its plan, else legacy
+  ``lesson_data``.
+
+A plan is stale after ``LESSON_PLAN_REFRESH_DAYS`` or when the lesson prompt
+template (``ai_cache.POLICIES['lesson_plan']['version']``) has moved on.
+Fallback lessons are never stored, so a failed generation is retried on
+the next request instead of being shared.
+"""
+
+import os
+import threading
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import ai_cache, ai_governor
+from .lesson_generator import (
+    agenerate_lessons_for_module,
+    generate_fallback_lessons,
+    generate_lessons_for_module,
+)
+
+REFRESH_AFTER = timedelta(days=int(os.getenv("LESSON_PLAN_REFRESH_DAYS", "7")))
+REFRESH_PRIORITY = 9
+REFRESH_DEDUPE_TTL = 3600
+
+
+def _norm(value):
+    return " ".join((value or "").split()).casefold()
+
+
+def plan_key(module_label, user_level, platform, tech_stack):
+    return {
+        "module_label": _norm(module_label)[:200],
+        "user_level": _norm(user_level)[:50],
+        "platform": _norm(platform)[:100],
+        "tech_stack": _norm(tech_stack)[:100],
+    }
+
+
+def _template_version():
+    return ai_cache.POLICIES["lesson_plan"]["version"]
+
+
+def is_stale(plan):
+    return (
+        plan.template_version != _template_version()
+        or timezone.now() - plan.generated_at > REFRESH_AFTER
+    )
+
+
+def lessons_for_item(item):
+    """Lessons for a roadmap item (select_related('lesson_plan') in async code)."""
+    if item.lesson_plan_id:
+        return item.lesson_plan.lessons or []
+    return item.lesson_data if isinstance(item.lesson_data, list) else []
+
+
+def _is_fallback(lessons, module_title, module_description):
+    return lessons == generate_fallback_lessons(module_title, module_description)
+
+
+def _store(key, lessons):
+    """Create the plan for *key*; if another worker won the race, return theirs."""
+    from .models import LessonPlan
+
+    try:
+        with transaction.atomic():
+            return LessonPlan.objects.create(
+                **key, lessons=lessons, template_version=_template_version(),
+            )
+    except IntegrityError:
+        return LessonPlan.objects.get(**key)
+
+
+def _dispatch_refresh(plan_id):
+    from .tasks import refresh_lesson_plan
+
+    if not os.getenv("CELERY_BROKER_URL"):
+        threading.Thread(target=refresh, args=(plan_id,), daemon=True).start()
+        return
+    try:
+        refresh_lesson_plan.apply_async(args=[plan_id], priority=REFRESH_PRIORITY, retry=False)
+    except Exception as e:
+        print(f"[AI] Could not queue lesson plan refresh {plan_id}: {e}")
+
+
+def schedule_refresh(plan):
+    """Queue a background regeneration of *plan* (at most once per hour)."""
+    if cache.add(f"lesson_plan:refresh:{plan.id}", 1, REFRESH_DEDUPE_TTL):
+        plan_id = plan.id
+        transaction.on_commit(lambda: _dispatch_refresh(plan_id))
+
+
+def _lookup(key):
+    from .models import LessonPlan
+
+    plan = LessonPlan.objects.filter(**key).first()
+    if plan is not None and is_stale(plan):
+        schedule_refresh(plan)
+    return plan
+
+
+def get_or_generate(module_title, module_description, user_level, platform, tech_stack):
+    """
+    Return ``(plan, lessons, generated)``.  *plan* is None only when
+    generation fell back to the offline lessons (which are not stored).
+    """
+    key = plan_key(module_title, user_level, platform, tech_stack)
+    plan = _lookup(key)
+    if plan is not None:
+        return plan, plan.lessons, False
+
+    lessons = generate_lessons_for_module(
+        module_title=module_title,
+        module_description=module_description,
+        user_level=user_level,
+        learning_platform=platform,
+        tech_stack=tech_stack,
+    )
+    if _is_fallback(lessons, module_title, module_description):
+        return None, lessons, True
+    return _store(key, lessons), lessons, True
+
+
+async def aget_or_generate(module_title, module_description, user_level, platform, tech_stack):
+    """Async ``get_or_generate`` for views served through asgi.py."""
+    key = plan_key(module_title, user_level, platform, tech_stack)
+    plan = await sync_to_async(_lookup, thread_sensitive=False)(key)
+    if plan is not None:
+        return plan, plan.lessons, False
+
+    lessons = await agenerate_lessons_for_module(
+        module_title=module_title,
+        module_description=module_description,
+        user_level=user_level,
+        learning_platform=platform,
+        tech_stack=tech_stack,
+    )
+    if _is_fallback(lessons, module_title, module_description):
+        return None, lessons, True
+    return await sync_to_async(_store, thread_sensitive=False)(key, lessons), lessons, True
+
+
+@ai_governor.prioritized("background")
+def refresh(plan_id):
+    """
+    Regenerate a plan as a new version; keeps the old lessons if generation
+    fails.  The refresh claim is left to expire, which also backs off retries.
+    """
+    from .models import LessonPlan
+
+    plan = LessonPlan.objects.filter(id=plan_id).first()
+    if plan is None:
+        return False
+    # Any roadmap item with this plan supplies the full module description.
+    item = plan.roadmap_items.only('label', 'description').first()
+    title = item.label if item else plan.module_label
+    description = item.description if item else ""
+
+    lessons = generate_lessons_for_module(
+        module_title=title,
+        module_description=description,
+        user_level=plan.user_level,
+        learning_platform=plan.platform,
+        tech_stack=plan.tech_stack,
+        variant=plan.version,       # a new shared generation, not the cached one
+    )
+    if _is_fallback(lessons, title, description):
+        print(f"[AI] Lesson plan {plan_id} refresh failed; keeping v{plan.version}")
+        return False
+
+    updated = LessonPlan.objects.filter(id=plan.id, version=plan.version).update(
+        lessons=lessons,
+        version=plan.version + 1,
+        template_version=_template_version(),
+        generated_at=timezone.now(),
+    )
+    if updated:
+        print(f"[AI] Lesson plan {plan_id} refreshed to v{plan.version + 1}")
+    return bool(updated)
@@ -0,0 +1,220 @@
+import json
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+from core.model_health import _percentile
+from core.models import User, UserRoadmapItem
+
+SCENARIOS = ('jada', 'jada_stream', 'roadmap', 'lessons', 'quiz')
+BENCH_USER_PREFIX = 'bench-'
+
+
+class _Occupancy:
+    """Time-weighted in-flight request count, and busy share of *workers*."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.in_flight = self.peak = 0
+        self.area = self.busy_area = 0.0
+        self.started = self.last = time.monotonic()
+
+    def _advance(self):
+        now = time.monotonic()
+        self.area += self.in_flight * (now - self.last)
+        if self.workers:
+            self.busy_area += min(self.in_flight, self.workers) * (now - self.last)
+        self.last = now
+
+    def enter(self):
+        with self.lock:
+            self._advance()
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def leave(self):
+        with self.lock:
+            self._advance()
+            self.in_flight -= 1
+
+    def summary(self):
+        with self.lock:
+            self._advance()
+            elapsed = max(self.last - self.started, 1e-9)
+            out = {"mean_in_flight": round(self.area / elapsed, 2), "peak_in_flight": self.peak}
+            if self.workers:
+                out["worker_occupancy"] = round(self.busy_area / (elapsed * self.workers), 3)
+            return out
+
+
+class Command(BaseCommand):
+    help = 'Drives the AI views of a running server and reports throughput, occupancy and tail latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', choices=SCENARIOS)
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server under test')
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--unique', action='store_true',
+                            help='Distinct inputs per request (defeats ai_cache/question bank)')
+        parser.add_argument('--workers', type=int, default=0,
+                            help='Server worker count, to report worker occupancy')
+        parser.add_argument('--fake-url', help='fake_llm_server base URL; resets and reports its stats')
+        parser.add_argument('--timeout', type=float, default=180)
+        parser.add_argument('--poll-interval', type=float, default=0.5, help='roadmap-status polling (seconds)')
+        parser.add_argument('--keep', action='store_true', help='Keep the bench users and their data')
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        scenario = options['scenario']
+        total, concurrency = options['requests'], max(1, options['concurrency'])
+        if total < 1:
+            raise CommandError("--requests must be at least 1")
+        run_id = uuid.uuid4().hex[:6]
+
+        # One user per concurrent slot so roadmap runs don't overwrite each other.
+        users = queue.Queue()
+        tokens = {}
+        for i in range(concurrency):
+            user, _ = User.objects.get_or_create(
+                username=f"{BENCH_USER_PREFIX}{i}",
+                defaults={'email': f"{BENCH_USER_PREFIX}{i}@bench.invalid", 'current_level': 'intermediate'},
+            )
+            tokens[user.id] = str(RefreshToken.for_user(user).access_token)
+            users.put(user)
+
+        def label(n):
+            return f"Bench Module {run_id}-{n}" if options['unique'] else "Bench Module"
+
+        client = httpx.Client(base_url=options['base_url'], timeout=options['timeout'])
+        fake = httpx.Client(base_url=options['fake_url'], timeout=10) if options['fake_url'] else None
+        if fake is not None:
+            fake.post('/__reset')
+
+        occupancy = _Occupancy(options['workers'])
+        latencies, statuses, errors = [], {}, []
+        results_lock = threading.Lock()
+
+        def one(n):
+            user = users.get()
+            headers = {'Authorization': f"Bearer {tokens[user.id]}"}
+            try:
+                item = None
+                if scenario in ('lessons', 'quiz'):
+                    # A fresh item each time: the stored Quiz / plan link must not short-circuit the view
+                    item = UserRoadmapItem.objects.create(
+                        user=user, label=label(n), description="Benchmark module", status='active',
+                    )
+                occupancy.enter()
+                started = time.monotonic()
+                try:
+                    status = self._request(client, scenario, headers, n, item, run_id, options)
+                finally:
+                    occupancy.leave()
+                elapsed = time.monotonic() - started
+                with results_lock:
+                    latencies.append(int(elapsed * 1000))
+                    statuses[status] = statuses.get(status, 0) + 1
+            except Exception as e:
+                with results_lock:
+                    errors.append(str(e))
+                    statuses['exception'] = statuses.get('exception', 0) + 1
+            finally:
+                users.put(user)
+
+        self.stderr.write(f"{scenario}: {total} requests, concurrency {concurrency} -> {options['base_url']}")
+        wall_started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(total)))
+        wall = time.monotonic() - wall_started
+        client.close()
+
+        report = {
+            "scenario": scenario,
+            "requests": total,
+            "concurrency": concurrency,
+            "unique_inputs": options['unique'],
+            "wall_seconds": round(wall, 2),
+            "throughput_rps": round(total / wall, 2),
+            "statuses": statuses,
+            "latency_ms": {
+                "p50": _percentile(latencies, 50),
+                "p90": _percentile(latencies, 90),
+                "p95": _percentile(latencies, 95),
+                "p99": _percentile(latencies, 99),
+                "max": max(latencies) if latencies else None,
+            },
+            **occupancy.summary(),
+        }
+        if fake is not None:
+            report["llm"] = fake.get('/__stats').json()
+            fake.close()
+        if errors:
+            report["sample_errors"] = errors[:5]
+
+        if not options['keep']:
+            User.objects.filter(username__startswith=BENCH_USER_PREFIX).delete()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(
+            f"{report['throughput_rps']} req/s over {report['wall_seconds']}s  "
+            f"statuses={report['statuses']}"
+        )
+        lat = report['latency_ms']
+        self.stdout.write(
+            f"latency ms  p50={lat['p50']}  p90={lat['p90']}  p95={lat['p95']}  p99={lat['p99']}  max={lat['max']}"
+        )
+        line = f"in flight   mean={report['mean_in_flight']}  peak={report['peak_in_flight']}"
+        if 'worker_occupancy' in report:
+            line += f"  worker occupancy={report['worker_occupancy']:.0%} of {options['workers']}"
+        self.stdout.write(line)
+        if 'llm' in report:
+            llm = report['llm']
+            self.stdout.write(
+                f"LLM calls   {llm['requests']}  peak concurrent={llm['peak_in_flight']}  outcomes={llm['outcomes']}"
+            )
+
+    def _request(self, client, scenario, headers, n, item, run_id, options):
+        """Issue one scenario request; returns the final HTTP status."""
+        if scenario in ('jada', 'jada_stream'):
+            message = "How should I structure a REST API project?"
+            if options['unique']:
+                message += f" ({run_id}-{n})"
+            path = '/api/jada/chat/' if scenario == 'jada' else '/api/jada/chat/stream/'
+            if scenario == 'jada':
+                return client.post(path, json={'message': message}, headers=headers).status_code
+            with client.stream('POST', path, json={'message': message}, headers=headers) as resp:
+                for _ in resp.iter_bytes():
+                    pass
+                return resp.status_code
+
+        if scenario == 'lessons':
+            return client.post(f"/api/modules/{item.id}/generate-lessons/", json={}, headers=headers).status_code
+        if scenario == 'quiz':
+            return client.get(f"/api/quiz/{item.id}/", headers=headers).status_code
+
+        # roadmap: custom roles go through Celery; time it end to end
+        niche = f"Bench Niche {run_id}-{n}" if options['unique'] else "Bench Niche"
+        resp = client.post('/api/complete-onboarding/', json={
+            'role': 'custom', 'custom_niche': niche, 'level': 'apprentice', 'budget': 'FREE',
+        }, headers=headers)
+        if resp.status_code != 202:
+            return resp.status_code
+        status_url = resp.json()['status_url']
+        deadline = time.monotonic() + options['timeout']
+        while time.monotonic() < deadline:
+            time.sleep(options['poll_interval'])
+            poll = client.get(status_url, headers=headers)
+            if poll.status_code != 200 or poll.json().get('status') != 'pending':
+                return poll.status_code
+        return 'timeout'
@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import ai_ledger
+
+GROUP_FIELDS = ('provider', 'model', 'call_site', 'outcome', 'streamed')
+
+
+class Command(BaseCommand):
+    help = 'Summarises the AI call ledger: calls, success rate, latency and tokens per model and call site'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24, help='Window to report on (default: 24)')
+        parser.add_argument(
+            '--by', default='provider,model,call_site',
+            help=f"Comma-separated grouping fields from: {', '.join(GROUP_FIELDS)}",
+        )
+        parser.add_argument('--json', action='store_true', help='Print raw JSON rows')
+
+    def handle(self, *args, **options):
+        by = tuple(f.strip() for f in options['by'].split(',') if f.strip())
+        unknown = [f for f in by if f not in GROUP_FIELDS]
+        if not by or unknown:
+            raise CommandError(f"--by takes fields from: {', '.join(GROUP_FIELDS)}")
+
+        ai_ledger.flush()  # include this process's buffered calls
+        rows = ai_ledger.summarize(hours=options['hours'], by=by)
+        if options['json']:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+        if not rows:
+            self.stdout.write(f"No AI calls recorded in the last {options['hours']:g}h")
+            return
+
+        columns = list(by) + [
+            'calls', 'ok', 'error', 'cancelled', 'success_rate', 'p50_ms', 'p95_ms',
+            'avg_retries', 'prompt_tokens', 'completion_tokens',
+        ]
+        table = [[('-' if row[c] is None else str(row[c])) for c in columns] for row in rows]
+        widths = [max(len(c), *(len(r[i]) for r in table)) for i, c in enumerate(columns)]
+        self.stdout.write("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+        for r in table:
+            self.stdout.write("  ".join(v.ljust(w) for v, w in zip(r, widths)))
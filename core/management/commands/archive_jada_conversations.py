@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core import jada_archive
+
+
+class Command(BaseCommand):
+    help = 'Moves the messages of idle JADA conversations into compressed cold storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=jada_archive.ARCHIVE_AFTER_DAYS,
+            help=f'Archive conversations idle for this many days (default: {jada_archive.ARCHIVE_AFTER_DAYS})',
+        )
+        parser.add_argument('--limit', type=int, default=None, help='Archive at most this many conversations')
+
+    def handle(self, *args, **options):
+        totals = jada_archive.archive_idle(days=options['days'], limit=options['limit'])
+        ratio = totals['stored_bytes'] / totals['raw_bytes'] if totals['raw_bytes'] else 0
+        self.stdout.write(
+            f"Archived {totals['messages']} messages from {totals['conversations']} conversations: "
+            f"{totals['raw_bytes']} bytes of JSON stored in {totals['stored_bytes']} ({ratio:.0%})"
+        )
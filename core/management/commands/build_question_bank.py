@@ -0,0 +1,102 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from core import ai_governor
+from core.ai_logic import generate_quiz, generate_lesson_quiz
+from core.models import QuestionBank
+from core.question_bank import catalog_entries, validate
+from core.quiz_engine import is_rule_based
+from core.role_catalog import ROLE_CATALOG
+
+RETRY_SEED_STRIDE = 1000
+
+
+def _bank_description(entry):
+    return entry['description'] if entry['kind'] == 'module' else ''
+
+
+@ai_governor.prioritized("background")
+def _generate(entry, variant, retries):
+    """Generate one variant; returns (entry, variant, questions, problems)."""
+    try:
+        problems = []
+        for attempt in range(retries + 1):
+            # Variants are cached by ai_cache; a fresh seed sidesteps a cached bad answer.
+            seed = variant + attempt * RETRY_SEED_STRIDE
+            if entry["kind"] == "module":
+                questions = generate_quiz(entry["module_label"], entry["description"], variant=seed)
+            else:
+                questions = generate_lesson_quiz(
+                    entry["module_label"], entry["lesson_title"], entry["lesson_description"], variant=seed,
+                )
+            problems = ["generation failed (fallback quiz)"] if is_rule_based(questions) else validate(questions)
+            if not problems:
+                return entry, variant, questions, []
+        return entry, variant, None, problems
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Pre-generates and validates quiz variants for every catalog module and lesson'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--variants', type=int, default=3, help='Variants per module/lesson (default: 3)')
+        parser.add_argument('--role', action='append', dest='roles', help='Only this role key (repeatable)')
+        parser.add_argument('--kind', choices=['module', 'lesson', 'all'], default='all')
+        parser.add_argument('--retries', type=int, default=1, help='Regenerations per rejected variant (default: 1)')
+        parser.add_argument('--workers', type=int, default=4, help='Concurrent LLM calls (default: 4)')
+        parser.add_argument('--refresh', action='store_true', help='Regenerate variants already in the bank')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what is missing')
+
+    def handle(self, *args, **options):
+        roles = options['roles']
+        unknown = [r for r in roles or [] if r not in ROLE_CATALOG]
+        if unknown:
+            raise CommandError(f"Unknown role(s): {', '.join(unknown)}. Available: {', '.join(ROLE_CATALOG)}")
+
+        entries = [
+            e for e in catalog_entries(roles)
+            if options['kind'] in ('all', e['kind'])
+        ]
+        existing = set(
+            QuestionBank.objects.values_list('kind', 'module_label', 'module_description', 'lesson_title', 'variant')
+        )
+        jobs = [
+            (entry, variant)
+            for entry in entries
+            for variant in range(options['variants'])
+            if options['refresh']
+            or (entry['kind'], entry['module_label'], _bank_description(entry), entry['lesson_title'], variant)
+            not in existing
+        ]
+        self.stdout.write(
+            f"{len(entries)} catalog entries, {len(jobs)} variants to generate "
+            f"({options['variants']} per entry)"
+        )
+        if options['dry_run'] or not jobs:
+            return
+
+        saved = rejected = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            for entry, variant, questions, problems in pool.map(lambda job: _generate(*job, options['retries']), jobs):
+                target = entry['module_label'] + (f" / {entry['lesson_title']}" if entry['lesson_title'] else "")
+                if problems:
+                    rejected += 1
+                    self.stdout.write(self.style.WARNING(f"Rejected {target} v{variant}: {'; '.join(problems)}"))
+                    continue
+                QuestionBank.objects.update_or_create(
+                    kind=entry['kind'],
+                    module_label=entry['module_label'],
+                    module_description=_bank_description(entry),
+                    lesson_title=entry['lesson_title'],
+                    variant=variant,
+                    defaults={'questions': questions},
+                )
+                saved += 1
+                if saved % 25 == 0:
+                    self.stdout.write(f"  {saved}/{len(jobs)} banked")
+
+        self.stdout.write(self.style.SUCCESS(f"Banked {saved} variants, rejected {rejected}"))
@@ -0,0 +1,92 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import catalog_index
+from core.jada_memory import estimate_tokens
+from core.model_health import _percentile
+
+# Chat-style questions on top of the catalog-derived ones.
+CHAT_QUERIES = (
+    "how do I centre a div with flexbox?",
+    "What's the difference between useEffect and useMemo in React?",
+    "explain docker compose networking",
+    "I keep getting a CORS error from my Django API",
+    "what is a pandas dataframe groupby",
+    "explain git rebase vs merge",
+    "how do i deploy to kubernetes",
+    "What are the key concepts in this module?",
+    "hi",
+    "thanks, that helps!",
+)
+
+
+class Command(BaseCommand):
+    help = 'Times building the JADA catalog retrieval index and looking queries up in it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--builds', type=int, default=20, help='Index builds to time (default: 20)')
+        parser.add_argument('--queries', type=int, default=2000, help='Lookups to time (default: 2000)')
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['builds'] < 1 or options['queries'] < 1:
+            raise CommandError("--builds and --queries must be at least 1")
+
+        build_us = []
+        for _ in range(options['builds']):
+            started = time.perf_counter()
+            index = catalog_index.build()
+            build_us.append(int((time.perf_counter() - started) * 1e6))
+
+        index = catalog_index.get_index()
+
+        # Lesson descriptions phrased as questions, asked from within their module or without one.
+        rng = random.Random(options['seed'])
+        lessons = [d for d in index.documents if d['kind'] == 'lesson']
+        queries = []
+        for _ in range(options['queries']):
+            if rng.random() < 0.2:
+                queries.append((rng.choice(CHAT_QUERIES), None))
+            else:
+                doc = rng.choice(lessons)
+                words = doc['snippet'].split()
+                query = f"Can you explain {' '.join(words[:rng.randint(3, 8)])}?"
+                queries.append((query, doc['module'] if rng.random() < 0.5 else None))
+
+        lookup_us, grounding_us, tokens, hits = [], [], [], 0
+        for query, module in queries:
+            started = time.perf_counter()
+            results = index.search(query, module=module)
+            lookup_us.append(int((time.perf_counter() - started) * 1e6))
+            started = time.perf_counter()
+            block = catalog_index.grounding(query, module=module)
+            grounding_us.append(int((time.perf_counter() - started) * 1e6))
+            if results:
+                hits += 1
+                tokens.append(estimate_tokens(block))
+
+        report = {
+            'documents': len(index.documents),
+            'terms': len(index.postings),
+            'build_ms_p50': round(_percentile(build_us, 50) / 1000, 2),
+            'build_ms_p95': round(_percentile(build_us, 95) / 1000, 2),
+            'lookup_us_p50': _percentile(lookup_us, 50),
+            'lookup_us_p95': _percentile(lookup_us, 95),
+            'lookup_us_max': max(lookup_us),
+            'grounding_us_p50': _percentile(grounding_us, 50),
+            'grounding_us_p95': _percentile(grounding_us, 95),
+            'hit_rate': round(hits / len(queries), 3),
+            'grounding_tokens_avg': round(sum(tokens) / len(tokens), 1) if tokens else 0,
+            'grounding_tokens_max': max(tokens, default=0),
+            'grounding_token_budget': catalog_index.GROUNDING_TOKENS,
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        width = max(len(k) for k in report)
+        for key, value in report.items():
+            self.stdout.write(f"{key.ljust(width)}  {value}")
@@ -0,0 +1,72 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.fake_llm import FakeLLM
+
+
+def _pairs(values, cast):
+    out = {}
+    for value in values or []:
+        model, sep, setting = value.partition('=')
+        if not sep:
+            raise CommandError(f"Expected MODEL=VALUE, got {value!r}")
+        out[model] = cast(setting)
+    return out
+
+
+class Command(BaseCommand):
+    help = 'Serves a deterministic fake OpenRouter/Gemini API for offline load tests (see core/fake_llm.py)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8090)
+        parser.add_argument(
+            '--latency', default='lognormal:0.8,0.5',
+            help='fixed:S | uniform:LO,HI | normal:MEAN,STD | lognormal:MEDIAN,SIGMA | pareto:MIN,ALPHA',
+        )
+        parser.add_argument('--model-latency', action='append', metavar='MODEL=SPEC',
+                            help='Latency override for one model (repeatable)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction answered with HTTP 503')
+        parser.add_argument('--model-error-rate', action='append', metavar='MODEL=RATE',
+                            help='Error rate override for one model (repeatable)')
+        parser.add_argument('--empty-rate', type=float, default=0.0, help='Fraction answered with empty content')
+        parser.add_argument('--malformed-rate', type=float, default=0.0, help='Fraction answered with truncated content')
+        parser.add_argument('--stream-chunk-delay', type=float, default=0.02, help='Seconds between streamed words')
+        parser.add_argument('--recordings', help='JSON file: [{"match": ..., "content": ..., "model"?: ...}]')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        recordings = []
+        if options['recordings']:
+            with open(options['recordings'], encoding='utf-8') as f:
+                recordings = json.load(f)
+
+        try:
+            fake = FakeLLM(
+                latency=options['latency'],
+                model_latency=_pairs(options['model_latency'], str),
+                error_rate=options['error_rate'],
+                model_error_rate=_pairs(options['model_error_rate'], float),
+                empty_rate=options['empty_rate'],
+                malformed_rate=options['malformed_rate'],
+                stream_chunk_delay=options['stream_chunk_delay'],
+                recordings=recordings,
+                seed=options['seed'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        server = fake.make_server(options['host'], options['port'])
+        base = f"http://{options['host']}:{options['port']}"
+        self.stdout.write(self.style.SUCCESS(f"Fake LLM listening on {base}"))
+        self.stdout.write(f"  OPENROUTER_API_URL={base}/api/v1/chat/completions")
+        self.stdout.write(f"  GEMINI_API_BASE={base}")
+        self.stdout.write(f"  stats: GET {base}/__stats   reset: POST {base}/__reset")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(json.dumps(fake.snapshot(), indent=2))
@@ -0,0 +1,322 @@
+import json
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import jada_markup
+
+SIZES = {'small': 2_000, 'medium': 20_000, 'large': 100_000}
+STREAM_CHUNK = 16   # characters per streamed delta, about one token's worth
+
+PROSE = (
+    "Flexbox lays items out along one axis, so **justify-content** moves them along it and "
+    "**align-items** across it. Grid adds the second axis when you need rows and columns at once. "
+)
+CODE = (
+    "```css\n.parent {\n  display: flex;\n  justify-content: center;\n  align-items: center;\n}\n"
+    ".grid { display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem; }\n```\n"
+)
+LIST = "1. Read the MDN flexbox guide\n2. Rebuild a navbar with it\n3. Try the same layout in grid\n"
+TAILS = {
+    'plain': "",
+    'single': "\n[SINGLE_SELECT]\nWhich layout do you want to practise next?\n"
+              "1. **Flexbox** - One-dimensional layouts\n2. **Grid** - Two-dimensional layouts\n"
+              "3. **Both** - Side by side\n\nPick one and we'll start.",
+    'multi': "\n[MULTI_SELECT]\nWhich topics should the next lesson cover?\n"
+             "1. Gap\n2. Wrapping - flex-wrap and friends\n3. **Ordering**\n",
+    'true_false': "\n[TRUE_FALSE]\nFlexbox can only lay items out in a single row or column.\n",
+    'quiz': "\n[QUIZ_START] Flexbox Check\n[QUIZ_Q1]\n[SINGLE_SELECT]\nWhich property centres items on the main axis?\n"
+            "1. align-items\n2. justify-content\n3. place-self\n[QUIZ_Q2]\n[TRUE_FALSE]\n"
+            "flex-direction: column swaps the axes.\n[QUIZ_Q3]\n[MULTI_SELECT]\nWhich are flex container properties?\n"
+            "1. flex-wrap\n2. order\n3. gap\n[QUIZ_END]\nGood luck!",
+    'quiz_and_select': "\n[QUIZ_START] Grid Check\n[QUIZ_Q1]\n[TRUE_FALSE]\nfr units share free space.\n[QUIZ_END]\n"
+                       "[SINGLE_SELECT]\nReady for the next module?\n1. Yes\n2. Not yet\n",
+    'legacy_choice': "\nWhere do you want to go from here?\nChoose one:\n1. **Projects** - Build something\n"
+                     "2. **Theory** - Go deeper\n",
+    'career': "\n[CAREER_RECOMMENDATION]\n### Your Recommended Path: Frontend Developer\n"
+              "**Why this fits you**: You enjoy visual work.\n",
+}
+
+
+def _reply(rng, size, tail):
+    """A reply of about *size* characters of prose, code and lists, with *tail* markup at the end."""
+    blocks = []
+    length = 0
+    while length < size:
+        block = rng.choice((PROSE, PROSE, CODE, LIST))
+        blocks.append(block)
+        length += len(block)
+    if tail and rng.random() < 0.5:
+        # Markup in the middle of the reply as well as at its end.
+        blocks.insert(rng.randrange(len(blocks)), TAILS[tail] + "\n")
+    else:
+        blocks.append(TAILS[tail])
+    return "".join(blocks)
+
+
+def _legacy(reply):
+    quiz_data, reply_after_quiz = legacy_extract_quiz(reply)
+    interactive_data, clean_reply = legacy_extract_interactive(reply_after_quiz)
+    return quiz_data, interactive_data, clean_reply
+
+
+def _streamed(reply):
+    parser = jada_markup.MarkupParser()
+    for i in range(0, len(reply), STREAM_CHUNK):
+        parser.feed(reply[i:i + STREAM_CHUNK])
+    return parser.close()
+
+
+def _time(fn, replies, repeat):
+    """Median seconds per reply over *repeat* runs of *fn* across *replies*."""
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for reply in replies:
+            fn(reply)
+        runs.append((time.perf_counter() - started) / len(replies))
+    return statistics.median(runs)
+
+
+class Command(BaseCommand):
+    help = 'Times the JADA reply markup parser against the regex extractors it replaced and checks they agree'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--replies', type=int, default=40, help='Replies per size (default: 40)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per implementation (default: 5)')
+        parser.add_argument('--sizes', default=','.join(SIZES), help=f"Comma-separated from: {', '.join(SIZES)}")
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        sizes = [s.strip() for s in options['sizes'].split(',') if s.strip()]
+        if not sizes or any(s not in SIZES for s in sizes):
+            raise CommandError(f"--sizes takes names from: {', '.join(SIZES)}")
+        if options['replies'] < 1 or options['repeat'] < 1:
+            raise CommandError("--replies and --repeat must be at least 1")
+
+        rng = random.Random(options['seed'])
+        rows = []
+        for size in sizes:
+            replies = [
+                _reply(rng, SIZES[size], tail)
+                for _ in range(options['replies'])
+                for tail in TAILS
+            ]
+            mismatches = sum(
+                1 for reply in replies
+                if not (_legacy(reply) == jada_markup.parse(reply) == _streamed(reply))
+            )
+            legacy = _time(_legacy, replies, options['repeat'])
+            parsed = _time(jada_markup.parse, replies, options['repeat'])
+            streamed = _time(_streamed, replies, options['repeat'])
+            rows.append({
+                'size': size,
+                'replies': len(replies),
+                'chars': SIZES[size],
+                'legacy_us': round(legacy * 1e6, 1),
+                'parse_us': round(parsed * 1e6, 1),
+                'streamed_us': round(streamed * 1e6, 1),
+                'speedup': round(legacy / parsed, 1) if parsed else None,
+                'mismatches': mismatches,
+            })
+
+        if options['json']:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+        columns = list(rows[0])
+        table = [[str(row[c]) for c in columns] for row in rows]
+        widths = [max(len(c), *(len(r[i]) for r in table)) for i, c in enumerate(columns)]
+        self.stdout.write("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+        for r in table:
+            self.stdout.write("  ".join(v.ljust(w) for v, w in zip(r, widths)))
+        if any(row['mismatches'] for row in rows):
+            self.stdout.write(self.style.WARNING("Parsers disagreed on some replies"))
+
+
+# ── Baseline: the regex extractors jada_markup replaced ───────────
+
+def legacy_parse_option_line(line: str):
+    """Parse '1. **Label** - Description' or '1. Label' into {label, description}."""
+    import re
+    cleaned = re.sub(r'^\s*\d+\.\s*', '', line).strip()
+    # Try **bold label** - description
+    m = re.match(r'\*\*(.+?)\*\*\s*[-–—]\s*(.+)', cleaned)
+    if m:
+        return {'label': m.group(1).strip(), 'description': m.group(2).strip()}
+    # Try bold label without description
+    m = re.match(r'\*\*(.+?)\*\*', cleaned)
+    if m:
+        return {'label': m.group(1).strip(), 'description': ''}
+    # Plain text — check for dash separator
+    if ' - ' in cleaned:
+        parts = cleaned.split(' - ', 1)
+        return {'label': parts[0].strip(), 'description': parts[1].strip()}
+    return {'label': cleaned, 'description': ''}
+
+
+def legacy_extract_interactive(reply: str):
+    """Extract structured interactive questions from LLM reply.
+
+    Detects [SINGLE_SELECT], [MULTI_SELECT], [TRUE_FALSE] markers.
+    Returns (interactive_data_or_None, clean_reply).
+    interactive_data = {type, question_text, options: [{label, description}], include_other}
+    """
+    import re
+
+    # Match [SINGLE_SELECT] or [MULTI_SELECT] block
+    select_pattern = re.compile(
+        r'(?P<before>[\s\S]*?)'
+        r'\[(?P<type>SINGLE_SELECT|MULTI_SELECT)\]\s*\n'
+        r'(?P<question>.+?)\n'
+        r'(?P<opts>(?:\s*\d+\.\s+.+\n?){2,})'
+        r'(?P<after>[\s\S]*?)$',
+        re.IGNORECASE,
+    )
+    m = select_pattern.match(reply)
+    if m:
+        q_type = 'single' if 'SINGLE' in m.group('type').upper() else 'multi'
+        question_text = m.group('question').strip()
+        opts_raw = m.group('opts')
+        options = [
+            legacy_parse_option_line(line)
+            for line in opts_raw.strip().splitlines()
+            if line.strip()
+        ]
+        clean = (m.group('before').rstrip() + '\n' + m.group('after').strip()).strip()
+        return {
+            'type': q_type,
+            'question_text': question_text,
+            'options': options,
+            'include_other': True,
+        }, clean
+
+    # Match [TRUE_FALSE] block
+    tf_pattern = re.compile(
+        r'(?P<before>[\s\S]*?)'
+        r'\[TRUE_FALSE\]\s*\n'
+        r'(?P<statement>.+?)'
+        r'(?:\n(?P<after>[\s\S]*))?$',
+        re.IGNORECASE,
+    )
+    m = tf_pattern.match(reply)
+    if m:
+        statement = m.group('statement').strip()
+        after = (m.group('after') or '').strip()
+        clean = (m.group('before').rstrip() + ('\n' + after if after else '')).strip()
+        return {
+            'type': 'boolean',
+            'question_text': statement,
+            'options': [
+                {'label': 'True', 'description': ''},
+                {'label': 'False', 'description': ''},
+            ],
+            'include_other': False,
+        }, clean
+
+    # Legacy fallback: 'Choose one:' pattern
+    trigger = r'(?:Choose one|Pick an option|Select one|Which would you prefer)[:\s]*'
+    legacy_pattern = re.compile(
+        r'(?P<before>[\s\S]*?)'
+        rf'(?:{trigger})\s*\n'
+        r'(?P<opts>(?:\s*\d+\.\s+.+\n?){2,})'
+        r'\s*$',
+        re.IGNORECASE,
+    )
+    m = legacy_pattern.match(reply)
+    if m:
+        question_text = ''
+        # Try to grab last line before trigger as question
+        before_text = m.group('before').rstrip()
+        before_lines = before_text.splitlines()
+        if before_lines and before_lines[-1].strip().endswith('?'):
+            question_text = before_lines[-1].strip()
+            before_text = '\n'.join(before_lines[:-1]).rstrip()
+        opts_raw = m.group('opts')
+        options = [
+            legacy_parse_option_line(line)
+            for line in opts_raw.strip().splitlines()
+            if line.strip()
+        ]
+        if options:
+            return {
+                'type': 'single',
+                'question_text': question_text,
+                'options': options,
+                'include_other': True,
+            }, before_text
+
+    return None, reply
+
+
+def legacy_extract_quiz(reply: str):
+    """Extract structured quiz data from LLM reply with [QUIZ_START]...[QUIZ_END] markers.
+
+    Returns (quiz_data_or_None, clean_reply).
+    quiz_data = {title, questions: [{id, type, question_text, options}]}
+    """
+    import re
+
+    quiz_pattern = re.compile(
+        r'(?P<before>[\s\S]*?)'
+        r'\[QUIZ_START\]\s*(?P<title>.*)\n'
+        r'(?P<body>[\s\S]*?)'
+        r'\[QUIZ_END\]'
+        r'(?P<after>[\s\S]*?)$',
+        re.IGNORECASE,
+    )
+    m = quiz_pattern.match(reply)
+    if not m:
+        return None, reply
+
+    title = m.group('title').strip() or 'Quiz'
+    body = m.group('body')
+    clean = (m.group('before').rstrip() + '\n' + m.group('after').strip()).strip()
+
+    # Split by [QUIZ_QN] markers
+    q_parts = re.split(r'\[QUIZ_Q(\d+)\]', body)
+    # q_parts: ['before', '1', 'content1', '2', 'content2', ...]
+    questions = []
+    i = 1
+    while i < len(q_parts) - 1:
+        q_num = q_parts[i]
+        q_content = q_parts[i + 1].strip()
+        i += 2
+
+        q_type = 'single'
+        if re.search(r'\[SINGLE_SELECT\]', q_content, re.IGNORECASE):
+            q_type = 'single'
+            q_content = re.sub(r'\[SINGLE_SELECT\]\s*\n?', '', q_content, flags=re.IGNORECASE)
+        elif re.search(r'\[MULTI_SELECT\]', q_content, re.IGNORECASE):
+            q_type = 'multi'
+            q_content = re.sub(r'\[MULTI_SELECT\]\s*\n?', '', q_content, flags=re.IGNORECASE)
+        elif re.search(r'\[TRUE_FALSE\]', q_content, re.IGNORECASE):
+            q_type = 'boolean'
+            q_content = re.sub(r'\[TRUE_FALSE\]\s*\n?', '', q_content, flags=re.IGNORECASE)
+
+        lines = q_content.strip().splitlines()
+        question_text = ''
+        option_lines = []
+        for line in lines:
+            if re.match(r'\s*\d+\.\s+', line):
+                option_lines.append(line)
+            elif not option_lines:
+                question_text += (' ' + line.strip()) if question_text else line.strip()
+
+        options = [legacy_parse_option_line(ol) for ol in option_lines] if option_lines else []
+        if q_type == 'boolean' and not options:
+            options = [{'label': 'True', 'description': ''}, {'label': 'False', 'description': ''}]
+
+        questions.append({
+            'id': f'q{q_num}',
+            'type': q_type,
+            'question_text': question_text,
+            'options': options,
+        })
+
+    if not questions:
+        return None, reply
+
+    return {'title': title, 'questions': questions}, clean
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core import ai_ledger
+
+
+class Command(BaseCommand):
+    help = 'Deletes AI call ledger rows older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=ai_ledger.RETENTION_DAYS,
+            help=f'Keep this many days of calls (default: {ai_ledger.RETENTION_DAYS})',
+        )
+
+    def handle(self, *args, **options):
+        deleted = ai_ledger.prune(days=options['days'])
+        self.stdout.write(f"Deleted {deleted} AI call ledger rows older than {options['days']} days")
@@ -0,0 +1,92 @@
+"""
+Async-capable middleware
+========================
+Django runs a request on a worker thread for as long as any sync-only
+middleware wraps it, so a single sync middleware in ``MIDDLEWARE`` makes
+every async view hold a thread for its whole LLM wait.  WhiteNoise 6.6
+and allauth 0.57 only ship sync middleware; these subclasses add an
+async path with the same behaviour and are drop-in replacements.
+
+``RequestDeadlineMiddleware`` opens the per-request time budget that
+outbound calls shrink their timeouts to (see ``core.deadlines``).
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from allauth.account.middleware import AccountMiddleware
+from allauth.core import context
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import deadlines
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self._is_async = iscoroutinefunction(get_response)
+        if self._is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class AsyncAccountMiddleware(AccountMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self._is_async = iscoroutinefunction(get_response)
+        if self._is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._is_async:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        with context.request_context(request):
+            response = await self.get_response(request)
+            # Touches request.session, which may hit the database.
+            await sync_to_async(self._remove_dangling_login)(request, response)
+            return response
+
+
+class RequestDeadlineMiddleware:
+    """
+    Run each request under a ``REQUEST_DEADLINE_SECONDS`` budget.  The budget
+    ends with the view: a streamed body is iterated afterwards, without one.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._is_async = iscoroutinefunction(get_response)
+        if self._is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self._is_async:
+            return self.__acall__(request)
+        with deadlines.budget():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with deadlines.budget():
+            return await self.get_response(request)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_avatar_url_guest_sessions_consultant'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jadaconversation',
+            name='summarized_until',
+            field=models.PositiveBigIntegerField(default=0, help_text='ID of the last JadaMessage folded into the summary'),
+        ),
+        migrations.AddField(
+            model_name='jadaconversation',
+            name='summary',
+            field=models.TextField(blank=True, default='', help_text='Compact summary of every message up to summarized_until'),
+        ),
+        migrations.AddField(
+            model_name='jadaconversation',
+            name='summary_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 23:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_jada_rolling_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionBank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('module', 'Module quiz'), ('lesson', 'Lesson quiz')], max_length=10)),
+                ('module_label', models.CharField(max_length=200)),
+                ('lesson_title', models.CharField(blank=True, default='', help_text='Empty for module quizzes', max_length=200)),
+                ('variant', models.PositiveSmallIntegerField(default=0)),
+                ('questions', models.JSONField(help_text='List of question objects with answers')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('kind', 'module_label', 'lesson_title', 'variant')},
+            },
+        ),
+    ]
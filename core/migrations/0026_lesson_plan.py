@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 00:03
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_question_bank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('module_label', models.CharField(max_length=200)),
+                ('user_level', models.CharField(max_length=50)),
+                ('platform', models.CharField(max_length=100)),
+                ('tech_stack', models.CharField(max_length=100)),
+                ('lessons', models.JSONField(blank=True, default=list)),
+                ('version', models.PositiveIntegerField(default=1, help_text='Bumped on every regeneration')),
+                ('template_version', models.PositiveSmallIntegerField(default=1, help_text='Lesson prompt template version the plan was generated with')),
+                ('generated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'unique_together': {('module_label', 'user_level', 'platform', 'tech_stack')},
+            },
+        ),
+        migrations.AddField(
+            model_name='userroadmapitem',
+            name='lesson_plan',
+            field=models.ForeignKey(blank=True, help_text='Shared lesson plan; lesson_data is only read for items generated before plans existed', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='roadmap_items', to='core.lessonplan'),
+        ),
+    ]
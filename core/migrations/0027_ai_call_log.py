@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-18 00:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_lesson_plan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AICallLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(help_text='openrouter or gemini', max_length=20)),
+                ('model', models.CharField(max_length=100)),
+                ('call_site', models.CharField(help_text='e.g. quiz, lesson_plan, jada_chat', max_length=50)),
+                ('prompt_tokens', models.PositiveIntegerField(blank=True, null=True)),
+                ('completion_tokens', models.PositiveIntegerField(blank=True, null=True)),
+                ('latency_ms', models.PositiveIntegerField()),
+                ('retries', models.PositiveSmallIntegerField(default=0)),
+                ('outcome', models.CharField(choices=[('ok', 'OK'), ('error', 'Error'), ('cancelled', 'Cancelled')], max_length=10)),
+                ('streamed', models.BooleanField(default=False)),
+                ('error', models.CharField(blank=True, default='', max_length=300)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, help_text='When the call finished')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'call_site', 'created_at'], name='core_aicall_model_13452b_idx')],
+            },
+        ),
+    ]
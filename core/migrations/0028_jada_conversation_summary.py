@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-18 00:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+PREVIEW_CHARS = 200
+
+
+def backfill_summaries(apps, schema_editor):
+    JadaConversation = apps.get_model('core', 'JadaConversation')
+    JadaMessage = apps.get_model('core', 'JadaMessage')
+    last_content = (
+        JadaMessage.objects.filter(conversation=OuterRef('pk')).exclude(role='system')
+        .order_by('-id').values('content')[:1]
+    )
+    convos = JadaConversation.objects.annotate(
+        n=Count('messages'), last=Subquery(last_content),
+    ).select_related('context_module')
+    batch = []
+    for convo in convos.iterator(chunk_size=500):
+        convo.message_count = convo.n
+        convo.last_message_preview = " ".join((convo.last or "").split())[:PREVIEW_CHARS]
+        convo.module_label = convo.context_module.label if convo.context_module else ''
+        batch.append(convo)
+        if len(batch) >= 500:
+            JadaConversation.objects.bulk_update(batch, ['message_count', 'last_message_preview', 'module_label'])
+            batch = []
+    JadaConversation.objects.bulk_update(batch, ['message_count', 'last_message_preview', 'module_label'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_ai_call_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jadaconversation',
+            name='last_message_preview',
+            field=models.CharField(blank=True, default='', max_length=200),
+        ),
+        migrations.AddField(
+            model_name='jadaconversation',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='jadaconversation',
+            name='module_label',
+            field=models.CharField(blank=True, default='', help_text='Label of context_module when it was attached', max_length=200),
+        ),
+        migrations.AddIndex(
+            model_name='jadamessage',
+            index=models.Index(fields=['conversation', 'id'], name='core_jadamsg_conv_id_idx'),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
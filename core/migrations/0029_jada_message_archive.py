@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 00:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_jada_conversation_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jadaconversation',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='JadaMessageArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codec', models.CharField(default='zlib', max_length=10)),
+                ('payload', models.BinaryField()),
+                ('message_count', models.PositiveIntegerField(default=0)),
+                ('raw_bytes', models.PositiveIntegerField(default=0, help_text='Size of the JSON before compression')),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('conversation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='message_archive', to='core.jadaconversation')),
+            ],
+        ),
+    ]
@@ -0,0 +1,115 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:03
+
+from django.db import migrations, models
+
+
+# Module descriptions as of this migration: for each label, the description of
+# the first role listing it, which is the module module quizzes were banked from.
+# Frozen here so later catalog edits don't change what the migration writes.
+FIRST_MODULE_DESCRIPTIONS = {
+    'HTML & CSS Foundations': 'Semantic HTML5, modern CSS (Flexbox, Grid), responsive design, and accessibility basics. The building blocks of every web page.',
+    'JavaScript Essentials': 'Modern JavaScript (ES2020+): variables, functions, DOM, async/await, error handling, and modules. The engine of interactivity.',
+    'Git & Version Control': 'Git fundamentals, branching, merging, GitHub workflows, and collaboration patterns every developer must know.',
+    'React & Component Architecture': 'Build modern UIs with React: components, hooks, state management, and routing. The most in-demand frontend framework.',
+    'Node.js & Express APIs': 'Server-side JavaScript: REST APIs, middleware, authentication, and file handling with Node.js and Express.',
+    'Databases & Data Modeling': 'SQL and NoSQL fundamentals. Design schemas, write queries, and understand when to use PostgreSQL vs MongoDB.',
+    'Testing & Quality': 'Write tests that catch bugs before users do. Unit, integration, and end-to-end testing for frontend and backend.',
+    'Deployment & DevOps Basics': 'Ship your code to production. Docker basics, CI/CD, environment variables, and hosting on modern platforms.',
+    'System Design Fundamentals': 'Understand how large-scale systems work: load balancers, caching, CDNs, microservices, and message queues.',
+    'Security & Authentication': 'Protect your apps and users. OWASP top 10, HTTPS, CORS, JWT best practices, OAuth, and common vulnerabilities.',
+    'Full-Stack Capstone Project': 'Put it all together: design, build, test, and deploy a complete full-stack application from scratch. This is your portfolio centerpiece.',
+    'Communication & Soft Skills': 'Technical skills get you interviews. Soft skills get you hired. Learn to explain, collaborate, and present your work.',
+    'HTML & Semantic Markup': 'The skeleton of every web page. Learn HTML5 elements, forms, tables, multimedia, and why semantic structure matters for SEO and accessibility.',
+    'CSS Fundamentals & Layout': 'Style and lay out web pages with CSS. Master selectors, the box model, Flexbox, Grid, and responsive design patterns.',
+    'Git & Collaboration': 'Version control is non-negotiable. Learn Git for tracking changes, collaborating on teams, and contributing to open source.',
+    'JavaScript Deep Dive': 'The engine of every web app. Master ES2024+ — from variables and functions to async patterns, closures, and the event loop.',
+    'TypeScript Essentials': 'Add type safety to JavaScript. TypeScript is now a requirement for most frontend roles — learn it early and use it everywhere.',
+    'React Fundamentals': 'The most in-demand UI library. Build modern, component-driven interfaces with React — from JSX basics to hooks and routing.',
+    'State Management & Data Fetching': 'Manage complex application state beyond useState. Learn Zustand, React Query, and patterns for server state vs client state.',
+    'CSS Architecture & Design Systems': 'Scale your styles. Learn Tailwind CSS, CSS Modules, styled-components, and how to build a consistent component library.',
+    'Testing Frontend Applications': 'Ship with confidence. Unit test components, integration test pages, and end-to-end test user flows.',
+    'Performance & Core Web Vitals': 'Fast sites win. Learn to measure, diagnose, and fix performance issues — LCP, FID, CLS, bundle size, and rendering bottlenecks.',
+    'Accessibility (a11y) Best Practices': 'The web is for everyone. Learn WCAG, ARIA, keyboard navigation, screen readers, and how to build inclusive interfaces.',
+    'Build Tools & Dev Workflow': 'Understand the tools beneath your framework: Vite, ESLint, Prettier, npm scripts, and the modern frontend build pipeline.',
+    'Portfolio Capstone Project': "Put it all together. Design, build, test, and deploy a polished frontend application that showcases every skill you've learned.",
+    'Communication & Career Skills': 'Stand out in the job market. Learn to communicate technical ideas, write great READMEs, contribute to open source, and ace interviews.',
+    'Python Fundamentals': 'The foundation of backend development. Learn Python syntax, data structures, functions, OOP, and the standard library.',
+    'Data Structures & Algorithms': 'Think like a programmer. Learn fundamental CS concepts — arrays, linked lists, trees, sorting, and searching — with Python implementations.',
+    'Databases & SQL': 'Data is the backbone of every backend. Master relational databases, write complex SQL queries, and understand data modeling.',
+    'REST API Design': 'Design APIs that other developers love to use. RESTful conventions, status codes, versioning, pagination, and documentation.',
+    'Authentication & Security': 'Protect your users and data. Session management, JWT, OAuth, password hashing, CORS, and OWASP top-10 vulnerabilities.',
+    'Django & DRF Deep Dive': 'Build production-grade APIs with Django and Django REST Framework. Models, serializers, viewsets, permissions, filtering, and the admin.',
+    'Caching, Queues & Background Tasks': 'Keep your API fast under load. Learn Redis caching, Celery task queues, and async processing patterns.',
+    'Testing Backend Applications': 'Write tests that give you confidence to deploy on Friday. Unit tests, API tests, fixtures, mocking, and test-driven development.',
+    'Docker & CI/CD': 'Containerize your applications and automate deployments. Docker, docker-compose, GitHub Actions, and production hosting.',
+    'GraphQL & API Alternatives': 'Beyond REST. Learn GraphQL fundamentals, gRPC basics, and WebSockets — expanding your API toolkit.',
+    'Backend Capstone Project': "Build a production-quality API from scratch. Your portfolio centerpiece that demonstrates every backend skill you've learned.",
+    'Python for Data Science': 'Python is the lingua franca of data science. Learn the language foundations and key libraries used in every data workflow.',
+    'Statistics & Probability': 'The mathematical foundation of data science. Understand distributions, hypothesis testing, correlation, and Bayesian thinking.',
+    'Git & Version Control for Data': 'Track your code, notebooks, and experiments. Git, GitHub, and data versioning tools for reproducible data science.',
+    'Pandas & NumPy': 'The core tools of data manipulation. Master DataFrames, Series, array operations, and efficient data wrangling patterns.',
+    'Data Visualization': 'Tell stories with data. Master Matplotlib, Seaborn, and Plotly to create publication-quality charts and interactive dashboards.',
+    'SQL for Data Analysis': 'Most business data lives in databases. Write analytical SQL queries to extract, transform, and analyze data at scale.',
+    'Machine Learning Fundamentals': 'The core theory and practice of ML. Supervised and unsupervised learning, bias-variance tradeoff, cross-validation, and model evaluation.',
+    'Scikit-learn Applied': 'Put ML theory into practice. Build end-to-end ML pipelines with scikit-learn — from data preprocessing to model deployment.',
+    'Deep Learning Introduction': 'Neural networks from scratch. Understand backpropagation, build networks with PyTorch, and apply deep learning to real problems.',
+    'MLOps & Model Deployment': 'Ship ML models to production. Experiment tracking, model versioning, APIs, Docker, monitoring, and CI/CD for ML.',
+    'Natural Language Processing': 'Make computers understand text. From text preprocessing through transformers, sentiment analysis, and LLM applications.',
+    'Big Data & Cloud': "Work with data that doesn't fit in memory. Introduction to Spark, cloud platforms (AWS/GCP), and scalable data processing.",
+    'Data Science Capstone Project': 'Build an end-to-end data science project: problem definition, data collection, analysis, ML model, deployment, and presentation.',
+    'Linux & Shell Scripting': 'Every server runs Linux. Master the command line, file system, permissions, processes, and shell scripting for automation.',
+    'Networking Fundamentals': 'Understand how the internet works. TCP/IP, DNS, HTTP, firewalls, load balancers, and network troubleshooting.',
+    'Git, CI/CD & Automation': 'Automate everything. Git workflows, GitHub Actions, Jenkins, pipeline design, and automated testing for infrastructure.',
+    'Docker & Containers': 'Containerize everything. Master Docker from basics through multi-stage builds, Docker Compose, and container security best practices.',
+    'Infrastructure as Code': 'Define infrastructure in code. Master Terraform and Ansible to provision and configure servers, networks, and cloud resources reproducibly.',
+    'Kubernetes': 'The industry standard for container orchestration. Deploy, scale, and manage containerized applications in production.',
+    'Cloud Platforms (AWS/GCP/Azure)': 'Build on the cloud. Core services across compute, storage, networking, databases, and managed Kubernetes on AWS, GCP, or Azure.',
+    'Monitoring & Observability': "See what's happening in production. Metrics, logs, traces, dashboards, alerting, and incident response.",
+    'Security & Compliance': 'DevSecOps: embed security into every stage. Container security, secret management, vulnerability scanning, and compliance frameworks.',
+    'Site Reliability Engineering': 'Build reliable systems at scale. SRE principles, capacity planning, chaos engineering, and performance optimization.',
+    'GitOps & Platform Engineering': 'Next-level DevOps. GitOps with ArgoCD/Flux, internal developer platforms, and building self-service infrastructure.',
+    'Scripting & Automation (Python/Go)': 'Go beyond Bash. Use Python and Go for complex automation, custom tooling, controllers, and operator development.',
+    'DevOps Capstone Project': 'Build a production-grade infrastructure from scratch: IaC, CI/CD, containers, K8s, monitoring, and security — all integrated.',
+    'JavaScript Foundations': 'JavaScript is the engine behind React Native. Master the core language before building mobile interfaces.',
+    'TypeScript for Mobile': "Type safety prevents bugs before they reach users. Learn TypeScript thoroughly — it's the standard for production React Native apps.",
+    'React Native Fundamentals': 'The core of cross-platform mobile development. Components, styling, layout, props, state, and the React Native ecosystem.',
+    'Navigation & Routing': 'Multi-screen apps need navigation. Master React Navigation — stacks, tabs, drawers, deep linking, and authentication flows.',
+    'State Management': 'Manage complex app state. From React hooks through context to Zustand and React Query for server state.',
+    'Native APIs & Device Features': 'Access device capabilities: camera, location, notifications, biometrics, file system, and sensors through React Native bridges.',
+    'Animations & Gestures': 'Delightful mobile experiences need smooth animations and intuitive gestures. Master Reanimated and Gesture Handler.',
+    'Testing Mobile Apps': 'Ship with confidence. Unit tests, component tests, integration tests, and end-to-end testing for React Native apps.',
+    'Performance Optimization': 'Make your app feel native. JS thread optimization, render performance, memory management, and profiling tools.',
+    'App Store & Distribution': 'Get your app to users. App Store Connect, Google Play Console, code signing, CI/CD for mobile, and over-the-air updates.',
+    'UI/UX Design for Mobile': 'Design mobile-first experiences. Platform conventions, design systems, accessibility, and prototyping for iOS and Android.',
+    'Mobile Capstone Project': 'Build a production-ready mobile app from idea to App Store. Real users, real feedback, real deployment.',
+}
+
+
+def backfill_module_descriptions(apps, schema_editor):
+    QuestionBank = apps.get_model('core', 'QuestionBank')
+    for label, description in FIRST_MODULE_DESCRIPTIONS.items():
+        QuestionBank.objects.filter(kind='module', module_label=label).update(module_description=description)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_jada_message_archive'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='questionbank',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='questionbank',
+            name='module_description',
+            field=models.CharField(blank=True, default='', help_text='Module quizzes only: roles sharing a label describe the module differently', max_length=500),
+        ),
+        migrations.RunPython(backfill_module_descriptions, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='questionbank',
+            unique_together={('kind', 'module_label', 'module_description', 'lesson_title', 'variant')},
+        ),
+    ]
@@ -0,0 +1,149 @@
+"""
+Model health scoreboard & circuit breaker
+==========================================
+Records the outcome and latency of every OpenRouter model call in the
+Django cache (Redis in production) so all gunicorn workers and Celery
+processes share one view of which free models are healthy right now.
+
+* ``record_result`` — called by ``openrouter_client`` after each model call.
+* ``rank_models``  — reorders a cascade by live health and drops models
+  whose circuit is open.
+* ``snapshot``     — per-model stats for the operator endpoint.
+
+Circuit rules
+-------------
+After ``CIRCUIT_FAILURE_THRESHOLD`` consecutive failures a model's circuit
+opens for ``CIRCUIT_COOLDOWN_SECONDS``.  Once the cooldown passes the model
+is tried again (half-open); one more failure re-opens it, one success
+closes it.  If every model in a cascade is open the original order is
+returned so requests still get a chance.
+
+Updates are read-modify-write on a single cache key per model, so two
+workers finishing at the same instant can drop one sample.  That is fine
+for a health signal.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Iterable
+
+from django.core.cache import cache
+
+CACHE_PREFIX = "ai_health"
+REGISTRY_KEY = f"{CACHE_PREFIX}:models"
+WINDOW_SIZE = 50                       # samples kept per model
+STATE_TTL = 24 * 3600                  # forget models idle for a day
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("MODEL_CIRCUIT_FAILURES", "3"))
+CIRCUIT_COOLDOWN_SECONDS = int(os.getenv("MODEL_CIRCUIT_COOLDOWN", "120"))
+
+
+def _key(model: str) -> str:
+    return f"{CACHE_PREFIX}:{model}"
+
+
+def _empty_state() -> dict:
+    return {
+        "samples": [],                 # [ok (0/1), latency_ms, unix_ts]
+        "consecutive_failures": 0,
+        "open_until": 0.0,
+        "last_error": "",
+    }
+
+
+def _load(model: str) -> dict:
+    return cache.get(_key(model)) or _empty_state()
+
+
+def _percentile(values: list[int], pct: float) -> int | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def record_result(model: str, ok: bool, latency: float, error: str = "") -> None:
+    """Record one call outcome (*latency* in seconds) for *model*."""
+    now = time.time()
+    state = _load(model)
+    state["samples"] = (state["samples"] + [[1 if ok else 0, int(latency * 1000), int(now)]])[-WINDOW_SIZE:]
+
+    if ok:
+        state["consecutive_failures"] = 0
+        state["open_until"] = 0.0
+    else:
+        state["consecutive_failures"] += 1
+        state["last_error"] = (error or "")[:200]
+        if state["consecutive_failures"] >= CIRCUIT_FAILURE_THRESHOLD:
+            state["open_until"] = now + CIRCUIT_COOLDOWN_SECONDS
+            print(f"[AI] Circuit opened for {model} ({state['consecutive_failures']} consecutive failures)")
+
+    cache.set(_key(model), state, STATE_TTL)
+
+    known = cache.get(REGISTRY_KEY) or []
+    if model not in known:
+        cache.set(REGISTRY_KEY, known + [model], STATE_TTL)
+
+
+def _stats(model: str, state: dict, now: float) -> dict:
+    samples = state["samples"]
+    ok_latencies = [s[1] for s in samples if s[0]]
+    return {
+        "model": model,
+        "calls": len(samples),
+        "success_rate": round(sum(s[0] for s in samples) / len(samples), 3) if samples else None,
+        "p50_ms": _percentile(ok_latencies, 50),
+        "p95_ms": _percentile(ok_latencies, 95),
+        "consecutive_failures": state["consecutive_failures"],
+        "circuit_open": state["open_until"] > now,
+        "open_for_seconds": max(0, int(state["open_until"] - now)),
+        "last_error": state["last_error"],
+    }
+
+
+def is_available(model: str) -> bool:
+    """False while *model*'s circuit is open."""
+    return _load(model)["open_until"] <= time.time()
+
+
+def rank_models(models: Iterable[str]) -> list[str]:
+    """Return *models* ordered by live health, open circuits removed.
+
+    Ordering is by success rate (in 10% buckets), then p50 latency (in 5s
+    buckets), then the caller's original order — so small differences never
+    reshuffle a hand-tuned cascade.  Models without samples count as healthy.
+    """
+    models = list(models)
+    if not models:
+        return models
+
+    now = time.time()
+    states = cache.get_many([_key(m) for m in models])
+    ranked = []
+    for idx, model in enumerate(models):
+        stats = _stats(model, states.get(_key(model)) or _empty_state(), now)
+        if stats["circuit_open"]:
+            continue
+        rate = stats["success_rate"] if stats["success_rate"] is not None else 1.0
+        p50 = stats["p50_ms"] or 0
+        ranked.append(((-round(rate * 10), p50 // 5000, idx), model))
+
+    if not ranked:
+        return models
+    return [model for _, model in sorted(ranked)]
+
+
+def snapshot(models: Iterable[str] | None = None) -> list[dict]:
+    """Stats for *models* (defaults to every model seen recently)."""
+    names = list(models) if models is not None else (cache.get(REGISTRY_KEY) or [])
+    now = time.time()
+    states = cache.get_many([_key(m) for m in names])
+    return [_stats(m, states.get(_key(m)) or _empty_state(), now) for m in names]
+
+
+def reset(model: str) -> None:
+    """Forget all samples for *model* and close its circuit."""
+    cache.delete(_key(model))
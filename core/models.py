@@ -137,6 +137,30 @@ class User(AbstractUser):
 # 2. THE PERSONALIZED ROADMAP
 # ==========================================
 
+class LessonPlan(models.Model):
+    """
+    AI lesson plan shared by every roadmap item with the same module,
+    level, platform and tech stack (key fields are stored normalised).
+    ``version`` goes up each time the plan is regenerated; see lesson_plans.py.
+    """
+    module_label = models.CharField(max_length=200)
+    user_level = models.CharField(max_length=50)
+    platform = models.CharField(max_length=100)
+    tech_stack = models.CharField(max_length=100)
+    lessons = models.JSONField(default=list, blank=True)
+    version = models.PositiveIntegerField(default=1, help_text='Bumped on every regeneration')
+    template_version = models.PositiveSmallIntegerField(
+        default=1, help_text='Lesson prompt template version the plan was generated with'
+    )
+    generated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('module_label', 'user_level', 'platform', 'tech_stack')
+
+    def __str__(self):
+        return f"Lesson plan: {self.module_label} ({self.user_level}, {self.platform}) v{self.version}"
+
+
 class UserRoadmapItem(models.Model):
     """
     Stores a specific node generated by AI for a specific user.
@@ -178,6 +202,10 @@ class UserRoadmapItem(models.Model):
         blank=True,
         help_text='Timestamp when lesson was last cached (use for TTL expiration)'
     )
+    lesson_plan = models.ForeignKey(
+        LessonPlan, on_delete=models.SET_NULL, null=True, blank=True, related_name='roadmap_items',
+        help_text='Shared lesson plan; lesson_data is only read for items generated before plans existed'
+    )
     
     # Project Verification Fields (Phase 3)
     github_score = models.IntegerField(default=0, help_text="Automated GitHub project score (0-100)")
@@ -268,6 +296,35 @@ class Quiz(models.Model):
     def __str__(self):
         return f"Quiz for {self.roadmap_item.label} - Score: {self.score}%"
 
+
+class QuestionBank(models.Model):
+    """
+    Pre-generated, validated quiz variants for static catalog content.
+    Filled by ``manage.py build_question_bank``; quiz views draw from it
+    and only call the LLM for modules/lessons not in the bank (custom roadmaps).
+    """
+    KIND_CHOICES = [
+        ('module', 'Module quiz'),
+        ('lesson', 'Lesson quiz'),
+    ]
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    module_label = models.CharField(max_length=200)
+    module_description = models.CharField(
+        max_length=500, blank=True, default='',
+        help_text='Module quizzes only: roles sharing a label describe the module differently',
+    )
+    lesson_title = models.CharField(max_length=200, blank=True, default='', help_text='Empty for module quizzes')
+    variant = models.PositiveSmallIntegerField(default=0)
+    questions = models.JSONField(help_text="List of question objects with answers")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('kind', 'module_label', 'module_description', 'lesson_title', 'variant')
+
+    def __str__(self):
+        target = f"{self.module_label} / {self.lesson_title}" if self.lesson_title else self.module_label
+        return f"{self.kind} bank: {target} (v{self.variant})"
+
 # ==========================================
 # 6. EMPLOYER PROFILES & JOB POSTINGS
 # ==========================================
@@ -745,6 +802,28 @@ class JadaConversation(models.Model):
     started_at = models.DateTimeField(auto_now_add=True)
     last_message_at = models.DateTimeField(auto_now=True)
 
+    # Rolling memory (see jada_memory.py)
+    summary = models.TextField(
+        blank=True, default='',
+        help_text='Compact summary of every message up to summarized_until'
+    )
+    summarized_until = models.PositiveBigIntegerField(
+        default=0,
+        help_text='ID of the last JadaMessage folded into the summary'
+    )
+    summary_updated_at = models.DateTimeField(null=True, blank=True)
+
+    # Denormalized for the conversation list; kept in step by views._record_jada_messages
+    message_count = models.PositiveIntegerField(default=0)
+    last_message_preview = models.CharField(max_length=200, blank=True, default='')
+    module_label = models.CharField(
+        max_length=200, blank=True, default='',
+        help_text='Label of context_module when it was attached'
+    )
+
+    # Cold storage (see jada_archive.py): set while the messages live in a JadaMessageArchive
+    archived_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         ordering = ['-last_message_at']
 
@@ -770,6 +849,61 @@ class JadaMessage(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Cursor pagination: newest-first pages of one conversation by id
+            models.Index(fields=['conversation', 'id'], name='core_jadamsg_conv_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.role}: {self.content[:50]}"
+
+
+class JadaMessageArchive(models.Model):
+    """
+    Cold storage for an idle JADA conversation: all of its messages packed
+    into one compressed JSON blob (see jada_archive.py).
+    """
+    conversation = models.OneToOneField(
+        JadaConversation, on_delete=models.CASCADE, related_name='message_archive'
+    )
+    codec = models.CharField(max_length=10, default='zlib')
+    payload = models.BinaryField()
+    message_count = models.PositiveIntegerField(default=0)
+    raw_bytes = models.PositiveIntegerField(default=0, help_text='Size of the JSON before compression')
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archive of conversation {self.conversation_id} ({self.message_count} messages)"
+
+
+# ==========================================
+# 17. AI CALL LEDGER
+# ==========================================
+
+class AICallLog(models.Model):
+    """
+    One LLM call (a model's request incl. retries), buffered and bulk-written
+    by ai_ledger.py.  Aggregated by ``manage.py ai_call_report``.
+    """
+    OUTCOME_CHOICES = [
+        ('ok', 'OK'),
+        ('error', 'Error'),
+        ('cancelled', 'Cancelled'),
+    ]
+    provider = models.CharField(max_length=20, help_text='openrouter or gemini')
+    model = models.CharField(max_length=100)
+    call_site = models.CharField(max_length=50, help_text='e.g. quiz, lesson_plan, jada_chat')
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True)
+    completion_tokens = models.PositiveIntegerField(null=True, blank=True)
+    latency_ms = models.PositiveIntegerField()
+    retries = models.PositiveSmallIntegerField(default=0)
+    outcome = models.CharField(max_length=10, choices=OUTCOME_CHOICES)
+    streamed = models.BooleanField(default=False)
+    error = models.CharField(max_length=300, blank=True, default='')
+    created_at = models.DateTimeField(default=timezone.now, db_index=True, help_text='When the call finished')
+
+    class Meta:
+        indexes = [models.Index(fields=['model', 'call_site', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.call_site} → {self.model}: {self.outcome} in {self.latency_ms}ms"
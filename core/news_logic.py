@@ -9,6 +9,9 @@ External sources
 -----------------
 * **News**: Google News RSS (public, no key required)
 * **Jobs**: WeWorkRemotely RSS + Remotive RSS + Hacker News Algolia API
+
+Fetches share the request's time budget (``deadlines``): once it runs out
+the remaining queries are skipped and whatever was gathered is returned.
 """
 
 from __future__ import annotations
@@ -18,10 +21,23 @@ from datetime import datetime, timezone as dt_tz
 from email.utils import parsedate_to_datetime
 
 import feedparser
-import requests
+
+from . import deadlines
+from .http_client import http_get
 
 # ─── helpers ──────────────────────────────────────────────────────────
 
+def _parse_feed(rss_url: str, timeout: float = 8):
+    """
+    Fetch an RSS feed over the shared pooled session and hand the bytes
+    to feedparser (which would otherwise open a fresh urllib connection
+    per call).
+    """
+    resp = http_get(rss_url, timeout=timeout)
+    resp.raise_for_status()
+    return feedparser.parse(resp.content)
+
+
 def _parse_rfc2822(date_str: str) -> datetime | None:
     """Best-effort parse of RFC-2822 / RSS date strings."""
     if not date_str:
@@ -97,10 +113,13 @@ def fetch_tech_news(keywords: list[str], career_title: str = '', limit: int = 30
     all_items: list[dict] = []
 
     for query_str in batches[:6]:
+        if deadlines.expired():
+            print(f"[news_logic] Out of time, returning {len(all_items)} news items")
+            break
         query = query_str.replace(' ', '+')
         rss_url = f"https://news.google.com/rss/search?q={query}+technology+when:7d&hl=en&gl=US&ceid=US:en"
         try:
-            feed = feedparser.parse(rss_url)
+            feed = _parse_feed(rss_url)
             for entry in feed.entries[:10]:
                 pub_dt = _parse_rfc2822(getattr(entry, 'published', ''))
                 all_items.append({
@@ -152,7 +171,7 @@ def _fetch_wwr(keywords: list[str], limit: int = 15) -> list[dict]:
     """WeWorkRemotely RSS."""
     rss_url = 'https://weworkremotely.com/categories/remote-programming-jobs.rss'
     try:
-        feed = feedparser.parse(rss_url)
+        feed = _parse_feed(rss_url)
     except Exception:
         return []
 
@@ -183,7 +202,7 @@ def _fetch_remotive(keywords: list[str], limit: int = 15) -> list[dict]:
     """Remotive RSS feed for software dev jobs."""
     rss_url = 'https://remotive.com/remote-jobs/software-dev/feed'
     try:
-        feed = feedparser.parse(rss_url)
+        feed = _parse_feed(rss_url)
     except Exception:
         return []
 
@@ -216,8 +235,10 @@ def _fetch_hn_jobs(keywords: list[str], limit: int = 10) -> list[dict]:
     items: list[dict] = []
 
     for query_str in batches[:3]:
+        if deadlines.expired():
+            break
         try:
-            resp = requests.get('https://hn.algolia.com/api/v1/search', params={
+            resp = http_get('https://hn.algolia.com/api/v1/search', params={
                 'query': query_str,
                 'tags': 'job',
                 'hitsPerPage': 10,
@@ -255,9 +276,11 @@ def fetch_jobs_multi(keywords: list[str], career_title: str = '', limit: int = 3
         search_kw.insert(0, career_title)
 
     all_jobs: list[dict] = []
-    all_jobs.extend(_fetch_wwr(search_kw))
-    all_jobs.extend(_fetch_remotive(search_kw))
-    all_jobs.extend(_fetch_hn_jobs(search_kw))
+    for fetch in (_fetch_wwr, _fetch_remotive, _fetch_hn_jobs):
+        if deadlines.expired():
+            print(f"[news_logic] Out of time, returning {len(all_jobs)} jobs")
+            break
+        all_jobs.extend(fetch(search_kw))
 
     items = _dedup_by_key(all_jobs, 'link')
     items.sort(key=lambda x: x.get('published_ts', ''), reverse=True)
@@ -0,0 +1,87 @@
+"""
+Async OpenRouter gateway
+========================
+asyncio twin of ``openrouter_client`` for views served through
+``asgi.py``.  A request waiting on a free model is a suspended coroutine
+on the event loop rather than a blocked gunicorn worker, so one process
+can keep many slow LLM calls in flight.
+
+Semantics match the sync client exactly: the retry, cascade and race
+logic are the client's ``ai_flow`` flows, driven here with the async
+halves of ``openrouter_transport``.
+
+* ``achat_completions``          — one model, same retry/backoff.
+* ``achat_completions_cascade``  — same cascade order, health ranking
+  (``model_health``), hedged racing via *hedge_delay* and return shape
+  (``(text, model)`` or ``(text, model, meta)``).
+* ``achat_completions_stream_cascade`` — token streaming for SSE views.
+
+Race losers are cancelled outright instead of being asked to stop
+retrying, since a cancelled task frees its connection immediately.  The
+request deadline (``deadlines``) bounds calls, retries and races the same
+way it does in the sync client.
+"""
+
+from typing import Dict, List, Optional
+
+from . import ai_flow
+from .openrouter_client import (
+    DEFAULT_MODEL,
+    _cascade_flow,
+    _completion_flow,
+    _stream_cascade_flow,
+    chat_completions_cascade,
+)
+
+
+async def achat_completions(
+    *,
+    messages: List[Dict[str, str]],
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.7,
+    max_tokens: int = 1024,
+    timeout: int = 60,
+    retries: int = 2,
+) -> str:
+    """Async ``chat_completions``: return the assistant message content."""
+    return await ai_flow.arun(_completion_flow(messages, model, temperature, max_tokens, timeout, retries))
+
+
+async def achat_completions_cascade(
+    *,
+    messages: List[Dict[str, str]],
+    models: Optional[List[str]] = None,
+    temperature: float = 0.7,
+    max_tokens: int = 1024,
+    timeout: int = 90,
+    hedge_delay: Optional[float] = None,
+    adaptive: bool = True,
+    return_meta: bool = False,
+) -> tuple:
+    """Async ``chat_completions_cascade``; see that function for semantics."""
+    call_kwargs = {
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "timeout": timeout,
+        "retries": 1,
+    }
+    text, model, meta = await ai_flow.arun(_cascade_flow(models, hedge_delay, adaptive, call_kwargs))
+    return (text, model, meta) if return_meta else (text, model)
+
+
+async def achat_completions_stream_cascade(
+    *,
+    messages: List[Dict[str, str]],
+    models: Optional[List[str]] = None,
+    temperature: float = 0.7,
+    max_tokens: int = 1024,
+    timeout: int = 45,
+    adaptive: bool = True,
+) -> tuple:
+    """Async ``chat_completions_stream_cascade``: ``(model_used, chunks)``."""
+    return await ai_flow.arun(_stream_cascade_flow(messages, models, temperature, max_tokens, timeout, adaptive))
+
+
+# (sync, async) pair for the AI generators' ai_flow flows.
+CASCADE = (chat_completions_cascade, achat_completions_cascade)
@@ -1,11 +1,25 @@
+import asyncio
 import os
+import threading
 import time
 from typing import Any, Dict, List, Optional
 
-import requests
-
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
-DEFAULT_MODEL = "openrouter/aurora-alpha"
+from . import ai_flow, ai_governor, ai_ledger, deadlines
+from .openrouter_transport import (
+    BACKOFF,
+    DEFAULT_MODEL,
+    NOTE_ERROR,
+    OPEN_STREAM,
+    POST,
+    RACE,
+    RANK,
+    RECORD,
+    ModelBusy,
+    OpenRouterError,
+    _ledger_failure,
+    _payload,
+    _request_headers,
+)
 
 # Ordered list of free models to try when the caller uses `chat_completions_cascade`.
 FREE_MODEL_CASCADE = [
@@ -15,9 +29,175 @@ FREE_MODEL_CASCADE = [
 ]
 
 
-class OpenRouterError(RuntimeError):
-    pass
+def _env_hedge_delay() -> Optional[float]:
+    raw = os.environ.get("OPENROUTER_HEDGE_DELAY", "8").strip()
+    try:
+        value = float(raw)
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+# Seconds to wait for the current model before also launching the next one
+# in racing mode.  ``OPENROUTER_HEDGE_DELAY=0`` disables racing for callers
+# that pass ``hedge_delay=HEDGE_DELAY_SECONDS``.
+HEDGE_DELAY_SECONDS = _env_hedge_delay()
+
+
+def _message_content(data: Dict[str, Any], model: str) -> str:
+    """Pull the assistant text out of a Chat Completions response body."""
+    content = (data["choices"][0]["message"].get("content") or "").strip()
+    # Reasoning models (e.g. DeepSeek R1) may return empty content.
+    # In that case, fall back to the reasoning text if available.
+    if not content:
+        reasoning = data["choices"][0]["message"].get("reasoning", "")
+        if reasoning:
+            content = reasoning.strip()
+    if not content:
+        raise OpenRouterError(f"Empty response from {model}")
+    return content
+
+
+# ── Flows shared with openrouter_async ────────────────────────────
+
+def _completion_flow(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    timeout: int,
+    retries: int,
+    cancel_event: Optional[threading.Event] = None,
+):
+    headers = _request_headers()
+    payload = _payload(model, messages, temperature, max_tokens)
+
+    def _cancelled() -> bool:
+        return cancel_event is not None and cancel_event.is_set()
+
+    started = time.monotonic()
+    last_error: Optional[BaseException] = None
+    attempt = 0
+    try:
+        for attempt in range(retries + 1):
+            if _cancelled():
+                _ledger_failure(model, started, attempt, f"Cancelled before attempt {attempt + 1}", cancelled=True)
+                raise OpenRouterError(f"Cancelled before attempt {attempt + 1} on {model}")
+            try:
+                call_timeout = deadlines.timeout(timeout)
+                data = yield ai_flow.call(POST, model, headers, payload, call_timeout, cancel_event)
+                text = _message_content(data, model)
+                prompt_tokens, completion_tokens = ai_ledger.openrouter_usage(data)
+                ai_ledger.record(
+                    provider="openrouter", model=model, latency=time.monotonic() - started,
+                    outcome="ok", retries=attempt,
+                    prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                )
+                return text
+            except ai_governor.Saturated as e:
+                _ledger_failure(model, started, attempt, str(e), cancelled=_cancelled())
+                raise ModelBusy(str(e)) from e
+            except deadlines.DeadlineExceeded as e:
+                last_error = e
+                break
+            except Exception as e:
+                last_error = e
+                if attempt >= retries:
+                    break
+                if (yield ai_flow.call(NOTE_ERROR, "openrouter", model, e)):
+                    continue        # the next attempt waits out the cooldown in the governor's queue
+                backoff = 1.5 ** attempt
+                if not deadlines.allows(backoff):
+                    break
+                if (yield ai_flow.call(BACKOFF, backoff, cancel_event)):
+                    break
+    except asyncio.CancelledError:
+        # An async race loser or a disconnected client.
+        _ledger_failure(model, started, attempt, "cancelled", cancelled=True)
+        raise
+
+    _ledger_failure(model, started, attempt, str(last_error), cancelled=_cancelled())
+    raise OpenRouterError(f"OpenRouter request failed: {last_error}")
+
+
+def _tracked_flow(model: str, call_kwargs: Dict[str, Any], cancel_event: Optional[threading.Event] = None):
+    """One model's completion, recorded on the health scoreboard.
+
+    A race loser that was cancelled, a call the governor turned away or one
+    cut short by the request deadline says nothing about the model, so
+    records nothing.
+    """
+    started = time.monotonic()
+    try:
+        text = yield from _completion_flow(model=model, cancel_event=cancel_event, **call_kwargs)
+    except OpenRouterError as e:
+        if (not isinstance(e, ModelBusy) and not deadlines.expired()
+                and (cancel_event is None or not cancel_event.is_set())):
+            yield ai_flow.call(RECORD, model, False, time.monotonic() - started, str(e))
+        raise
+    yield ai_flow.call(RECORD, model, True, time.monotonic() - started)
+    return text
+
+
+def _sequential_flow(models: List[str], call_kwargs: Dict[str, Any]):
+    started = time.monotonic()
+    last_error: Optional[BaseException] = None
+    for model in models:
+        if deadlines.expired():
+            last_error = deadlines.DeadlineExceeded(f"request deadline reached before {model}")
+            break
+        try:
+            print(f"[AI] Trying OpenRouter model: {model}")
+            text = yield from _tracked_flow(model, call_kwargs)
+            print(f"[AI] Success with {model}")
+            meta = {
+                "mode": "sequential",
+                "model": model,
+                "elapsed": round(time.monotonic() - started, 3),
+            }
+            return text, model, meta
+        except OpenRouterError as e:
+            print(f"[AI] {model} failed: {e}")
+            last_error = e
+    raise OpenRouterError(f"All free models failed. Last error: {last_error}")
+
+
+def _cascade_flow(models: Optional[List[str]], hedge_delay: Optional[float], adaptive: bool,
+                  call_kwargs: Dict[str, Any]):
+    models = list(models or FREE_MODEL_CASCADE)
+    if adaptive:
+        models = yield ai_flow.call(RANK, models)
+    if hedge_delay is not None and len(models) > 1:
+        return (yield ai_flow.call(RACE, models, hedge_delay, call_kwargs, _tracked_flow))
+    return (yield from _sequential_flow(models, call_kwargs))
+
+
+def _stream_cascade_flow(messages: List[Dict[str, str]], models: Optional[List[str]], temperature: float,
+                         max_tokens: int, timeout: int, adaptive: bool):
+    models = list(models or FREE_MODEL_CASCADE)
+    if adaptive:
+        models = yield ai_flow.call(RANK, models)
+
+    last_error: Optional[BaseException] = None
+    for model in models:
+        if deadlines.expired():
+            last_error = deadlines.DeadlineExceeded(f"request deadline reached before {model}")
+            break
+        print(f"[AI] Streaming from OpenRouter model: {model}")
+        try:
+            chunks = yield ai_flow.call(
+                OPEN_STREAM, messages=messages, model=model, temperature=temperature,
+                max_tokens=max_tokens, timeout=timeout,
+            )
+        except OpenRouterError as e:
+            print(f"[AI] {model} stream failed: {e}")
+            last_error = e
+            continue
+        return model, chunks
+    raise OpenRouterError(f"All free models failed. Last error: {last_error}")
+
 
+# ── Public API ────────────────────────────────────────────────────
 
 def chat_completions(
     *,
@@ -27,89 +207,71 @@ def chat_completions(
     max_tokens: int = 1024,
     timeout: int = 60,
     retries: int = 2,
+    cancel_event: Optional[threading.Event] = None,
 ) -> str:
     """Call OpenRouter Chat Completions and return the assistant message content.
 
-    Uses OPENROUTER_API_KEY from the environment.
+    Uses OPENROUTER_API_KEY from the environment.  When *cancel_event* is set
+    (e.g. another model already won a race) no further attempts are made.
+    Each attempt's *timeout* is shrunk to the request's remaining budget, and
+    no retry is made once it's spent.
     """
+    return ai_flow.run(_completion_flow(messages, model, temperature, max_tokens, timeout, retries, cancel_event))
 
-    api_key = os.environ.get("OPENROUTER_API_KEY", "").strip()
-    if not api_key:
-        raise OpenRouterError("OPENROUTER_API_KEY is missing")
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-        # Optional but helps OpenRouter attribute traffic.
-        "HTTP-Referer": os.environ.get("SITE_URL", "https://whatsnext.dev"),
-        "X-Title": os.environ.get("OPENROUTER_APP_NAME", "What's Next"),
-    }
+def chat_completions_cascade(
+    *,
+    messages: List[Dict[str, str]],
+    models: Optional[List[str]] = None,
+    temperature: float = 0.7,
+    max_tokens: int = 1024,
+    timeout: int = 90,
+    hedge_delay: Optional[float] = None,
+    adaptive: bool = True,
+    return_meta: bool = False,
+) -> tuple:
+    """Try each model in *models* (defaults to FREE_MODEL_CASCADE) until one
+    succeeds.  Returns ``(content, model_used)``, or
+    ``(content, model_used, meta)`` when *return_meta* is true.
+
+    With *hedge_delay* set the cascade races instead of running strictly in
+    sequence: the first model starts immediately, and each further model is
+    launched once *hedge_delay* seconds pass without a valid answer (or as
+    soon as an in-flight model fails).  The first valid completion wins and
+    the losers are told to stop retrying.
 
-    payload: Dict[str, Any] = {
-        "model": model,
+    With *adaptive* (the default) the cascade is reordered by the shared
+    model health scoreboard and models with an open circuit are skipped.
+
+    Inside a request the cascade stops at the request deadline (see
+    ``deadlines``) and raises OpenRouterError, leaving the caller time to
+    return its fallback.
+    """
+    call_kwargs = {
         "messages": messages,
         "temperature": temperature,
         "max_tokens": max_tokens,
+        "timeout": timeout,
+        "retries": 1,
     }
-
-    last_error: Optional[BaseException] = None
-    for attempt in range(retries + 1):
-        try:
-            resp = requests.post(
-                OPENROUTER_API_URL,
-                headers=headers,
-                json=payload,
-                timeout=timeout,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            content = (data["choices"][0]["message"].get("content") or "").strip()
-            # Reasoning models (e.g. DeepSeek R1) may return empty content.
-            # In that case, fall back to the reasoning text if available.
-            if not content:
-                reasoning = data["choices"][0]["message"].get("reasoning", "")
-                if reasoning:
-                    content = reasoning.strip()
-            if not content:
-                raise OpenRouterError(f"Empty response from {model}")
-            return content
-        except Exception as e:
-            last_error = e
-            if attempt >= retries:
-                break
-            backoff = 1.5 ** attempt
-            time.sleep(backoff)
-
-    raise OpenRouterError(f"OpenRouter request failed: {last_error}")
+    text, model, meta = ai_flow.run(_cascade_flow(models, hedge_delay, adaptive, call_kwargs))
+    return (text, model, meta) if return_meta else (text, model)
 
 
-def chat_completions_cascade(
+def chat_completions_stream_cascade(
     *,
     messages: List[Dict[str, str]],
     models: Optional[List[str]] = None,
     temperature: float = 0.7,
     max_tokens: int = 1024,
-    timeout: int = 90,
+    timeout: int = 45,
+    adaptive: bool = True,
 ) -> tuple:
-    """Try each model in *models* (defaults to FREE_MODEL_CASCADE) until one
-    succeeds.  Returns ``(content, model_used)``.
+    """Open a streaming completion on the first model that produces a token.
+
+    Returns ``(model_used, chunks)`` where *chunks* yields every content
+    delta, starting with the one already received.  Once a model has
+    started streaming there is no switching; later failures surface as
+    OpenRouterError from the iterator.
     """
-    models = models or FREE_MODEL_CASCADE
-    last_error: Optional[BaseException] = None
-    for model in models:
-        try:
-            print(f"[AI] Trying OpenRouter model: {model}")
-            text = chat_completions(
-                messages=messages,
-                model=model,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                timeout=timeout,
-                retries=1,
-            )
-            print(f"[AI] Success with {model}")
-            return text, model
-        except OpenRouterError as e:
-            print(f"[AI] {model} failed: {e}")
-            last_error = e
-    raise OpenRouterError(f"All free models failed. Last error: {last_error}")
+    return ai_flow.run(_stream_cascade_flow(messages, models, temperature, max_tokens, timeout, adaptive))
@@ -0,0 +1,492 @@
+"""
+OpenRouter transport
+====================
+The part of the OpenRouter clients that differs between sync and async.
+``openrouter_client`` writes the retry, cascade and streaming-cascade
+logic once as ``ai_flow`` flows; every step those flows take is one of
+the ``(sync, async)`` pairs at the bottom of this module, so neither
+client imports the other's transport.
+
+* ``POST`` / ``BACKOFF``       — one completion request; the sleep before a retry.
+* ``NOTE_ERROR`` / ``RANK`` / ``RECORD`` — governor cooldowns and the
+  ``model_health`` scoreboard (Django cache I/O).
+* ``RACE``                     — hedged race: worker threads, or tasks that
+  are cancelled outright when another model wins.
+* ``OPEN_STREAM`` / ``STREAM_TEXT`` — token streams opened on their first
+  delta, or joined into one string.
+
+``chat_completions_stream`` and ``achat_completions_stream`` share the
+SSE parsing, guard, deadline and ledger/health bookkeeping through
+``_StreamRun``; only reading the socket differs.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from asgiref.sync import sync_to_async
+
+from . import ai_flow, ai_governor, ai_ledger, deadlines, model_health
+from .http_client import ahttp_post, ahttp_stream, http_post
+
+# Overridable to point at a local stand-in (core/fake_llm.py) for load tests.
+OPENROUTER_API_URL = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+DEFAULT_MODEL = "openrouter/aurora-alpha"
+
+
+class OpenRouterError(RuntimeError):
+    pass
+
+
+class ModelBusy(OpenRouterError):
+    """The governor kept the call out (no slot/quota, or a 429 cooldown); says nothing about the model's health."""
+
+
+def _request_headers() -> Dict[str, str]:
+    """Auth + attribution headers; uses OPENROUTER_API_KEY from the environment."""
+    api_key = os.environ.get("OPENROUTER_API_KEY", "").strip()
+    if not api_key:
+        raise OpenRouterError("OPENROUTER_API_KEY is missing")
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        # Optional but helps OpenRouter attribute traffic.
+        "HTTP-Referer": os.environ.get("SITE_URL", "https://whatsnext.dev"),
+        "X-Title": os.environ.get("OPENROUTER_APP_NAME", "What's Next"),
+    }
+
+
+def _payload(model: str, messages: List[Dict[str, str]], temperature: float, max_tokens: int,
+             stream: bool = False) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+def _ledger_failure(model: str, started: float, retries: int, error: str,
+                    *, cancelled: bool = False, streamed: bool = False) -> None:
+    ai_ledger.record(
+        provider="openrouter", model=model, latency=time.monotonic() - started,
+        outcome="cancelled" if cancelled else "error", retries=retries,
+        streamed=streamed, error=error,
+    )
+
+
+# Scoreboard reads/writes hit the Django cache (Redis in production).
+_record_result = sync_to_async(model_health.record_result, thread_sensitive=False)
+_rank_models = sync_to_async(model_health.rank_models, thread_sensitive=False)
+
+
+# ── Single requests ───────────────────────────────────────────────
+
+def _post(model: str, headers: Dict[str, str], payload: Dict[str, Any], timeout,
+          cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+    with ai_governor.slot("openrouter", model, hold=timeout, cancel_event=cancel_event):
+        resp = http_post(OPENROUTER_API_URL, headers=headers, json=payload, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def _apost(model: str, headers: Dict[str, str], payload: Dict[str, Any], timeout,
+                 cancel_event=None) -> Dict[str, Any]:
+    # Async race losers are cancelled as tasks, so *cancel_event* is always None here.
+    async with ai_governor.aslot("openrouter", model, hold=timeout):
+        resp = await ahttp_post(OPENROUTER_API_URL, headers=headers, json=payload, timeout=timeout)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _backoff(seconds: float, cancel_event: Optional[threading.Event] = None) -> bool:
+    """Sleep before a retry; True if *cancel_event* was set meanwhile."""
+    if cancel_event is not None:
+        return cancel_event.wait(seconds)
+    time.sleep(seconds)
+    return False
+
+
+async def _abackoff(seconds: float, cancel_event=None) -> bool:
+    await asyncio.sleep(seconds)
+    return False
+
+
+# ── Hedged races ──────────────────────────────────────────────────
+
+class _Race:
+    """Launch order, timings and the result of a hedged race."""
+
+    def __init__(self, models: List[str], hedge_delay: float):
+        self.models = models
+        self.hedge_delay = hedge_delay
+        self.started = time.monotonic()
+        self.launched: List[Dict[str, Any]] = []
+        self.last_error: Optional[BaseException] = None
+
+    def next_model(self) -> str:
+        model = self.models[len(self.launched)]
+        offset = round(time.monotonic() - self.started, 3)
+        self.launched.append({"model": model, "started_at": offset})
+        print(f"[AI] Racing OpenRouter model: {model} (+{offset:.1f}s)")
+        return model
+
+    def can_hedge(self) -> bool:
+        return len(self.launched) < len(self.models) and not deadlines.expired()
+
+    def failed(self, model: str, error: BaseException) -> None:
+        print(f"[AI] {model} failed: {error}")
+        self.last_error = error
+
+    def won(self, model: str) -> Dict[str, Any]:
+        elapsed = round(time.monotonic() - self.started, 3)
+        winner_start = next(e["started_at"] for e in self.launched if e["model"] == model)
+        print(f"[AI] Race won by {model} in {elapsed:.1f}s ({len(self.launched)} launched)")
+        return {
+            "mode": "race",
+            "model": model,
+            "elapsed": elapsed,
+            "hedge_delay": self.hedge_delay,
+            "hedge_elapsed": winner_start,
+            "launched": self.launched,
+        }
+
+    def error(self) -> OpenRouterError:
+        return OpenRouterError(f"All free models failed. Last error: {self.last_error}")
+
+
+def _race(models: List[str], hedge_delay: float, call_kwargs: Dict[str, Any],
+          make_flow: Callable[..., ai_flow.Flow]) -> tuple:
+    """Race ``make_flow(model, call_kwargs, cancel_event)`` flows on worker threads."""
+    race = _Race(models, hedge_delay)
+    cancel = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=len(models), thread_name_prefix="openrouter-race")
+    pending: Dict[Any, str] = {}
+
+    def _launch():
+        model = race.next_model()
+        # Run in a copy of the caller's context so the ledger sees its call site.
+        flow = make_flow(model, call_kwargs, cancel)
+        pending[pool.submit(contextvars.copy_context().run, ai_flow.run, flow)] = model
+
+    try:
+        _launch()
+        while pending:
+            can_hedge = race.can_hedge()
+            done, _ = wait(
+                list(pending),
+                timeout=deadlines.cap(hedge_delay if can_hedge else None),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                if deadlines.past_due():
+                    race.last_error = deadlines.DeadlineExceeded("request deadline reached while racing")
+                    break
+                # Nobody answered within the hedge window: add the next model.
+                if can_hedge:
+                    _launch()
+                continue
+
+            for future in done:
+                model = pending.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    race.failed(model, e)
+                    continue
+                return text, model, race.won(model)
+
+            # A failure frees a slot — don't wait out the hedge window.
+            if race.can_hedge():
+                _launch()
+    finally:
+        cancel.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    raise race.error()
+
+
+async def _arace(models: List[str], hedge_delay: float, call_kwargs: Dict[str, Any],
+                 make_flow: Callable[..., ai_flow.Flow]) -> tuple:
+    """Race ``make_flow(model, call_kwargs)`` flows as tasks; losers are cancelled."""
+    race = _Race(models, hedge_delay)
+    pending: Dict[asyncio.Task, str] = {}
+
+    def _launch():
+        model = race.next_model()
+        pending[asyncio.create_task(ai_flow.arun(make_flow(model, call_kwargs)))] = model
+
+    try:
+        _launch()
+        while pending:
+            can_hedge = race.can_hedge()
+            done, _ = await asyncio.wait(
+                list(pending),
+                timeout=deadlines.cap(hedge_delay if can_hedge else None),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                if deadlines.past_due():
+                    race.last_error = deadlines.DeadlineExceeded("request deadline reached while racing")
+                    break
+                # Nobody answered within the hedge window: add the next model.
+                if can_hedge:
+                    _launch()
+                continue
+
+            for task in done:
+                model = pending.pop(task)
+                try:
+                    text = task.result()
+                except Exception as e:
+                    race.failed(model, e)
+                    continue
+                return text, model, race.won(model)
+
+            # A failure frees a slot — don't wait out the hedge window.
+            if race.can_hedge():
+                _launch()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    raise race.error()
+
+
+# ── Streaming ─────────────────────────────────────────────────────
+
+class _StreamRun:
+    """
+    One model's token stream, minus the socket: SSE parsing, the guard,
+    the request deadline and the ledger/health outcome.
+    """
+
+    def __init__(self, model: str, guard=None):
+        self.model = model
+        self.guard = guard
+        self.started = time.monotonic()
+        self.produced = False
+        self.usage: Dict[str, Any] = {}
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def check_response(self, throttled: bool, status_code: int) -> None:
+        if throttled:
+            raise ModelBusy(f"OpenRouter stream failed: HTTP 429 from {self.model}")
+        if status_code >= 400:
+            raise OpenRouterError(f"OpenRouter stream failed: HTTP {status_code}")
+
+    def feed(self, raw: Optional[str]) -> Optional[str]:
+        """The content delta in one SSE line ("" if none), or None at ``[DONE]``."""
+        # SSE comments (": OPENROUTER PROCESSING") keep the socket alive.
+        if not raw or not raw.startswith("data:"):
+            return ""
+        data = raw[5:].strip()
+        if data == "[DONE]":
+            return None
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            return ""
+        if chunk.get("error"):
+            raise OpenRouterError(f"OpenRouter stream error: {chunk['error']}")
+        self.usage = chunk.get("usage") or self.usage   # sent on the final chunk
+        choices = chunk.get("choices") or [{}]
+        delta = (choices[0].get("delta") or {}).get("content") or ""
+        if delta:
+            self.produced = True
+            if self.guard is not None:
+                self.guard.feed(delta)
+        return delta
+
+    def done(self) -> bool:
+        """True once the guard has its whole payload; raises at the request deadline."""
+        if self.guard is not None and self.guard.complete:
+            return True
+        if deadlines.expired():
+            raise deadlines.DeadlineExceeded(f"request deadline reached mid-stream from {self.model}")
+        return False
+
+    def finish(self) -> None:
+        if not self.produced:
+            raise OpenRouterError(f"Empty response from {self.model}")
+
+    def failed(self, error: BaseException):
+        """
+        Ledger a failed stream.  Returns ``(counts_against_model, error_to_raise)``:
+        governor refusals and the request deadline say nothing about the model.
+        """
+        _ledger_failure(self.model, self.started, 0, str(error), streamed=True)
+        if isinstance(error, ai_governor.Saturated):
+            return False, ModelBusy(str(error))
+        if isinstance(error, ModelBusy):
+            return False, error
+        if isinstance(error, deadlines.DeadlineExceeded):
+            return False, OpenRouterError(f"OpenRouter stream failed: {error}")
+        if isinstance(error, OpenRouterError):
+            return True, error
+        return not deadlines.expired(), OpenRouterError(f"OpenRouter stream failed: {error}")
+
+    def cancelled(self) -> None:
+        _ledger_failure(self.model, self.started, 0, "cancelled", cancelled=True, streamed=True)
+
+    def succeeded(self) -> None:
+        prompt_tokens, completion_tokens = ai_ledger.openrouter_usage({"usage": self.usage})
+        ai_ledger.record(
+            provider="openrouter", model=self.model, latency=self.elapsed(), outcome="ok",
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, streamed=True,
+        )
+
+
+def chat_completions_stream(
+    *,
+    messages: List[Dict[str, str]],
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.7,
+    max_tokens: int = 1024,
+    timeout: int = 60,
+    guard=None,
+) -> Iterator[str]:
+    """Stream an OpenRouter completion, yielding content deltas as they arrive.
+
+    Raises OpenRouterError if the request fails or the stream ends without
+    producing any content.  The outcome is recorded on the health scoreboard.
+
+    *guard* (``structured_output.JsonStreamGuard``) is fed every delta: the
+    stream fails as soon as it rejects the text and stops once it reports
+    the JSON payload complete.  A stream still running at the request
+    deadline fails too.
+    """
+    headers = _request_headers()
+    payload = _payload(model, messages, temperature, max_tokens, stream=True)
+
+    run = _StreamRun(model, guard)
+    lease = resp = None
+    try:
+        timeout = deadlines.timeout(timeout)
+        lease = ai_governor.acquire("openrouter", model, hold=timeout)
+        resp = http_post(OPENROUTER_API_URL, headers=headers, json=payload, timeout=timeout, stream=True)
+        run.check_response(ai_governor.note_response("openrouter", model, resp), resp.status_code)
+        for raw in resp.iter_lines(decode_unicode=True):
+            delta = run.feed(raw)
+            if delta is None:
+                break
+            if delta:
+                yield delta
+            if run.done():
+                break
+        run.finish()
+    except Exception as e:
+        counts, error = run.failed(e)
+        if counts:
+            model_health.record_result(model, False, run.elapsed(), str(e))
+        if error is e:
+            raise
+        raise error from e
+    else:
+        model_health.record_result(model, True, run.elapsed())
+        run.succeeded()
+    finally:
+        if resp is not None:
+            resp.close()
+        if lease is not None:
+            lease.release()
+
+
+async def achat_completions_stream(
+    *,
+    messages: List[Dict[str, str]],
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.7,
+    max_tokens: int = 1024,
+    timeout: int = 60,
+    guard=None,
+) -> AsyncIterator[str]:
+    """Async ``chat_completions_stream``: yield content deltas as they arrive (*guard* and deadline as there)."""
+    headers = _request_headers()
+    payload = _payload(model, messages, temperature, max_tokens, stream=True)
+
+    run = _StreamRun(model, guard)
+    try:
+        timeout = deadlines.timeout(timeout)
+        async with ai_governor.aslot("openrouter", model, hold=timeout), \
+                ahttp_stream("POST", OPENROUTER_API_URL, headers=headers, json=payload, timeout=timeout) as resp:
+            run.check_response(await ai_governor.anote_response("openrouter", model, resp), resp.status_code)
+            async for raw in resp.aiter_lines():
+                delta = run.feed(raw)
+                if delta is None:
+                    break
+                if delta:
+                    yield delta
+                if run.done():
+                    break
+        run.finish()
+    except (asyncio.CancelledError, GeneratorExit):
+        # Client disconnected mid-stream.
+        run.cancelled()
+        raise
+    except Exception as e:
+        counts, error = run.failed(e)
+        if counts:
+            await _record_result(model, False, run.elapsed(), str(e))
+        if error is e:
+            raise
+        raise error from e
+    else:
+        await _record_result(model, True, run.elapsed())
+        run.succeeded()
+
+
+def _open_stream(*, model: str, **kwargs) -> Iterator[str]:
+    """``chat_completions_stream`` once its first delta has arrived (so a dead model fails here)."""
+    chunks = chat_completions_stream(model=model, **kwargs)
+    try:
+        first = next(chunks)
+    except StopIteration:
+        raise OpenRouterError(f"Empty response from {model}")
+    return itertools.chain([first], chunks)
+
+
+async def _prepend(first: str, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    yield first
+    async for chunk in chunks:
+        yield chunk
+
+
+async def _aopen_stream(*, model: str, **kwargs) -> AsyncIterator[str]:
+    chunks = achat_completions_stream(model=model, **kwargs)
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        raise OpenRouterError(f"Empty response from {model}")
+    return _prepend(first, chunks)
+
+
+def _stream_text(**kwargs) -> str:
+    return "".join(chat_completions_stream(**kwargs))
+
+
+async def _astream_text(**kwargs) -> str:
+    return "".join([delta async for delta in achat_completions_stream(**kwargs)])
+
+
+# ── (sync, async) pairs for ai_flow ───────────────────────────────
+
+POST = (_post, _apost)
+BACKOFF = (_backoff, _abackoff)
+NOTE_ERROR = (ai_governor.note_error, ai_governor.anote_error)
+RANK = (model_health.rank_models, _rank_models)
+RECORD = (model_health.record_result, _record_result)
+RACE = (_race, _arace)
+OPEN_STREAM = (_open_stream, _aopen_stream)
+STREAM_TEXT = (_stream_text, _astream_text)
@@ -0,0 +1,143 @@
+"""
+Module warm-ahead
+=================
+When a module is unlocked the learner's next clicks are "generate
+lessons" and "start lesson quiz" on it — both cold LLM calls.
+``on_module_unlocked`` queues ``tasks.prefetch_module_content`` at the
+lowest Celery priority so those are ready (the shared ``LessonPlan``
+attached to the item, lesson quizzes in ``ai_cache``) by the time the
+learner opens them.
+
+``on_quiz_served`` does the same for a quiz the learner was just shown a
+rule-based version of (``quiz_engine``): ``tasks.prefetch_quiz`` generates
+the AI quiz into ``ai_cache`` and the view swaps it in on the next visit.
+
+Anything already warm is skipped: an existing lesson plan, banked lesson
+quizzes (``question_bank``) and ``ai_cache`` hits cost no LLM call.
+"""
+
+import os
+import threading
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+
+from . import ai_governor
+
+PREFETCH_PRIORITY = 9                     # lowest; user-facing tasks run at 0
+PREFETCH_LESSON_QUIZZES = int(os.getenv("PREFETCH_LESSON_QUIZZES", "14"))
+DEDUPE_TTL = 600
+
+# Same defaults generate_module_lessons uses, so the view resolves the same plan.
+DEFAULT_PLATFORM = 'freeCodeCamp'
+DEFAULT_LEVEL = 'intermediate'
+
+
+def _dispatch(task, target, *args):
+    if not os.getenv("CELERY_BROKER_URL"):
+        # No broker in local dev: warm on a daemon thread instead.
+        threading.Thread(target=target, args=args, daemon=True).start()
+        return
+    try:
+        # retry=False: an unreachable broker must not stall the request.
+        task.apply_async(args=list(args), priority=PREFETCH_PRIORITY, retry=False)
+    except Exception as e:
+        print(f"[AI] Could not queue {task.name} for {args}: {e}")
+
+
+def on_module_unlocked(item):
+    """Queue a warm-up of *item*'s lessons and first lesson quizzes (once per 10 min)."""
+    if not cache.add(f"prefetch:module:{item.id}", 1, DEDUPE_TTL):
+        return
+    from .tasks import prefetch_module_content
+
+    item_id = item.id
+    transaction.on_commit(lambda: _dispatch(prefetch_module_content, warm_module, item_id))
+
+
+def on_quiz_served(item, kind):
+    """Queue AI generation of *item*'s module quiz or lesson quizzes (*kind*), once per 10 min."""
+    if not cache.add(f"prefetch:quiz:{kind}:{item.id}", 1, DEDUPE_TTL):
+        return
+    from .tasks import prefetch_quiz
+
+    item_id = item.id
+    transaction.on_commit(lambda: _dispatch(prefetch_quiz, warm_quiz, item_id, kind))
+
+
+@ai_governor.prioritized("background")
+def warm_module(item_id):
+    """Generate lessons and the first lesson quizzes for a roadmap item unless already warm."""
+    from .ai_logic import generate_module_lesson_quizzes
+    from .lesson_plans import get_or_generate, lessons_for_item
+    from .models import UserRoadmapItem
+    from . import question_bank
+
+    item = UserRoadmapItem.objects.select_related('user', 'lesson_plan').filter(id=item_id).first()
+    if item is None:
+        return {"status": "missing"}
+
+    warmed = {"lessons": False, "quizzes": 0}
+    if not item.lesson_plan_id:
+        plan, _, generated = get_or_generate(
+            module_title=item.label,
+            module_description=item.description,
+            user_level=item.user.current_level or DEFAULT_LEVEL,
+            platform=DEFAULT_PLATFORM,
+            tech_stack=item.label.split()[0] if item.label else "JavaScript",
+        )
+        if plan is not None:
+            # Only attach if the learner didn't pick a plan meanwhile.
+            UserRoadmapItem.objects.filter(id=item.id, lesson_plan__isnull=True).update(lesson_plan=plan)
+            item.refresh_from_db(fields=['lesson_plan'])
+        warmed["lessons"] = generated
+
+    # start_lesson_quiz resolves lessons from the lesson plan first, then the outline
+    lessons_list = lessons_for_item(item)
+    if not lessons_list:
+        lessons_list = (item.resources or {}).get('lesson_outline') or []
+
+    unbanked = [
+        lesson for lesson in lessons_list[:PREFETCH_LESSON_QUIZZES]
+        if lesson.get('title') and question_bank.pick('lesson', item.label, lesson['title']) is None
+    ]
+    if unbanked:
+        # One batched call; lessons already in ai_cache are skipped
+        warmed["quizzes"] = len(generate_module_lesson_quizzes(item.label, unbanked))
+
+    print(f"[AI] Prefetched module {item_id} ({item.label}): {warmed}")
+    return {"status": "ok", **warmed}
+
+
+@ai_governor.prioritized("background")
+def warm_quiz(item_id, kind):
+    """Generate the AI module quiz (``kind='module'``) or every lesson quiz into ai_cache."""
+    from .ai_logic import generate_module_lesson_quizzes, generate_quiz
+    from .lesson_plans import lessons_for_item
+    from .models import UserRoadmapItem
+    from . import question_bank, quiz_engine
+
+    item = UserRoadmapItem.objects.select_related('lesson_plan').filter(id=item_id).first()
+    if item is None:
+        return {"status": "missing"}
+
+    if kind == 'module':
+        warmed = 0
+        if question_bank.pick('module', item.label, description=item.description) is None:
+            warmed = int(not quiz_engine.is_rule_based(generate_quiz(item.label, item.description)))
+    else:
+        lessons_list = lessons_for_item(item)
+        if not lessons_list:
+            lessons_list = (item.resources or {}).get('lesson_outline') or []
+        unbanked = [
+            lesson for lesson in lessons_list
+            if lesson.get('title') and question_bank.pick('lesson', item.label, lesson['title']) is None
+        ]
+        warmed = len(generate_module_lesson_quizzes(item.label, unbanked)) if unbanked else 0
+
+    print(f"[AI] Prefetched {kind} quizzes for module {item_id} ({item.label}): {warmed}")
+    return {"status": "ok", "quizzes": warmed}
+
+
+aon_quiz_served = sync_to_async(on_quiz_served, thread_sensitive=False)
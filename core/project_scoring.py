@@ -3,6 +3,9 @@ Project Scoring Engine (Phase 3)
 ================================
 Automated GitHub project validation and scoring system.
 Production-ready with comprehensive error handling and tech-stack matching.
+
+GitHub calls share the request's time budget (``deadlines``): once it runs
+out the remaining checks are skipped and a partial score is returned.
 """
 
 import requests
@@ -10,8 +13,12 @@ from datetime import datetime, timedelta
 import os
 import re
 
+from . import deadlines
+from .http_client import get_session
+
 GITHUB_API_BASE = "https://api.github.com"
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", None)  # Required in production for rate limits
+GITHUB_TIMEOUT = 10  # seconds per API call, shrunk to the request's remaining budget
 
 # Minimum score required to pass verification (blocks completion if not met)
 MINIMUM_SCORE_THRESHOLD = 60
@@ -150,6 +157,19 @@ def match_tech_stack(detected_stack, module_label):
     return match_ratio >= 0.5, matched_techs, expected_techs
 
 
+def _github_get(session, url, headers, **kwargs):
+    """GET within the request's budget; None if the budget ran out first."""
+    try:
+        return session.get(url, headers=headers, timeout=deadlines.timeout(GITHUB_TIMEOUT, "GitHub"), **kwargs)
+    except deadlines.DeadlineExceeded:
+        return None
+    except requests.exceptions.RequestException:
+        # Read timeouts surface as ConnectionError through the retrying adapter.
+        if deadlines.expired():
+            return None
+        raise
+
+
 def score_github_project(github_url, module_label="", max_score=100):
     """
     Validates and scores a GitHub project submission.
@@ -170,6 +190,7 @@ def score_github_project(github_url, module_label="", max_score=100):
             "tech_match": {"passed": bool, "points": int, "message": str}
         },
         "suggestions": list[str],
+        "partial": bool (checks skipped because the request ran out of time),
         "metadata": {
             "repo_url": str,
             "stars": int,
@@ -211,6 +232,7 @@ def score_github_project(github_url, module_label="", max_score=100):
     }
     
     try:
+        session = get_session()
         headers = {"Accept": "application/vnd.github.v3+json"}
         if GITHUB_TOKEN:
             headers['Authorization'] = f'token {GITHUB_TOKEN}'
@@ -219,7 +241,7 @@ def score_github_project(github_url, module_label="", max_score=100):
         
         # 1. CHECK REPOSITORY EXISTS
         repo_url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}"
-        repo_resp = requests.get(repo_url, headers=headers, timeout=10)
+        repo_resp = session.get(repo_url, headers=headers, timeout=deadlines.timeout(GITHUB_TIMEOUT, "GitHub"))
         
         if repo_resp.status_code == 404:
             checks["repo_exists"]["message"] = "Repository not found or is private"
@@ -262,11 +284,15 @@ def score_github_project(github_url, module_label="", max_score=100):
         metadata["stars"] = repo_data.get('stargazers_count', 0)
         metadata["language"] = repo_data.get('language', 'Unknown')
         
+        skipped = []
+
         # 2. CHECK README
         readme_url = f"{repo_url}/readme"
-        readme_resp = requests.get(readme_url, headers=headers, timeout=10)
+        readme_resp = _github_get(session, readme_url, headers)
         
-        if readme_resp.status_code == 200:
+        if readme_resp is None:
+            skipped.append("has_readme")
+        elif readme_resp.status_code == 200:
             readme_data = readme_resp.json()
             readme_size = readme_data.get('size', 0)
             
@@ -284,9 +310,11 @@ def score_github_project(github_url, module_label="", max_score=100):
         
         # 3. CHECK COMMITS
         commits_url = f"{repo_url}/commits"
-        commits_resp = requests.get(commits_url, headers=headers, timeout=10, params={"per_page": 100})
+        commits_resp = _github_get(session, commits_url, headers, params={"per_page": 100})
         
-        if commits_resp.status_code == 200:
+        if commits_resp is None:
+            skipped.extend(["recent_activity", "multiple_commits"])
+        elif commits_resp.status_code == 200:
             commits = commits_resp.json()
             
             if commits:
@@ -334,10 +362,12 @@ def score_github_project(github_url, module_label="", max_score=100):
         
         # 4. CHECK CODE FILES
         contents_url = f"{repo_url}/contents"
-        contents_resp = requests.get(contents_url, headers=headers, timeout=10)
+        contents_resp = _github_get(session, contents_url, headers)
         
         repo_contents = []
-        if contents_resp.status_code == 200:
+        if contents_resp is None:
+            skipped.extend(["has_code", "has_tests"])
+        elif contents_resp.status_code == 200:
             repo_contents = contents_resp.json()
             
             # Filter to actual code files
@@ -380,7 +410,7 @@ def score_github_project(github_url, module_label="", max_score=100):
             checks["has_tests"]["passed"] = True
             checks["has_tests"]["points"] = 10
             checks["has_tests"]["message"] = "Test suite detected"
-        else:
+        elif "has_tests" not in skipped:
             checks["has_tests"]["message"] = "No tests found"
             suggestions.append("Adding tests demonstrates code quality and professional practices")
         
@@ -411,23 +441,29 @@ def score_github_project(github_url, module_label="", max_score=100):
             checks["tech_match"]["points"] = 10
             checks["tech_match"]["message"] = f"Detected: {', '.join(detected_stack) if detected_stack else 'general project'}"
         
+        for name in skipped:
+            checks[name]["message"] = "Not checked: GitHub did not answer in time"
+
         # Calculate final score
         total_score = sum(check["points"] for check in checks.values())
         passed = total_score >= MINIMUM_SCORE_THRESHOLD
         
-        if not passed:
+        if skipped:
+            suggestions.insert(0, "Some checks were skipped because GitHub answered slowly. Score again in a moment to include them.")
+        elif not passed:
             suggestions.insert(0, f"Score {total_score}/100 is below the minimum threshold of {MINIMUM_SCORE_THRESHOLD}. Please improve your project and try again.")
         
         return {
             "score": min(total_score, max_score),
             "passed": passed,
             "valid": True,
+            "partial": bool(skipped),
             "checks": checks,
             "suggestions": suggestions,
             "metadata": metadata
         }
         
-    except requests.exceptions.Timeout:
+    except (requests.exceptions.Timeout, deadlines.DeadlineExceeded):
         return {
             "score": 0,
             "passed": False,
@@ -0,0 +1,122 @@
+"""
+Question bank
+=============
+Every catalog in ``core/catalogs/`` is static, so module and lesson
+quizzes for catalog roadmaps are generated ahead of time by
+``manage.py build_question_bank`` and stored in ``QuestionBank``.
+
+* ``catalog_entries`` — every distinct module and lesson in ``ROLE_CATALOG``.
+* ``validate``        — structural check applied before anything is banked.
+* ``pick`` / ``apick`` — a banked variant for a module or lesson, or None
+  (custom AI roadmaps, or a bank that has not been built yet), in which
+  case the views fall back to live generation.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List, Optional
+
+from asgiref.sync import sync_to_async
+
+from .role_catalog import ROLE_CATALOG
+
+MIN_QUESTIONS = 3
+OPTIONS_PER_QUESTION = 4
+
+
+def catalog_entries(role_keys=None) -> Iterator[dict]:
+    """
+    Yield ``{kind, module_label, description, lesson_title, lesson_description}``
+    for each distinct module and lesson.  Several roles share a module label
+    with their own description and lessons: module quizzes are distinct per
+    (label, description), lessons per (label, lesson title).
+    """
+    seen = set()
+    for role_key, template in ROLE_CATALOG.items():
+        if role_keys and role_key not in role_keys:
+            continue
+        for module in template.get("modules", []):
+            label = module.get("label", "")
+            if not label:
+                continue
+            description = module.get("description", "")
+            if ("module", label, description) not in seen:
+                seen.add(("module", label, description))
+                yield {
+                    "kind": "module",
+                    "module_label": label,
+                    "description": description,
+                    "lesson_title": "",
+                    "lesson_description": "",
+                }
+            for lesson in module.get("lessons") or []:
+                title = lesson.get("title")
+                if not title or ("lesson", label, title) in seen:
+                    continue
+                seen.add(("lesson", label, title))
+                yield {
+                    "kind": "lesson",
+                    "module_label": label,
+                    "description": description,
+                    "lesson_title": title,
+                    "lesson_description": lesson.get("description", ""),
+                }
+
+
+def validate(questions) -> List[str]:
+    """Return a list of problems with *questions*; empty means bankable."""
+    if not isinstance(questions, list):
+        return ["not a list"]
+    problems = []
+    if len(questions) < MIN_QUESTIONS:
+        problems.append(f"only {len(questions)} questions")
+    seen = set()
+    for i, q in enumerate(questions):
+        if not isinstance(q, dict):
+            problems.append(f"q{i}: not an object")
+            continue
+        text = q.get("question")
+        options = q.get("options")
+        correct = q.get("correct")
+        if not isinstance(text, str) or not text.strip():
+            problems.append(f"q{i}: missing question text")
+        elif text.strip().lower() in seen:
+            problems.append(f"q{i}: duplicate question")
+        else:
+            seen.add(text.strip().lower())
+        if (
+            not isinstance(options, list)
+            or len(options) != OPTIONS_PER_QUESTION
+            or not all(isinstance(o, str) and o.strip() for o in options)
+            or len({o.strip().lower() for o in options}) != len(options)
+        ):
+            problems.append(f"q{i}: needs {OPTIONS_PER_QUESTION} distinct options")
+        if not isinstance(correct, int) or isinstance(correct, bool) or not 0 <= correct < len(options or []):
+            problems.append(f"q{i}: correct index out of range")
+    return problems
+
+
+def pick(
+    kind: str, module_label: str, lesson_title: str = "", variant: int = 0, description: str = "",
+) -> Optional[list]:
+    """
+    Banked questions for variant ``variant % available``, or None if not
+    banked.  Module quizzes also match on the module's *description*.
+    """
+    from .models import QuestionBank
+
+    variants = list(
+        QuestionBank.objects
+        .filter(
+            kind=kind, module_label=module_label, lesson_title=lesson_title,
+            module_description=description if kind == "module" else "",
+        )
+        .order_by('variant')
+        .values_list('questions', flat=True)
+    )
+    if not variants:
+        return None
+    return variants[variant % len(variants)]
+
+
+apick = sync_to_async(pick, thread_sensitive=False)
@@ -0,0 +1,455 @@
+"""
+Rule-based quiz engine
+======================
+Deterministic multiple-choice quizzes built from catalog data, with no
+LLM call: lesson titles, descriptions and order, module descriptions,
+resource types, and distractors drawn from sibling lessons and other
+modules.  A quiz takes a fraction of a millisecond, so it serves as
+
+* the fallback when every model in the cascade failed (instead of one
+  hard-coded generic question set), and
+* an instant first response while the AI quiz is generated in the
+  background (``INSTANT_QUIZZES``); the views swap the AI quiz in on a
+  later visit once it is cached.
+
+The same inputs always give the same quiz.  Every question carries
+``"source": "rules"`` so ``is_rule_based`` can tell these apart from
+generated or banked quizzes.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import re
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+INSTANT_QUIZZES = os.getenv("INSTANT_QUIZZES", "1") == "1"
+
+QUESTIONS_PER_QUIZ = 5
+OPTIONS_PER_QUESTION = 4
+SOURCE = "rules"
+MAX_OPTION_CHARS = 140
+
+RESOURCE_TYPES = {
+    "docs": "Documentation",
+    "interactive": "Interactive exercises",
+    "video": "Video",
+    "book": "Book",
+    "tool": "Tool",
+    "course": "Course",
+    "audio": "Audio / podcast",
+    "platform": "Learning platform",
+}
+
+_PARENS_RE = re.compile(r"\([^)]*\)")
+_TERM_SPLIT_RE = re.compile(r"[,;:]|\s+(?:and|or|vs\.?)\s+|\s+—\s+")
+
+_index: Optional[dict] = None
+
+
+# ── Catalog index ─────────────────────────────────────────────────
+
+def _terms(description: str) -> List[str]:
+    """Short topic phrases from a lesson description ("Elements, tags, ..." → ["Elements", "tags"])."""
+    terms = []
+    for part in _TERM_SPLIT_RE.split(_PARENS_RE.sub("", description or "")):
+        term = part.strip(" .!?—-\"'")
+        if 3 <= len(term) <= 50 and len(term.split()) <= 6:
+            terms.append(term[0].upper() + term[1:])
+    return terms
+
+
+def _catalog() -> dict:
+    """
+    Modules by (label, description) plus global distractor pools, built
+    once per process.  Several roles share a label with their own
+    description and lessons, so modules are distinct per pair, as in
+    ``question_bank.catalog_entries``.
+    """
+    global _index
+    if _index is None:
+        from .role_catalog import ROLE_CATALOG
+
+        modules: Dict[Tuple[str, str], dict] = {}
+        by_label: Dict[str, List[dict]] = {}
+        lessons = []
+        seen_lessons = set()
+        for template in ROLE_CATALOG.values():
+            for module in template.get("modules", []):
+                label = module.get("label")
+                key = (label, module.get("description", ""))
+                if not label or key in modules:
+                    continue
+                modules[key] = module
+                by_label.setdefault(label, []).append(module)
+                for lesson in module.get("lessons") or []:
+                    if lesson.get("title") and (label, lesson["title"]) not in seen_lessons:
+                        seen_lessons.add((label, lesson["title"]))
+                        lessons.append((label, lesson))
+        _index = {
+            "modules": modules,
+            "by_label": by_label,
+            "labels": list(by_label),
+            "lessons": lessons,
+            "terms": [(label, term) for label, lesson in lessons for term in _terms(lesson.get("description", ""))],
+        }
+    return _index
+
+
+def _module(label: str, description: str = "", lesson_title: str = "") -> dict:
+    """
+    The catalog module for *label*: the one with *description* if given,
+    else the first listing *lesson_title*, else the first with that label.
+    """
+    index = _catalog()
+    if description and (label, description) in index["modules"]:
+        return index["modules"][(label, description)]
+    candidates = index["by_label"].get(label) or [{}]
+    if lesson_title:
+        for module in candidates:
+            if any(l.get("title") == lesson_title for l in module.get("lessons") or []):
+                return module
+    return candidates[0]
+
+
+# ── Question building ─────────────────────────────────────────────
+
+def _clip(text: str) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= MAX_OPTION_CHARS else text[:MAX_OPTION_CHARS - 1].rstrip() + "…"
+
+
+def _question(rng, text, correct, distractors, explanation) -> Optional[dict]:
+    """A question with *correct* and three distinct distractors, or None if there aren't enough."""
+    correct = _clip(correct)
+    seen = {correct.lower()}
+    wrong = []
+    for option in distractors:
+        option = _clip(option)
+        if option and option.lower() not in seen:
+            seen.add(option.lower())
+            wrong.append(option)
+        if len(wrong) == OPTIONS_PER_QUESTION - 1:
+            break
+    if not correct or len(wrong) < OPTIONS_PER_QUESTION - 1:
+        return None
+    options = [correct] + wrong
+    rng.shuffle(options)
+    return {
+        "question": text,
+        "options": options,
+        "correct": options.index(correct),
+        "explanation": explanation,
+        "source": SOURCE,
+    }
+
+
+def _sample(rng, pool, k):
+    pool = list(pool)
+    return rng.sample(pool, min(k, len(pool)))
+
+
+def _draw(rng, pool, k, keep):
+    """Up to *k* items of a large *pool* passing *keep*, without filtering the whole pool."""
+    picked = [x for x in rng.sample(pool, min(len(pool), 2 * k + 8)) if keep(x)]
+    return picked[:k]
+
+
+class _Context:
+    """Everything the templates draw from for one module (and optionally one lesson)."""
+
+    def __init__(self, rng, module_label, description, lessons, resources, lesson=None):
+        self.index = _catalog()
+        self.rng = rng
+        self.module = module_label
+        self.description = description
+        self.lessons = [l for l in lessons if l.get("title")]
+        self.resources = resources
+        self.lesson = lesson
+        self._titles = {l["title"].lower() for l in self.lessons}
+
+    def outside_lessons(self, k=6):
+        """Lessons of other modules."""
+        return [
+            lesson for _, lesson in _draw(
+                self.rng, self.index["lessons"], k,
+                lambda e: e[0] != self.module and e[1]["title"].lower() not in self._titles,
+            )
+        ]
+
+    def other_labels(self, k=6):
+        return _draw(self.rng, self.index["labels"], k, lambda label: label != self.module)
+
+    def outside_terms(self, k=8):
+        return [term for _, term in _draw(self.rng, self.index["terms"], k, lambda e: e[0] != self.module)]
+
+    def siblings(self):
+        return [l for l in self.lessons if self.lesson is None or l["title"] != self.lesson["title"]]
+
+    def ordered(self):
+        return sorted(self.lessons, key=lambda l: (l.get("phase", 0), l.get("order", 0)))
+
+
+def _belongs(ctx: _Context):
+    if not ctx.lessons:
+        return None
+    lesson = ctx.rng.choice(ctx.lessons)
+    return _question(
+        ctx.rng, f"Which of these lessons is part of {ctx.module}?", lesson["title"],
+        [l["title"] for l in ctx.outside_lessons()],
+        f"'{lesson['title']}' is one of the lessons in {ctx.module}; the others belong to other modules.",
+    )
+
+
+def _not_covered(ctx: _Context):
+    outsiders = ctx.outside_lessons(1)
+    if len(ctx.lessons) < 3 or not outsiders:
+        return None
+    outsider = outsiders[0]
+    return _question(
+        ctx.rng, f"Which of these topics is NOT covered in {ctx.module}?", outsider["title"],
+        [l["title"] for l in _sample(ctx.rng, ctx.lessons, 5)],
+        f"'{outsider['title']}' belongs to a different module; the other options are lessons of {ctx.module}.",
+    )
+
+
+def _which_lesson_covers(ctx: _Context):
+    lesson = ctx.lesson or (ctx.rng.choice(ctx.lessons) if ctx.lessons else None)
+    if not lesson or not lesson.get("description"):
+        return None
+    others = [l for l in ctx.lessons if l["title"] != lesson["title"]] or ctx.outside_lessons()
+    return _question(
+        ctx.rng, f"Which lesson covers: \"{_clip(lesson['description'])}\"?", lesson["title"],
+        [l["title"] for l in _sample(ctx.rng, others, 6)],
+        f"That is the summary of '{lesson['title']}'.",
+    )
+
+
+def _what_does_it_cover(ctx: _Context):
+    lesson = ctx.lesson or (ctx.rng.choice(ctx.lessons) if ctx.lessons else None)
+    if not lesson or not lesson.get("description"):
+        return None
+    others = [l for l in ctx.lessons if l["title"] != lesson["title"] and l.get("description")]
+    pool = _sample(ctx.rng, others, 6) + ctx.outside_lessons()
+    return _question(
+        ctx.rng, f"What does the lesson '{lesson['title']}' cover?", lesson["description"],
+        [l.get("description", "") for l in pool],
+        f"'{lesson['title']}' covers: {_clip(lesson['description'])}",
+    )
+
+
+def _topic_in_lesson(ctx: _Context):
+    lesson = ctx.lesson or (ctx.rng.choice(ctx.lessons) if ctx.lessons else None)
+    terms = _terms(lesson.get("description", "")) if lesson else []
+    if not terms:
+        return None
+    own = {t.lower() for t in terms}
+    term = ctx.rng.choice(terms)
+    return _question(
+        ctx.rng, f"Which of these topics is part of the lesson '{lesson['title']}'?", term,
+        [t for t in ctx.outside_terms() if t.lower() not in own],
+        f"'{lesson['title']}' covers {_clip(lesson['description'])}",
+    )
+
+
+def _comes_first(ctx: _Context):
+    ordered = ctx.ordered()
+    if len(ordered) < OPTIONS_PER_QUESTION or "order" not in ordered[0]:
+        return None
+    picked = sorted(ctx.rng.sample(range(len(ordered)), OPTIONS_PER_QUESTION))
+    first, rest = ordered[picked[0]], [ordered[i] for i in picked[1:]]
+    return _question(
+        ctx.rng, f"In {ctx.module}, which of these lessons comes first?", first["title"],
+        [l["title"] for l in rest],
+        f"'{first['title']}' comes before the others in the module's lesson order.",
+    )
+
+
+def _neighbour(ctx: _Context):
+    ordered = ctx.ordered()
+    if ctx.lesson is None or len(ordered) < OPTIONS_PER_QUESTION:
+        return None
+    titles = [l["title"] for l in ordered]
+    if ctx.lesson["title"] not in titles:
+        return None
+    pos = titles.index(ctx.lesson["title"])
+    if pos + 1 < len(titles):
+        target, text = titles[pos + 1], f"Which lesson comes right after '{ctx.lesson['title']}' in {ctx.module}?"
+        explanation = f"'{target}' follows '{ctx.lesson['title']}' in the module's lesson order."
+    elif pos > 0:
+        target, text = titles[pos - 1], f"Which lesson comes right before '{ctx.lesson['title']}' in {ctx.module}?"
+        explanation = f"'{target}' precedes '{ctx.lesson['title']}' in the module's lesson order."
+    else:
+        return None
+    others = [t for t in titles if t not in (target, ctx.lesson["title"])]
+    return _question(ctx.rng, text, target, _sample(ctx.rng, others, 6), explanation)
+
+
+def _which_module_for_lesson(ctx: _Context):
+    if ctx.lesson is None:
+        return None
+    return _question(
+        ctx.rng, f"Which module does the lesson '{ctx.lesson['title']}' belong to?", ctx.module,
+        ctx.other_labels(),
+        f"'{ctx.lesson['title']}' is a lesson of {ctx.module}.",
+    )
+
+
+def _same_module(ctx: _Context):
+    siblings = ctx.siblings()
+    if ctx.lesson is None or not siblings:
+        return None
+    sibling = ctx.rng.choice(siblings)
+    return _question(
+        ctx.rng, f"Which of these lessons is in the same module as '{ctx.lesson['title']}'?", sibling["title"],
+        [l["title"] for l in ctx.outside_lessons()],
+        f"Both '{sibling['title']}' and '{ctx.lesson['title']}' are part of {ctx.module}.",
+    )
+
+
+def _module_description(ctx: _Context):
+    if not ctx.description:
+        return None
+    return _question(
+        ctx.rng, f"Which module is described as: \"{_clip(ctx.description)}\"?", ctx.module,
+        ctx.other_labels(),
+        f"That is the description of {ctx.module}.",
+    )
+
+
+def _resource_type(ctx: _Context):
+    resources = [
+        r for group in ("primary", "additional") for r in (ctx.resources or {}).get(group) or []
+        if isinstance(r, dict) and r.get("title") and _PARENS_RE.sub("", r.get("type", "")).strip() in RESOURCE_TYPES
+    ]
+    if not resources:
+        return None
+    resource = ctx.rng.choice(resources)
+    kind = RESOURCE_TYPES[_PARENS_RE.sub("", resource["type"]).strip()]
+    return _question(
+        ctx.rng, f"What kind of resource is '{resource['title']}', recommended for {ctx.module}?", kind,
+        _sample(ctx.rng, RESOURCE_TYPES.values(), len(RESOURCE_TYPES)),
+        f"'{resource['title']}' is listed as {kind.lower()}.",
+    )
+
+
+def _generic(module_label: str, lesson_title: str = "") -> list:
+    """Catalog-free ``(question, correct, distractors, explanation)`` to top up a thin quiz."""
+    subject = f"'{lesson_title}'" if lesson_title else module_label
+    return [(text.format(s=subject), correct, wrong, explanation) for text, correct, wrong, explanation in [
+        ("What is the best way to master {s}?",
+         "Study the resources and practice hands-on",
+         ["Memorize definitions without context", "Skip straight to the next module", "Only read the title of each resource"],
+         "Hands-on practice reinforces theoretical knowledge."),
+        ("After completing {s}, you should be able to:",
+         "Apply its concepts in a real project",
+         ["Write a complete operating system", "Design physical circuit boards", "Manage an enterprise data center"],
+         "Lessons focus on applicable, project-ready knowledge."),
+        ("How should you check your understanding of {s}?",
+         "Build something small that uses it",
+         ["Assume reading once is enough", "Avoid running any code", "Only watch others discuss it"],
+         "Building with a concept exposes gaps that reading hides."),
+        ("When a concept in {s} is unclear, what helps most?",
+         "Revisit the resources and try a minimal example",
+         ["Move on and never return to it", "Memorize the wording of the lesson", "Ignore error messages"],
+         "A minimal example isolates the idea you are unsure about."),
+        ("What is the main purpose of studying {s}?",
+         "To build practical skills for real projects",
+         ["To collect unrelated trivia", "To replace the need for practice", "To learn deprecated technology"],
+         f"{module_label} builds skills you will use in real projects."),
+    ]]
+
+
+_MODULE_TEMPLATES: List[Callable[[_Context], Optional[dict]]] = [
+    _belongs, _which_lesson_covers, _comes_first, _module_description,
+    _not_covered, _what_does_it_cover, _resource_type, _topic_in_lesson,
+]
+_LESSON_TEMPLATES: List[Callable[[_Context], Optional[dict]]] = [
+    _what_does_it_cover, _topic_in_lesson, _which_lesson_covers, _neighbour,
+    _which_module_for_lesson, _same_module,
+]
+
+
+def _build(ctx: _Context, templates, lesson_title: str, count: int) -> List[dict]:
+    questions, seen = [], set()
+    order = list(templates)
+    ctx.rng.shuffle(order)
+    # Two passes: templates that pick a random lesson can yield a second, different question.
+    for template in order + order:
+        if len(questions) >= count:
+            break
+        question = template(ctx)
+        if question and question["question"].lower() not in seen:
+            seen.add(question["question"].lower())
+            questions.append(question)
+
+    for text, correct, wrong, explanation in _generic(ctx.module, lesson_title):
+        if len(questions) >= count:
+            break
+        question = _question(ctx.rng, text, correct, wrong, explanation)
+        if question["question"].lower() not in seen:
+            seen.add(question["question"].lower())
+            questions.append(question)
+    return questions
+
+
+def _rng(*parts) -> random.Random:
+    return random.Random(zlib.crc32("\x1f".join(str(p) for p in parts).encode("utf-8")))
+
+
+# ── Public API ────────────────────────────────────────────────────
+
+def module_quiz(
+    module_label: str,
+    description: str = "",
+    lessons: Optional[list] = None,
+    resources: Optional[dict] = None,
+    variant: int = 0,
+    count: int = QUESTIONS_PER_QUIZ,
+) -> List[dict]:
+    """
+    Quiz for a module.  Lessons, description and resources default to the
+    catalog module with the same label and description; custom modules pass
+    their lesson plan and still get distractors from the catalog.
+    """
+    module = _module(module_label, description)
+    ctx = _Context(
+        _rng("module", module_label, variant),
+        module_label,
+        description or module.get("description", ""),
+        lessons if lessons else module.get("lessons") or [],
+        resources if resources is not None else module.get("resources") or {},
+    )
+    return _build(ctx, _MODULE_TEMPLATES, "", count)
+
+
+def lesson_quiz(
+    module_label: str,
+    lesson_title: str,
+    lesson_description: str = "",
+    lessons: Optional[list] = None,
+    variant: int = 0,
+    count: int = QUESTIONS_PER_QUIZ,
+) -> List[dict]:
+    """Quiz for one lesson; *lessons* are its siblings (defaults to the catalog module's)."""
+    module = _module(module_label, lesson_title=lesson_title)
+    lessons = lessons if lessons else module.get("lessons") or []
+    lesson = next((l for l in lessons if l.get("title") == lesson_title), None)
+    if lesson is None:
+        lesson = {"title": lesson_title, "description": lesson_description}
+    elif lesson_description and not lesson.get("description"):
+        lesson = {**lesson, "description": lesson_description}
+    ctx = _Context(
+        _rng("lesson", module_label, lesson_title, variant),
+        module_label, module.get("description", ""), lessons, {}, lesson=lesson,
+    )
+    return _build(ctx, _LESSON_TEMPLATES, lesson_title, count)
+
+
+def is_rule_based(questions) -> bool:
+    """True for quizzes built here (fallbacks and instant first responses)."""
+    return bool(questions) and isinstance(questions, list) and any(
+        isinstance(q, dict) and q.get("source") == SOURCE for q in questions
+    )
@@ -0,0 +1,59 @@
+"""
+Model signal receivers
+======================
+Keep ``jada_context``'s cached learner context in step with the rows it is
+built from.  Connected in ``CoreConfig.ready``.
+
+Saves that name ``update_fields`` only invalidate when they touch a field
+the context reads; queryset ``.update()`` calls bypass signals, so any new
+one on these models must call ``jada_context.invalidate_*`` itself.
+Quiz and lesson rows only disappear with their roadmap item, whose delete
+already invalidates; leaving them without ``post_delete`` receivers keeps
+those cascades on Django's fast-delete path.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import jada_context
+from .models import LessonProgress, Quiz, ResourceClick, UserRoadmapItem, UserTechDebt
+
+
+def _touches(update_fields, fields) -> bool:
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+@receiver(post_save, sender=UserRoadmapItem, dispatch_uid="jada_context_roadmap_item_saved")
+def roadmap_item_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Status changes move every module's "overall progress" line.
+    if created or _touches(update_fields, jada_context.MODULE_FIELDS):
+        jada_context.invalidate_user(instance.user_id)
+
+
+@receiver(post_delete, sender=UserRoadmapItem, dispatch_uid="jada_context_roadmap_item_deleted")
+def roadmap_item_deleted(sender, instance, **kwargs):
+    jada_context.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=LessonProgress, dispatch_uid="jada_context_lesson_progress_saved")
+def lesson_progress_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or _touches(update_fields, jada_context.LESSON_FIELDS):
+        jada_context.invalidate_module(instance.roadmap_item_id)
+
+
+@receiver(post_save, sender=Quiz, dispatch_uid="jada_context_quiz_saved")
+def quiz_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or _touches(update_fields, jada_context.QUIZ_FIELDS):
+        jada_context.invalidate_module(instance.roadmap_item_id)
+
+
+@receiver(post_save, sender=ResourceClick, dispatch_uid="jada_context_resource_click_saved")
+def resource_click_saved(sender, instance, created, **kwargs):
+    if created:
+        jada_context.invalidate_module(instance.module_id)
+
+
+@receiver(post_save, sender=UserTechDebt, dispatch_uid="jada_context_tech_debt_saved")
+@receiver(post_delete, sender=UserTechDebt, dispatch_uid="jada_context_tech_debt_deleted")
+def tech_debt_changed(sender, instance, **kwargs):
+    jada_context.invalidate_user(instance.user_id)
@@ -0,0 +1,147 @@
+"""
+Single-flight coalescing
+========================
+When a cohort opens the same catalog module at once, every request asks
+the LLM the same question.  ``run`` / ``arun`` make sure only one caller
+per key — across all gunicorn workers and Celery processes, via the
+shared Django cache — actually does the work; everyone else waits for its
+result and reuses it.
+
+Protocol
+--------
+1. ``cache.add`` on ``single_flight:lock:<key>`` elects a leader (atomic
+   SET NX on Redis).
+2. The leader runs the generator and publishes ``{"value": result}`` on
+   ``single_flight:result:<key>`` for ``RESULT_TTL`` seconds, then
+   releases the lock.
+3. Followers poll for the result.  If the lock vanishes without a result
+   (the leader crashed or raised) they race to become the new leader; if
+   ``WAIT_TIMEOUT`` (or the request's deadline, see ``deadlines``) passes
+   they give up waiting and generate themselves.
+
+The result key is only a hand-off for callers already in flight; durable
+reuse is ``ai_cache``'s job.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from . import deadlines
+
+CACHE_PREFIX = "single_flight"
+
+LOCK_TTL = int(os.getenv("SINGLE_FLIGHT_LOCK_TTL", "150"))      # > slowest cascade (120s)
+WAIT_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_WAIT", "130"))
+RESULT_TTL = 60
+POLL_INTERVAL = 0.25
+
+
+def _lock_key(key: str) -> str:
+    return f"{CACHE_PREFIX}:lock:{key}"
+
+
+def _result_key(key: str) -> str:
+    return f"{CACHE_PREFIX}:result:{key}"
+
+
+def _try_lead(key: str) -> str | None:
+    """Return a lock token if we became leader for *key*."""
+    token = uuid.uuid4().hex
+    return token if cache.add(_lock_key(key), token, LOCK_TTL) else None
+
+
+def _publish(key: str, token: str, value: Any) -> None:
+    cache.set(_result_key(key), {"value": value}, RESULT_TTL)
+    _release(key, token)
+
+
+def _release(key: str, token: str) -> None:
+    if cache.get(_lock_key(key)) == token:
+        cache.delete(_lock_key(key))
+
+
+def _poll(key: str) -> tuple[bool, Any, bool]:
+    """(have_result, value, lock_still_held) in one round trip."""
+    found = cache.get_many([_result_key(key), _lock_key(key)])
+    handoff = found.get(_result_key(key))
+    if handoff is not None:
+        return True, handoff["value"], True
+    return False, None, _lock_key(key) in found
+
+
+def _wait_deadline() -> float:
+    limit = time.monotonic() + WAIT_TIMEOUT
+    request_deadline = deadlines.call_deadline()
+    return limit if request_deadline is None else min(limit, request_deadline)
+
+
+def run(key: str, fn: Callable[[], Any]) -> Any:
+    """Run *fn* once per *key* across all processes; others share its result."""
+    deadline = _wait_deadline()
+    while True:
+        have, value, _ = _poll(key)
+        if have:
+            return value
+
+        token = _try_lead(key)
+        if token:
+            try:
+                value = fn()
+            except BaseException:
+                _release(key, token)
+                raise
+            _publish(key, token, value)
+            return value
+
+        # Someone else is generating: wait for their hand-off.
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            have, value, locked = _poll(key)
+            if have:
+                print(f"[AI] single-flight: reused in-flight result for {key[-12:]}")
+                return value
+            if not locked:
+                break                       # leader gave up; try to lead
+        else:
+            print(f"[AI] single-flight: gave up waiting on {key[-12:]}, generating")
+            return fn()
+
+
+async def arun(key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """Async ``run``: *fn* is a coroutine function; waiting never blocks the loop."""
+    poll = sync_to_async(_poll, thread_sensitive=False)
+    deadline = _wait_deadline()
+    while True:
+        have, value, _ = await poll(key)
+        if have:
+            return value
+
+        token = await sync_to_async(_try_lead, thread_sensitive=False)(key)
+        if token:
+            try:
+                value = await fn()
+            except BaseException:
+                await sync_to_async(_release, thread_sensitive=False)(key, token)
+                raise
+            await sync_to_async(_publish, thread_sensitive=False)(key, token, value)
+            return value
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(POLL_INTERVAL)
+            have, value, locked = await poll(key)
+            if have:
+                print(f"[AI] single-flight: reused in-flight result for {key[-12:]}")
+                return value
+            if not locked:
+                break
+        else:
+            print(f"[AI] single-flight: gave up waiting on {key[-12:]}, generating")
+            return await fn()
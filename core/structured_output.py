@@ -0,0 +1,316 @@
+"""
+Structured output
+=================
+One stage for every AI call that must return JSON (roadmaps, lesson plans,
+quizzes) instead of per-caller fence stripping and ``json.loads``.
+
+* ``extract_json``  — tolerant extraction: skips code fences, ``<think>``
+  blocks and prose around the payload, decodes the first JSON value with
+  ``raw_decode`` (so trailing chatter is ignored) and unwraps a
+  ``{"modules": [...]}``-style object when an array was expected.
+* ``check`` / ``parse`` — schema validation with validators compiled once
+  per schema and reused, instead of ``jsonschema.validate`` re-checking
+  the schema and building a validator on every call.
+* ``JsonStreamGuard`` — incremental checker fed with streamed deltas.  It
+  raises as soon as the text can no longer be JSON (prose instead of a
+  payload, mismatched brackets, bare words) and reports ``complete`` once
+  the top-level value has closed and a fence (or enough trailing prose)
+  follows, so the stream can stop early either way.
+* ``stream_cascade`` / ``astream_cascade`` — stream each cascade model
+  through a guard and move to the next model on the first invalid token
+  rather than after the full generation, stopping at the request deadline.
+
+All failures raise ``StructuredOutputError`` (a ``ValueError``) whose
+``kind`` is ``empty``, ``json`` or ``schema``.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from jsonschema import Draft7Validator
+from jsonschema.exceptions import best_match
+
+# Non-JSON text tolerated before the payload starts ("Here is the JSON:", a fence).
+PREAMBLE_CHARS = 400
+
+_THINK_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
+_BARE_WORDS = ("true", "false", "null")
+_NUMBER_RE = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?")
+_NUMBER_CHARS = set("0123456789+-.eE")
+_CLOSERS = {"]": "[", "}": "{"}
+
+# strict=False: models put raw newlines inside strings often enough.
+_decoder = json.JSONDecoder(strict=False)
+_validators: Dict[int, Tuple[dict, Draft7Validator]] = {}
+
+
+class StructuredOutputError(ValueError):
+    def __init__(self, message: str, kind: str = "json"):
+        super().__init__(message)
+        self.kind = kind
+
+
+# ── Parsing ───────────────────────────────────────────────────────
+
+def _json_values(text: str, expect: Optional[type]):
+    """Yield each JSON value in *text* (left to right) that matches *expect*; returns the last decode error."""
+    last_error = None
+    pos = 0
+    while True:
+        starts = [i for i in (text.find(c, pos) for c in "[{") if i != -1]
+        if not starts:
+            return last_error
+        start = min(starts)
+        try:
+            data, end = _decoder.raw_decode(text, start)
+        except json.JSONDecodeError as e:
+            # Resume after the failure point, never inside the broken value:
+            # a truncated payload must not yield one of its nested arrays.
+            last_error = e
+            pos = max(start + 1, e.pos)
+            continue
+        if expect is list and isinstance(data, dict):
+            lists = [v for v in data.values() if isinstance(v, list)]
+            if len(lists) == 1:
+                data = lists[0]
+        if expect is None or isinstance(data, expect):
+            yield data
+        pos = end
+
+
+def _no_json(expect: Optional[type], last_error) -> StructuredOutputError:
+    detail = f": {last_error}" if last_error else ""
+    expected = {list: "array", dict: "object"}.get(expect, "value")
+    return StructuredOutputError(f"no JSON {expected} found{detail}")
+
+
+def _clean(text: Optional[str]) -> str:
+    if not text or not text.strip():
+        raise StructuredOutputError("empty response", kind="empty")
+    return _THINK_RE.sub("", text)
+
+
+def extract_json(text: Optional[str], expect: Optional[type] = None) -> Any:
+    """Decode the JSON payload in *text*; *expect* is ``list``/``dict`` or None."""
+    values = _json_values(_clean(text), expect)
+    try:
+        return next(values)
+    except StopIteration as stop:
+        raise _no_json(expect, stop.value)
+
+
+def validator_for(schema: dict) -> Draft7Validator:
+    """Compiled validator for *schema*, built once per schema object."""
+    entry = _validators.get(id(schema))
+    if entry is None or entry[0] is not schema:
+        Draft7Validator.check_schema(schema)
+        entry = (schema, Draft7Validator(schema))
+        _validators[id(schema)] = entry
+    return entry[1]
+
+
+def check(data: Any, schema: dict) -> Any:
+    """Return *data* if it matches *schema*, else raise with the most relevant error."""
+    error = best_match(validator_for(schema).iter_errors(data))
+    if error is not None:
+        where = "/".join(str(p) for p in error.absolute_path) or "root"
+        raise StructuredOutputError(f"{where}: {error.message}", kind="schema")
+    return data
+
+
+def parse(text: Optional[str], schema: Optional[dict] = None, expect: Optional[type] = None) -> Any:
+    """
+    ``extract_json`` plus ``check``.  With a *schema*, a value that fails it
+    (``[1]`` in "Step [1] below:") is skipped for the next one in the text;
+    if none passes, the first value's schema error is raised.
+    """
+    if schema is None:
+        return extract_json(text, expect)
+    values = _json_values(_clean(text), expect)
+    first_error = None
+    while True:
+        try:
+            data = next(values)
+        except StopIteration as stop:
+            raise first_error or _no_json(expect, stop.value)
+        try:
+            return check(data, schema)
+        except StructuredOutputError as e:
+            first_error = first_error or e
+
+
+# ── Incremental checking ──────────────────────────────────────────
+
+class JsonStreamGuard:
+    """
+    Feed streamed text with ``feed``; raises ``StructuredOutputError`` once
+    the text cannot be (prose/fence +) one JSON value.  Checks brackets,
+    strings and bare tokens — not full grammar — so anything it rejects is
+    certainly invalid and anything it passes still goes through ``parse``.
+
+    A closed bracket group is only a candidate payload: ``complete`` is set
+    when a closing fence follows it, or once the prose after it uses up the
+    preamble budget.  Prose followed by another group ("Step [1] below:
+    [...]") means the first group was preamble.
+    """
+
+    def __init__(self, preamble_chars: int = PREAMBLE_CHARS):
+        self.preamble_chars = preamble_chars
+        self.seen = 0
+        self.stack: List[str] = []
+        self.started = False
+        self.complete = False
+        self._in_string = False
+        self._escape = False
+        self._bare = ""
+        self._think = False
+        self._preamble = ""
+        self._preamble_count = 0
+        self._started_at = 0
+        self._candidate = False     # a whole bracket group has closed
+        self._after_close = False   # ...and only whitespace has followed it
+
+    def feed(self, text: str) -> None:
+        for ch in text:
+            self.seen += 1
+            if self.complete:
+                return
+            if not self.started:
+                self._before_payload(ch)
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            else:
+                try:
+                    self._in_value(ch)
+                except StructuredOutputError:
+                    # A bracket in the preamble ("Here is [the] plan:") isn't the payload.
+                    self._preamble_count += self.seen - self._started_at
+                    self.started, self.stack, self._bare = False, [], ""
+                    if self._preamble_count > self.preamble_chars:
+                        if not self._candidate:
+                            raise
+                        self.complete = True
+
+    def _before_payload(self, ch: str) -> None:
+        if self._after_close:
+            if ch in " \t\r\n":
+                return
+            self._after_close = False
+            if ch == "`":
+                self.complete = True
+                return
+        self._preamble = (self._preamble + ch)[-8:]
+        if self._think:
+            self._think = not self._preamble.endswith("</think>")
+            return
+        if self._preamble.endswith("<think>"):
+            self._think = True
+            return
+        self._preamble_count += 1
+        if ch in "[{":
+            self.started = True
+            self._started_at = self.seen
+            self.stack.append(ch)
+        elif self._preamble_count > self.preamble_chars:
+            if not self._candidate:
+                raise StructuredOutputError(f"no JSON after {self.preamble_chars} characters")
+            self.complete = True
+
+    def _in_value(self, ch: str) -> None:
+        if ch.isalnum() or ch in _NUMBER_CHARS:
+            self._bare += ch
+            self._check_bare(final=False)
+            return
+        self._check_bare(final=True)
+        if ch == '"':
+            self._in_string = True
+        elif ch in "[{":
+            self.stack.append(ch)
+        elif ch in "]}":
+            if not self.stack or self.stack.pop() != _CLOSERS[ch]:
+                raise StructuredOutputError(f"unbalanced {ch!r} at character {self.seen}")
+            if not self.stack:
+                self.started = False
+                self._candidate = self._after_close = True
+        elif ch not in ",: \t\r\n":
+            raise StructuredOutputError(f"unexpected {ch!r} at character {self.seen}")
+
+    def _check_bare(self, final: bool) -> None:
+        bare = self._bare
+        if not bare:
+            return
+        if final:
+            self._bare = ""
+            if bare in _BARE_WORDS or _NUMBER_RE.fullmatch(bare):
+                return
+        elif any(word.startswith(bare) for word in _BARE_WORDS) or set(bare) <= _NUMBER_CHARS:
+            return
+        raise StructuredOutputError(f"unexpected token {bare!r} at character {self.seen}")
+
+
+# ── Streaming cascades ────────────────────────────────────────────
+
+def _stream_cascade_flow(messages, parse_fn, models, temperature, max_tokens, timeout):
+    from . import ai_flow, deadlines
+    from .openrouter_transport import RANK, STREAM_TEXT
+    from .openrouter_client import FREE_MODEL_CASCADE, OpenRouterError
+
+    last_error: Optional[BaseException] = None
+    ranked = yield ai_flow.call(RANK, list(models or FREE_MODEL_CASCADE))
+    for model in ranked:
+        if deadlines.expired():
+            last_error = deadlines.DeadlineExceeded(f"request deadline reached before {model}")
+            break
+        print(f"[AI] Streaming structured output from: {model}")
+        try:
+            text = yield ai_flow.call(
+                STREAM_TEXT, messages=messages, model=model, temperature=temperature,
+                max_tokens=max_tokens, timeout=timeout, guard=JsonStreamGuard(),
+            )
+            return parse_fn(text), model
+        except (OpenRouterError, StructuredOutputError) as e:
+            print(f"[AI] {model} structured output rejected: {e}")
+            last_error = e
+    raise OpenRouterError(f"All free models failed. Last error: {last_error}")
+
+
+def stream_cascade(
+    *,
+    messages: List[Dict[str, str]],
+    parse_fn: Callable[[str], Any],
+    models: Optional[List[str]] = None,
+    temperature: float = 0.7,
+    max_tokens: int = 1024,
+    timeout: int = 90,
+) -> Tuple[Any, str]:
+    """
+    Return ``(parse_fn(text), model)`` from the first cascade model whose
+    streamed answer stays valid.  Raises OpenRouterError if none does.
+    """
+    from . import ai_flow
+    return ai_flow.run(_stream_cascade_flow(messages, parse_fn, models, temperature, max_tokens, timeout))
+
+
+async def astream_cascade(
+    *,
+    messages: List[Dict[str, str]],
+    parse_fn: Callable[[str], Any],
+    models: Optional[List[str]] = None,
+    temperature: float = 0.7,
+    max_tokens: int = 1024,
+    timeout: int = 90,
+) -> Tuple[Any, str]:
+    """Async ``stream_cascade`` for views served through asgi.py."""
+    from . import ai_flow
+    return await ai_flow.arun(_stream_cascade_flow(messages, parse_fn, models, temperature, max_tokens, timeout))
+
+
+STREAM_CASCADE = (stream_cascade, astream_cascade)
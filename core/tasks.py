@@ -67,3 +67,112 @@ def generate_roadmap_async(self, user_id, role_key):
             raise self.retry(exc=e, countdown=60)
         except self.MaxRetriesExceededError:
             return {"status": "error", "message": f"Failed after retries: {str(e)}"}
+
+
+@shared_task(ignore_result=True)
+def refresh_jada_summary(conversation_id):
+    """Fold older JADA messages into the conversation's rolling summary."""
+    from .jada_memory import refresh_summary
+    refresh_summary(conversation_id)
+
+
+@shared_task(ignore_result=True)
+def refresh_jada_suggestion(template_key, module_label, module_description):
+    """Answer one templated JADA follow-up suggestion for a module (queued at low priority)."""
+    from .jada_suggestions import refresh
+    refresh(template_key, module_label, module_description)
+
+
+@shared_task(ignore_result=True)
+def archive_idle_jada_conversations():
+    """Move idle JADA conversations' messages into compressed cold storage (Celery beat, daily)."""
+    from .jada_archive import archive_idle
+    archive_idle()
+
+
+@shared_task
+def prune_ai_call_log():
+    """Drop AICallLog rows past the ledger's retention window (Celery beat, daily)."""
+    from .ai_ledger import prune
+    prune()
+
+
+@shared_task(bind=True)
+def generate_custom_roadmap_async(self, user_id, custom_niche, university_course, budget, gender, level):
+    """
+    Generate an AI roadmap for a custom (non-catalog) role and load it for the user.
+
+    Progress is reported through the result backend as state ``PROGRESS``
+    with ``meta={"stage": ..., "user_id": ...}`` — stages are
+    ``prompting`` → ``validating`` → ``persisting`` — so
+    ``check_roadmap_status`` can show where the job is.
+    """
+    from django.contrib.auth import get_user_model
+    from .ai_logic import generate_detailed_roadmap
+    from .views import _load_onboarding_roadmap
+    User = get_user_model()
+
+    def _stage(stage):
+        self.update_state(state='PROGRESS', meta={"stage": stage, "user_id": user_id})
+
+    try:
+        user = User.objects.get(id=user_id)
+    except User.DoesNotExist:
+        logger.error(f"User {user_id} not found")
+        return {"status": "error", "message": "User not found", "user_id": user_id}
+
+    _stage('prompting')
+    modules = generate_detailed_roadmap(custom_niche, university_course, budget)
+
+    _stage('validating')
+    modules = [m for m in modules or [] if isinstance(m, dict) and m.get('label')]
+    if not modules:
+        logger.error(f"Custom roadmap for user {user_id} came back empty ({custom_niche!r})")
+        return {
+            "status": "error",
+            "message": "Failed to generate a custom roadmap. Please try a different role.",
+            "user_id": user_id,
+        }
+
+    _stage('persisting')
+    role_title = custom_niche.title()
+    node_count = _load_onboarding_roadmap(
+        user,
+        role_key='custom',
+        role_title=role_title,
+        modules=modules,
+        is_custom_role=True,
+        university_course=university_course,
+        budget=budget,
+        gender=gender,
+        level=level,
+    )
+    logger.info(f"Loaded {node_count} custom modules for user {user_id}")
+    return {
+        "status": "success",
+        "message": "Roadmap loaded successfully",
+        "node_count": node_count,
+        "role_title": role_title,
+        "user_id": user_id,
+    }
+
+
+@shared_task(ignore_result=True)
+def prefetch_module_content(item_id):
+    """Warm lessons and lesson quizzes for a just-unlocked module (queued at low priority)."""
+    from .prefetch import warm_module
+    warm_module(item_id)
+
+
+@shared_task(ignore_result=True)
+def prefetch_quiz(item_id, kind):
+    """Generate the AI quiz behind a rule-based one the learner was served (queued at low priority)."""
+    from .prefetch import warm_quiz
+    warm_quiz(item_id, kind)
+
+
+@shared_task(ignore_result=True)
+def refresh_lesson_plan(plan_id):
+    """Regenerate a stale shared LessonPlan as its next version (queued at low priority)."""
+    from .lesson_plans import refresh
+    refresh(plan_id)
@@ -1,3 +1,413 @@
+import asyncio
+import random
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from . import ai_flow, ai_governor, ai_logic, jada_markup, quiz_engine, single_flight
+from .management.commands import jada_markup_benchmark as markup_bench
+from .structured_output import JsonStreamGuard, StructuredOutputError, parse
+
+
+def _pair(sync_result, async_result=None):
+    """A ``(sync, async)`` step pair returning fixed values, recording which half ran."""
+    calls = []
+
+    def _sync(*args, **kwargs):
+        calls.append(("sync", args, kwargs))
+        if isinstance(sync_result, BaseException):
+            raise sync_result
+        return sync_result
+
+    async def _async(*args, **kwargs):
+        calls.append(("async", args, kwargs))
+        result = sync_result if async_result is None else async_result
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    return (_sync, _async), calls
+
+
+class AIFlowTests(TestCase):
+    def test_run_and_arun_drive_the_same_flow(self):
+        pair, calls = _pair(2)
+
+        def flow(x):
+            y = yield ai_flow.call(pair, x, scale=3)
+            return x + y
+
+        self.assertEqual(ai_flow.run(flow(1)), 3)
+        self.assertEqual(asyncio.run(ai_flow.arun(flow(1))), 3)
+        self.assertEqual(calls, [("sync", (1,), {"scale": 3}), ("async", (1,), {"scale": 3})])
+
+    def test_step_exception_is_raised_at_the_yield(self):
+        pair, _ = _pair(ValueError("boom"))
+
+        def flow():
+            try:
+                yield ai_flow.call(pair)
+            except ValueError as e:
+                return f"caught {e}"
+
+        self.assertEqual(ai_flow.run(flow()), "caught boom")
+        self.assertEqual(asyncio.run(ai_flow.arun(flow())), "caught boom")
+
+    def test_unhandled_step_exception_propagates(self):
+        pair, _ = _pair(KeyError("k"))
+
+        def flow():
+            yield ai_flow.call(pair)
+
+        with self.assertRaises(KeyError):
+            ai_flow.run(flow())
+        with self.assertRaises(KeyError):
+            asyncio.run(ai_flow.arun(flow()))
+
+    def test_nested_flows_compose_with_yield_from(self):
+        pair, calls = _pair("a", "b")
+
+        def inner():
+            return (yield ai_flow.call(pair))
+
+        def outer():
+            first = yield from inner()
+            second = yield from inner()
+            return first + second
+
+        self.assertEqual(ai_flow.run(outer()), "aa")
+        self.assertEqual(asyncio.run(ai_flow.arun(outer())), "bb")
+        self.assertEqual([half for half, _, _ in calls], ["sync", "sync", "async", "async"])
+
+    def test_cancellation_reaches_the_flow(self):
+        seen = []
+
+        async def _hang():
+            await asyncio.sleep(10)
+
+        def flow():
+            try:
+                yield ai_flow.call((None, _hang))
+            except asyncio.CancelledError:
+                seen.append("cancelled")
+                raise
+
+        async def main():
+            task = asyncio.create_task(ai_flow.arun(flow()))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        self.assertEqual(seen, ["cancelled"])
+
+
+class NormalizeCourseTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_uses_the_cascade(self):
+        pair, calls = _pair(('"Accounting"', "m/x"))
+        with mock.patch.object(ai_logic, "CASCADE", pair):
+            self.assertEqual(ai_logic.normalize_university_course("Bsc Acctng"), "Accounting")
+        self.assertEqual(len(calls), 1)
+
+    def test_result_is_cached(self):
+        pair, calls = _pair(("Data Science", "m/x"))
+        with mock.patch.object(ai_logic, "CASCADE", pair):
+            ai_logic.normalize_university_course("M.Sc. Data Science")
+            self.assertEqual(ai_logic.normalize_university_course("M.Sc. Data Science"), "Data Science")
+        self.assertEqual(len(calls), 1)
+
+    def test_falls_back_to_gemini(self):
+        from .openrouter_client import OpenRouterError
+
+        cascade, _ = _pair(OpenRouterError("all down"))
+        gemini, calls = _pair("Computer Science")
+        with mock.patch.object(ai_logic, "CASCADE", cascade), mock.patch.object(ai_logic, "GEMINI", gemini):
+            self.assertEqual(ai_logic.normalize_university_course("BS Comp Sci"), "Computer Science")
+        self.assertEqual(len(calls), 1)
+
+
+def _feed(guard, text):
+    """Feed *text* one character at a time, as a stream would; the prefix read when ``complete`` was set."""
+    for i, ch in enumerate(text):
+        guard.feed(ch)
+        if guard.complete:
+            return text[:i + 1]
+    return None
+
+
+QUIZ_LIST = {"type": "array", "items": {"type": "object"}}
+
+
+class JsonStreamGuardTests(TestCase):
+    def test_bare_payload_is_accepted(self):
+        guard = JsonStreamGuard()
+        self.assertIsNone(_feed(guard, '[{"q": 1, "ok": true, "x": null}]'))
+        self.assertFalse(guard.complete)
+
+    def test_closing_fence_completes(self):
+        text = '```json\n[{"q": 1}]\n```\nHope this helps!'
+        self.assertEqual(_feed(JsonStreamGuard(), text), '```json\n[{"q": 1}]\n`')
+
+    def test_bracket_group_in_preamble_is_not_the_payload(self):
+        text = 'Step [1] below:\n[{"q": 1}]'
+        self.assertIsNone(_feed(JsonStreamGuard(), text))
+        self.assertEqual(parse(text, QUIZ_LIST, expect=list), [{"q": 1}])
+
+    def test_trailing_prose_completes_after_the_preamble_budget(self):
+        text = '[{"q": 1}] ' + "and some chatter " * 5
+        read = _feed(JsonStreamGuard(preamble_chars=20), text)
+        self.assertTrue(read.startswith('[{"q": 1}] and some chatter'))
+        self.assertLess(len(read), len(text))
+
+    def test_think_block_is_skipped(self):
+        guard = JsonStreamGuard(preamble_chars=10)
+        self.assertIsNone(_feed(guard, "<think>long reasoning, no json here at all</think>[1]"))
+
+    def test_prose_without_json_is_rejected(self):
+        with self.assertRaises(StructuredOutputError):
+            _feed(JsonStreamGuard(preamble_chars=10), "I cannot help with that request.")
+
+    def test_bare_word_is_rejected(self):
+        with self.assertRaises(StructuredOutputError):
+            _feed(JsonStreamGuard(preamble_chars=3), '[{"a": yes}]')
+
+    def test_unbalanced_bracket_is_rejected(self):
+        with self.assertRaises(StructuredOutputError):
+            _feed(JsonStreamGuard(preamble_chars=3), '[{"a": 1]]')
+
+    def test_parse_raises_the_first_schema_error(self):
+        with self.assertRaises(StructuredOutputError) as ctx:
+            parse("[1] and [2]", QUIZ_LIST, expect=list)
+        self.assertEqual(ctx.exception.kind, "schema")
+
+
+class QuizEngineCatalogTests(TestCase):
+    def setUp(self):
+        # A label several roles share, each with its own description and lessons.
+        self.label, self.modules = next(
+            (label, modules) for label, modules in quiz_engine._catalog()["by_label"].items()
+            if len({m.get("description") for m in modules}) > 1
+            and len({tuple(l["title"] for l in m.get("lessons") or []) for m in modules}) > 1
+        )
+
+    def test_shared_label_keeps_each_description(self):
+        for module in self.modules:
+            self.assertIs(quiz_engine._module(self.label, module["description"]), module)
+
+    def test_module_quiz_uses_the_matching_lessons(self):
+        first, second = self.modules[:2]
+        own = {l["title"] for l in second["lessons"]}
+        other = {l["title"] for l in first["lessons"]} - own
+        quiz = quiz_engine.module_quiz(self.label, second["description"])
+        self.assertNotEqual(quiz, quiz_engine.module_quiz(self.label, first["description"]))
+        text = " ".join(q["question"] + " " + q["options"][q["correct"]] for q in quiz)
+        self.assertTrue(any(title in text for title in own))
+        self.assertFalse(any(title in text for title in other))
+
+    def test_lesson_quiz_finds_the_module_listing_the_lesson(self):
+        second = self.modules[1]
+        title = next(l["title"] for l in second["lessons"] if l["title"] not in {
+            l["title"] for l in self.modules[0]["lessons"]
+        })
+        self.assertIs(quiz_engine._module(self.label, lesson_title=title), second)
+
+
+@mock.patch.object(single_flight, "POLL_INTERVAL", 0.01)
+class SingleFlightTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _follow(self, key, fn, release):
+        """
+        Run ``single_flight.run(key, fn)`` on a thread once the leader holds
+        the lock; *release* is set when this follower has lost the election
+        and is waiting on the hand-off.  Returns (thread, results).
+        """
+        try_lead = single_flight._try_lead
+
+        def lost(key):
+            token = try_lead(key)
+            if token is None:
+                release.set()
+            return token
+
+        results = []
+        with mock.patch.object(single_flight, "_try_lead", lost):
+            thread = threading.Thread(target=lambda: results.append(single_flight.run(key, fn)))
+            thread.start()
+            release.wait(5)
+        return thread, results
+
+    def test_follower_reuses_the_leaders_result(self):
+        started, release, calls = threading.Event(), threading.Event(), []
+
+        def lead():
+            calls.append("leader")
+            started.set()
+            release.wait(5)
+            return "quiz"
+
+        led = []
+        leader = threading.Thread(target=lambda: led.append(single_flight.run("k", lead)))
+        leader.start()
+        started.wait(5)
+        follower, followed = self._follow("k", lambda: calls.append("follower") or "other", release)
+        leader.join(5)
+        follower.join(5)
+        self.assertEqual((led, followed, calls), (["quiz"], ["quiz"], ["leader"]))
+
+    def test_follower_takes_over_when_the_leader_fails(self):
+        started, release = threading.Event(), threading.Event()
+
+        def lead():
+            started.set()
+            release.wait(5)
+            raise RuntimeError("cascade down")
+
+        errors = []
+
+        def run_leader():
+            try:
+                single_flight.run("k", lead)
+            except RuntimeError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=run_leader)
+        leader.start()
+        started.wait(5)
+        follower, followed = self._follow("k", lambda: "fallback", release)
+        leader.join(5)
+        follower.join(5)
+        self.assertEqual((len(errors), followed), (1, ["fallback"]))
+        self.assertIsNone(cache.get(single_flight._lock_key("k")))
+
+    def test_follower_generates_itself_after_the_wait_timeout(self):
+        cache.add(single_flight._lock_key("k"), "stuck", 60)
+        with mock.patch.object(single_flight, "WAIT_TIMEOUT", 0.05):
+            self.assertEqual(single_flight.run("k", lambda: "own"), "own")
+
+    def test_async_callers_share_one_call(self):
+        calls = []
+
+        async def generate():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "plan"
+
+        async def main():
+            return await asyncio.gather(*(single_flight.arun("k", generate) for _ in range(3)))
+
+        self.assertEqual(asyncio.run(main()), ["plan"] * 3)
+        self.assertEqual(len(calls), 1)
+
+
+@mock.patch.multiple(
+    ai_governor, ENABLED=True, CONCURRENCY={"p": 10}, MODEL_CONCURRENCY=0, RATE_PER_MINUTE={},
+    QUEUE_WAIT={"interactive": 0, "standard": 0, "background": 0},
+)
+class AIGovernorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _fill(self, priority):
+        """Take leases in class *priority* until ``Saturated``; returns them."""
+        leases = []
+        ai_governor.set_priority(priority)
+        try:
+            while True:
+                leases.append(ai_governor.acquire("p", "m"))
+        except ai_governor.Saturated:
+            return leases
+        finally:
+            ai_governor.set_priority(ai_governor.DEFAULT_PRIORITY)
+
+    def test_classes_get_their_share_of_slots(self):
+        self.assertEqual(len(self._fill("background")), 5)
+        self.assertEqual(len(self._fill("standard")), 3)
+        self.assertEqual(len(self._fill("interactive")), 2)
+
+    def test_released_slots_are_reused(self):
+        leases = self._fill("standard")
+        leases.pop().release()
+        self.assertEqual(len(self._fill("standard")), 1)
+
+    def test_interactive_takes_the_reserved_slots_first(self):
+        ai_governor.prioritized("interactive")(lambda: ai_governor.acquire("p", "m"))()
+        self.assertEqual(len(self._fill("standard")), 8)
+
+    def test_classes_get_their_share_of_the_quota(self):
+        now = int(time.time() // 60) * 60 + 30          # mid-window, so the minute can't roll over
+        with mock.patch.object(ai_governor, "CONCURRENCY", {}), \
+                mock.patch.object(ai_governor, "RATE_PER_MINUTE", {"p": 10}), \
+                mock.patch("time.time", return_value=now):
+            self.assertEqual(len(self._fill("standard")), 8)
+            self.assertEqual(len(self._fill("interactive")), 2)
+
+    def test_cooldown_saturates_immediately(self):
+        ai_governor.cool_down("p", "m", 30)
+        with self.assertRaises(ai_governor.Saturated):
+            ai_governor.acquire("p", "m")
+        self.assertEqual(len(self._fill("standard")), 0)
+        ai_governor.acquire("p", "other").release()
+
+    def test_async_acquire_shares_the_slots(self):
+        async def main():
+            leases = [await ai_governor.aacquire("p", "m") for _ in range(8)]
+            with self.assertRaises(ai_governor.Saturated):
+                await ai_governor.aacquire("p", "m")
+            return leases
+
+        self.assertEqual(len(asyncio.run(main())), 8)
+
+
+def _stream_markup(reply, chunk):
+    parser = jada_markup.MarkupParser()
+    for i in range(0, len(reply), chunk):
+        parser.feed(reply[i:i + chunk])
+    return parser.close()
+
+
+class JadaMarkupTests(TestCase):
+    EDGE_CASES = [
+        "",
+        "No markup at all, just [brackets] and [QUIZ text.",
+        "[single_select]\nLower-case marker?\n1. Yes\n2. No\n",
+        "[SINGLE_SELECT]\nOnly one option\n1. Yes\n",
+        "[TRUE_FALSE]\nLast line without a newline",
+        "[QUIZ_START]\n[QUIZ_END]\nEmpty quiz",
+        "[QUIZ_START] Unclosed\n[QUIZ_Q1]\n[TRUE_FALSE]\nStatement\n",
+        "Which one?\nPick an option:\n1. A\n2. B\nTrailing text",
+    ]
+
+    def _replies(self):
+        rng = random.Random(3)
+        for tail in markup_bench.TAILS:
+            yield markup_bench.TAILS[tail]
+            for size in (300, 3_000):
+                yield markup_bench._reply(rng, size, tail)
+        yield from self.EDGE_CASES
+
+    def test_parse_matches_the_legacy_extractors(self):
+        for reply in self._replies():
+            with self.subTest(reply=reply[:60]):
+                self.assertEqual(jada_markup.parse(reply), markup_bench._legacy(reply))
+
+    def test_streamed_chunks_match_parse(self):
+        for reply in self._replies():
+            expected = jada_markup.parse(reply)
+            for chunk in (1, 5, 16):
+                with self.subTest(reply=reply[:60], chunk=chunk):
+                    self.assertEqual(_stream_markup(reply, chunk), expected)
+
+    def test_quiz_and_select_are_both_extracted(self):
+        quiz, interactive, clean = jada_markup.parse(markup_bench.TAILS["quiz_and_select"])
+        self.assertEqual((quiz["title"], [q["type"] for q in quiz["questions"]]), ("Grid Check", ["boolean"]))
+        self.assertEqual(interactive["question_text"], "Ready for the next module?")
+        self.assertNotIn("[", clean)
@@ -0,0 +1,20 @@
+"""
+Throttles
+=========
+``AIEndpointThrottle`` is one per-user (per-IP for guests) budget shared by
+every endpoint that can call a model, at the ``ai_endpoints`` rate in
+``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']`` (``AI_ENDPOINT_RATE``).  It is
+applied on top of the default anon/user throttles, not instead of them.
+"""
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import UserRateThrottle
+
+
+class AIEndpointThrottle(UserRateThrottle):
+    scope = 'ai_endpoints'
+
+
+def ai_throttles():
+    """Default throttles plus the AI budget, for ``async_api_view(throttle_classes=...)``."""
+    return [*api_settings.DEFAULT_THROTTLE_CLASSES, AIEndpointThrottle]
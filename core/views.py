@@ -1,28 +1,40 @@
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import Throttled
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from .serializers import RegisterSerializer, ProjectCommentSerializer, UserProfileSerializer
 from .models import (
     UserRoadmapItem, UserActivity, ProjectReview, ProjectComment, User,
     CommunityPost, CommunityReply, Badge, UserFollowing, Waitlist,
-    UserTechDebt, ResourceClick, JadaConversation, JadaMessage,
+    ResourceClick, JadaConversation, JadaMessage,
     RoleRoadmapTemplate, LessonProgress,
 )
-from .ai_logic import generate_detailed_roadmap, generate_lesson_quiz
+from .ai_logic import (
+    generate_detailed_roadmap, generate_lesson_quiz, agenerate_lesson_quiz, agenerate_module_lesson_quizzes,
+    acached_lesson_quiz,
+)
 from .role_catalog import get_role_template, get_available_roles, suggest_role_for_course
+from . import ai_governor, ai_ledger, deadlines, question_bank, quiz_engine
+from .prefetch import aon_quiz_served, on_module_unlocked
+from .throttles import AIEndpointThrottle, ai_throttles
+from .lesson_plans import lessons_for_item
 from .news_logic import fetch_tech_news, fetch_jobs_multi
 from .youtube_logic import fetch_youtube_for_modules
 from .resource_queries import get_user_search_context
 from .posthog_client import ph_capture, ph_identify
 from django.core.cache import cache as django_cache
-from django.shortcuts import get_object_or_404
+from django.shortcuts import get_object_or_404, aget_object_or_404
 from datetime import datetime, timedelta
 from django.db import transaction
 
 from django.utils import timezone
 from django.db.models import Count, F
 from django.db.models.functions import Greatest
+from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from .async_api import async_api_view
+import json
 import re
 
 
@@ -345,14 +357,82 @@ def suggest_role(request):
     return Response({"suggestion": None})
 
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def complete_onboarding(request):
+def _load_onboarding_roadmap(user, *, role_key, role_title, modules, is_custom_role,
+                             university_course, budget, gender, level):
+    """Save the onboarding answers and replace the user's roadmap with *modules*."""
+    # Update user profile
+    user.target_career = role_title
+    user.university_course_raw = university_course
+    user.budget_preference = budget
+    if gender:
+        user.gender = gender
+    # Persist experience level
+    level_map = {'novice': 'Beginner', 'apprentice': 'Intermediate', 'pro': 'Advanced', 'expert': 'Expert'}
+    if level and level in level_map:
+        user.current_level = level_map[level]
+    user.save()
+
+    # Clear existing roadmap and load modules
+    UserRoadmapItem.objects.filter(user=user).delete()
+
+    created_items = []
+    for i, module_data in enumerate(modules):
+        item_status = 'active' if i == 0 else 'locked'
+        resources = module_data.get('resources', {})
+        if module_data.get('lessons'):
+            resources['lesson_outline'] = module_data['lessons']
+        # Store connections and node_type in resources for frontend graph rendering
+        resources['_connections'] = module_data.get('connections', [])
+        resources['_node_type'] = module_data.get('node_type', 'core')
+
+        item = UserRoadmapItem.objects.create(
+            user=user,
+            step_order=i,
+            label=module_data.get('label', f'Module {i+1}'),
+            description=module_data.get('description', ''),
+            status=item_status,
+            market_value=module_data.get('market_value', 'Med'),
+            resources=resources,
+            project_prompt=module_data.get('project_prompt', 'No project defined')
+        )
+        created_items.append(item)
+
+    source = 'ai-generated' if is_custom_role else role_key
+    print(f"[ONBOARDING] Loaded {len(created_items)} modules from '{source}' for {user.username}")
+
+    # PostHog: track onboarding completion
+    ph_capture(user, 'onboarding_completed', {
+        'role': role_key if not is_custom_role else 'custom',
+        'role_title': role_title,
+        'level': level,
+        'module_count': len(created_items),
+        'is_custom': is_custom_role,
+    })
+    return len(created_items)
+
+
+async def _enqueue_custom_roadmap(user_id, custom_niche, university_course, budget, gender, level):
+    """Queue custom-role generation; returns the AsyncResult or None if Celery is unreachable."""
+    from .tasks import generate_custom_roadmap_async
+
+    try:
+        return await sync_to_async(generate_custom_roadmap_async.delay, thread_sensitive=False)(
+            user_id, custom_niche, university_course, budget, gender, level,
+        )
+    except Exception as e:
+        print(f"[ONBOARDING] Could not queue custom roadmap, generating inline: {e}")
+        return None
+
+
+@async_api_view(['POST'], throttle_classes=ai_throttles())
+async def complete_onboarding(request):
     """
     Complete onboarding using role-based roadmap templates.
     Accepts: role (key from catalog), level (novice/apprentice/pro/expert),
              university_course (optional), budget, gender.
     Loads pre-built roadmap from catalog — no more per-user AI generation.
+    Custom roles (role='custom' + custom_niche) are generated in the background:
+    the response is 202 with a task_id to poll via check_roadmap_status.
     """
     user = request.user
 
@@ -378,12 +458,12 @@ def complete_onboarding(request):
         role_key = niche_to_role.get(niche.lower(), 'fullstack')
 
     if not role_key:
-        return Response({"error": "Career role is required"}, status=400)
+        return JsonResponse({"error": "Career role is required"}, status=400)
 
     # Validate gender
     allowed_genders = {'unspecified', 'female', 'male', 'nonbinary'}
     if gender and gender not in allowed_genders:
-        return Response({"error": f"Gender must be one of {sorted(allowed_genders)}"}, status=400)
+        return JsonResponse({"error": f"Gender must be one of {sorted(allowed_genders)}"}, status=400)
 
     # Load role template from catalog
     template = get_role_template(role_key)
@@ -395,75 +475,52 @@ def complete_onboarding(request):
         if not custom_niche and niche:
             custom_niche = niche
         if not custom_niche:
-            return Response({"error": "Please provide a career description for custom roles"}, status=400)
+            return JsonResponse({"error": "Please provide a career description for custom roles"}, status=400)
     elif not template:
-        return Response({"error": f"Role '{role_key}' is not available yet"}, status=400)
+        return JsonResponse({"error": f"Role '{role_key}' is not available yet"}, status=400)
+
+    if is_custom_role:
+        # Custom roles are generated by a Celery job; the client polls roadmap-status
+        job = await _enqueue_custom_roadmap(
+            user.id, custom_niche, university_course, budget, gender, level,
+        )
+        if job is not None:
+            return JsonResponse({
+                "message": "Generating your custom roadmap...",
+                "task_id": job.id,
+                "status_url": f"/api/roadmap-status/{job.id}/",
+                "role": 'custom',
+                "role_title": custom_niche.title(),
+            }, status=202)
 
     try:
         # Determine the role title and module data
         if is_custom_role:
             role_title = custom_niche.title()
-            # Generate custom roadmap via AI
-            from .ai_logic import generate_detailed_roadmap
-            modules = generate_detailed_roadmap(custom_niche, university_course, budget)
+            # No broker reachable: generate inline as before
+            from .ai_logic import agenerate_detailed_roadmap
+            modules = await agenerate_detailed_roadmap(custom_niche, university_course, budget)
             if not modules or len(modules) == 0:
-                return Response({"error": "Failed to generate a custom roadmap. Please try a different role."}, status=500)
+                return JsonResponse({"error": "Failed to generate a custom roadmap. Please try a different role."}, status=500)
         else:
             role_title = template["title"]
             modules = template["modules"]
 
-        # Update user profile
-        user.target_career = role_title
-        user.university_course_raw = university_course
-        user.budget_preference = budget
-        if gender:
-            user.gender = gender
-        # Persist experience level
-        level_map = {'novice': 'Beginner', 'apprentice': 'Intermediate', 'pro': 'Advanced', 'expert': 'Expert'}
-        if level and level in level_map:
-            user.current_level = level_map[level]
-        user.save()
-
-        # Clear existing roadmap and load modules
-        UserRoadmapItem.objects.filter(user=user).delete()
-
-        created_items = []
-        for i, module_data in enumerate(modules):
-            item_status = 'active' if i == 0 else 'locked'
-            resources = module_data.get('resources', {})
-            if module_data.get('lessons'):
-                resources['lesson_outline'] = module_data['lessons']
-            # Store connections and node_type in resources for frontend graph rendering
-            resources['_connections'] = module_data.get('connections', [])
-            resources['_node_type'] = module_data.get('node_type', 'core')
-
-            item = UserRoadmapItem.objects.create(
-                user=user,
-                step_order=i,
-                label=module_data.get('label', f'Module {i+1}'),
-                description=module_data.get('description', ''),
-                status=item_status,
-                market_value=module_data.get('market_value', 'Med'),
-                resources=resources,
-                project_prompt=module_data.get('project_prompt', 'No project defined')
-            )
-            created_items.append(item)
-
-        source = 'ai-generated' if is_custom_role else role_key
-        print(f"[ONBOARDING] Loaded {len(created_items)} modules from '{source}' for {user.username}")
-
-        # PostHog: track onboarding completion
-        ph_capture(user, 'onboarding_completed', {
-            'role': role_key if not is_custom_role else 'custom',
-            'role_title': role_title,
-            'level': level,
-            'module_count': len(created_items),
-            'is_custom': is_custom_role,
-        })
+        modules_created = await sync_to_async(_load_onboarding_roadmap)(
+            user,
+            role_key=role_key,
+            role_title=role_title,
+            modules=modules,
+            is_custom_role=is_custom_role,
+            university_course=university_course,
+            budget=budget,
+            gender=gender,
+            level=level,
+        )
 
-        return Response({
+        return JsonResponse({
             "message": "Onboarding complete! Roadmap loaded.",
-            "modules_created": len(created_items),
+            "modules_created": modules_created,
             "role": role_key if not is_custom_role else 'custom',
             "role_title": role_title,
         }, status=200)
@@ -472,7 +529,7 @@ def complete_onboarding(request):
         import traceback
         print(f"[ONBOARDING ERROR] {type(e).__name__}: {e}")
         traceback.print_exc()
-        return Response({
+        return JsonResponse({
             "error": "Failed to load your roadmap. Please try again.",
             "technical_details": f"{type(e).__name__}: {e}" if settings.DEBUG else None
         }, status=500)
@@ -613,6 +670,11 @@ def get_my_roadmap(request):
     else:
         print("No existing roadmap, generating new one...")
 
+    # Only generation spends the AI budget; loading a saved roadmap doesn't.
+    ai_throttle = AIEndpointThrottle()
+    if not ai_throttle.allow_request(request, None):
+        raise Throttled(wait=ai_throttle.wait())
+
     # De-dupe rapid regen requests and prevent overwriting a good roadmap with fallback.
     from django.core.cache import cache
     lock_key = f"roadmap_gen_lock:{user.id}"
@@ -762,8 +824,19 @@ def check_roadmap_status(request, task_id):
     
     task = AsyncResult(task_id)
     user = request.user
-    
-    if task.ready():
+
+    info = task.info if isinstance(task.info, dict) else {}
+    if info.get('user_id') not in (None, user.id):
+        return Response({"status": "error", "message": "Task not found"}, status=404)
+
+    if task.state == 'PROGRESS':
+        # Custom-role generation: prompting → validating → persisting
+        return Response({"status": "pending", "stage": info.get('stage')})
+
+    if task.successful() and info.get('status') == 'error':
+        return Response({"status": "error", "message": info.get('message', "Roadmap generation failed")}, status=500)
+
+    if task.ready() and not task.failed():
         items = UserRoadmapItem.objects.filter(user=user).order_by('step_order')
         
         if items.exists():
@@ -804,8 +877,8 @@ def check_roadmap_status(request, task_id):
     
     elif task.failed():
         return Response({"status": "error", "message": "Task failed"}, status=500)
-    
-    return Response({"status": "pending"})
+
+    return Response({"status": "pending", "stage": 'started' if task.state == 'STARTED' else 'queued'})
 
 # ==========================================
 # PROJECT VERIFICATION SYSTEM (Phase 3)
@@ -894,7 +967,22 @@ def submit_project(request, node_id):
     score_result = None
     if 'github.com' in submission_link.lower():
         score_result = score_github_project(submission_link, node.label)
-        
+
+        # Ran out of time before every check ran: don't record a failure we didn't measure
+        if score_result.get("partial") and not score_result.get("passed", False):
+            return Response({
+                "success": False,
+                "message": "GitHub answered too slowly to finish scoring your project. Please submit again in a moment.",
+                "node_id": str(node.id),
+                "status": node.status,
+                "verification_status": node.verification_status,
+                "score": score_result.get("score", 0),
+                "threshold": MINIMUM_SCORE_THRESHOLD,
+                "checks": score_result.get("checks", {}),
+                "suggestions": score_result.get("suggestions", []),
+                "metadata": score_result.get("metadata", {})
+            }, status=503)
+
         # Persist score data to the module
         node.github_score = score_result.get("score", 0)
         node.score_breakdown = score_result
@@ -935,6 +1023,7 @@ def submit_project(request, node_id):
             next_node.status = 'active'
             next_node.save()
             next_data = {"id": str(next_node.id), "status": "active"}
+            on_module_unlocked(next_node)
         
         # Log activity for streak
         today = datetime.now().date()
@@ -1804,38 +1893,47 @@ def get_community_feed(request):
         
     return Response(feed_data)
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def get_daily_quiz(request):
+
+DAILY_QUIZ_VARIANTS = 7
+
+
+@async_api_view(['GET'], throttle_classes=ai_throttles())
+async def get_daily_quiz(request):
     """
     Generates a daily practice quiz based on the user's active module.
     Returns quiz_completed=True if already done today.
     """
-    from .ai_logic import generate_quiz
+    from .ai_logic import agenerate_quiz
     
     user = request.user
     today = datetime.now().date()
     
     # Check if quiz was already completed today (count >= 1000 is our marker)
-    activity = UserActivity.objects.filter(user=user, date=today).first()
+    activity = await UserActivity.objects.filter(user=user, date=today).afirst()
     if activity and activity.count >= 1000:
-        return Response({
+        return JsonResponse({
             "quiz_completed": True,
             "message": "You've already completed today's quiz!"
         })
     
     # Find active module, or fallback to last completed
-    target_item = UserRoadmapItem.objects.filter(user=user, status='active').first()
+    target_item = await UserRoadmapItem.objects.filter(user=user, status='active').afirst()
     if not target_item:
-        target_item = UserRoadmapItem.objects.filter(user=user, status='completed').last()
+        target_item = await UserRoadmapItem.objects.filter(user=user, status='completed').alast()
     
     if not target_item:
-        return Response({"error": "No active roadmap found"}, status=404)
+        return JsonResponse({"error": "No active roadmap found"}, status=404)
         
-    # Generate fresh quiz
-    questions = generate_quiz(target_item.label, target_item.description)
+    # Rotate through shared quiz variants so each day brings new questions;
+    # catalog modules come straight from the pre-generated bank.
+    variant = today.toordinal() % DAILY_QUIZ_VARIANTS
+    questions = await question_bank.apick(
+        'module', target_item.label, variant=variant, description=target_item.description,
+    )
+    if questions is None:
+        questions = await agenerate_quiz(target_item.label, target_item.description, variant=variant)
     
-    return Response({
+    return JsonResponse({
         "module": target_item.label,
         "questions": questions,
         "quiz_completed": False
@@ -2085,6 +2183,7 @@ def track_cv_export(request):
 
 # ── Constants for resource feed ──
 _RESOURCE_CACHE_TTL = 3600           # 1 h
+_PARTIAL_RESOURCE_TTL = 300          # Feed cut short by the request deadline
 _FREE_RESOURCE_LIMIT = 14            # Premium wall kicks in after 14
 _PAGE_SIZE = 6                       # Items per incremental load
 
@@ -2135,7 +2234,8 @@ def get_resources_feed(request):
             print(f"[resources_feed] {tab} error: {exc}")
             items = []
 
-        django_cache.set(cache_key, items, _RESOURCE_CACHE_TTL)
+        ttl = _PARTIAL_RESOURCE_TTL if deadlines.expired() else _RESOURCE_CACHE_TTL
+        django_cache.set(cache_key, items, ttl)
 
     # ── premium gating ──
     total = len(items)
@@ -2166,20 +2266,36 @@ def get_resources_feed(request):
 # 6. QUIZ SYSTEM
 # ==========================================
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def get_quiz(request, item_id):
+@async_api_view(['GET'], throttle_classes=ai_throttles())
+async def get_quiz(request, item_id):
     """Get or generate quiz for a module."""
     from .models import Quiz
-    from .ai_logic import generate_quiz
+    from .ai_logic import acached_quiz, agenerate_quiz
     
-    item = get_object_or_404(UserRoadmapItem, id=item_id, user=request.user)
+    item = await aget_object_or_404(
+        UserRoadmapItem.objects.select_related('lesson_plan'), id=item_id, user=request.user,
+    )
     
-    quiz, created = Quiz.objects.get_or_create(roadmap_item=item)
+    quiz, created = await Quiz.objects.aget_or_create(roadmap_item=item, defaults={"questions": []})
     
-    if created or not quiz.questions:
-        quiz.questions = generate_quiz(item.label, item.description)
-        quiz.save()
+    # A rule-based quiz is replaced as soon as a generated one is available
+    if created or not quiz.questions or quiz_engine.is_rule_based(quiz.questions):
+        # Catalog modules are pre-generated; only custom roadmaps hit the LLM
+        questions = (
+            await question_bank.apick('module', item.label, description=item.description)
+            or await acached_quiz(item.label, item.description)
+        )
+        if questions is None and not quiz.questions:
+            if quiz_engine.INSTANT_QUIZZES:
+                # Answer now; the AI quiz is generated in the background
+                questions = quiz_engine.module_quiz(item.label, item.description, lessons=lessons_for_item(item))
+            else:
+                questions = await agenerate_quiz(item.label, item.description)
+        if quiz_engine.is_rule_based(questions or quiz.questions):
+            await aon_quiz_served(item, 'module')
+        if questions is not None:
+            quiz.questions = questions
+            await quiz.asave()
     
     questions_safe = [
         {
@@ -2189,7 +2305,7 @@ def get_quiz(request, item_id):
         for q in quiz.questions
     ]
     
-    return Response({
+    return JsonResponse({
         "questions": questions_safe,
         "attempts": quiz.attempts,
         "passed": quiz.passed,
@@ -2256,6 +2372,7 @@ def submit_quiz(request, item_id):
         if next_item:
             next_item.status = 'active'
             next_item.save()
+            on_module_unlocked(next_item)
         
         today = datetime.now().date()
         activity, _ = UserActivity.objects.get_or_create(user=request.user, date=today)
@@ -2969,7 +3086,10 @@ def apply_to_job(request, job_id):
 # JADA AI ASSISTANT (OpenRouter cascade)
 # ==========================================
 
-from .openrouter_client import chat_completions_cascade, OpenRouterError
+from .openrouter_client import OpenRouterError, HEDGE_DELAY_SECONDS, FREE_MODEL_CASCADE
+from .openrouter_async import achat_completions_cascade
+from .model_health import rank_models, snapshot as model_health_snapshot
+from . import catalog_index, jada_archive, jada_context, jada_markup, jada_memory, jada_suggestions
 
 JADA_SYSTEM_PROMPT = (
     "You are JADA — a friendly, confident AI career coach for aspiring developers. "
@@ -3069,190 +3189,6 @@ JADA_ALLOWED_MODELS = {
 }
 
 
-def _parse_option_line(line: str):
-    """Parse '1. **Label** - Description' or '1. Label' into {label, description}."""
-    import re
-    cleaned = re.sub(r'^\s*\d+\.\s*', '', line).strip()
-    # Try **bold label** - description
-    m = re.match(r'\*\*(.+?)\*\*\s*[-–—]\s*(.+)', cleaned)
-    if m:
-        return {'label': m.group(1).strip(), 'description': m.group(2).strip()}
-    # Try bold label without description
-    m = re.match(r'\*\*(.+?)\*\*', cleaned)
-    if m:
-        return {'label': m.group(1).strip(), 'description': ''}
-    # Plain text — check for dash separator
-    if ' - ' in cleaned:
-        parts = cleaned.split(' - ', 1)
-        return {'label': parts[0].strip(), 'description': parts[1].strip()}
-    return {'label': cleaned, 'description': ''}
-
-
-def _extract_interactive(reply: str):
-    """Extract structured interactive questions from LLM reply.
-
-    Detects [SINGLE_SELECT], [MULTI_SELECT], [TRUE_FALSE] markers.
-    Returns (interactive_data_or_None, clean_reply).
-    interactive_data = {type, question_text, options: [{label, description}], include_other}
-    """
-    import re
-
-    # Match [SINGLE_SELECT] or [MULTI_SELECT] block
-    select_pattern = re.compile(
-        r'(?P<before>[\s\S]*?)'
-        r'\[(?P<type>SINGLE_SELECT|MULTI_SELECT)\]\s*\n'
-        r'(?P<question>.+?)\n'
-        r'(?P<opts>(?:\s*\d+\.\s+.+\n?){2,})'
-        r'(?P<after>[\s\S]*?)$',
-        re.IGNORECASE,
-    )
-    m = select_pattern.match(reply)
-    if m:
-        q_type = 'single' if 'SINGLE' in m.group('type').upper() else 'multi'
-        question_text = m.group('question').strip()
-        opts_raw = m.group('opts')
-        options = [
-            _parse_option_line(line)
-            for line in opts_raw.strip().splitlines()
-            if line.strip()
-        ]
-        clean = (m.group('before').rstrip() + '\n' + m.group('after').strip()).strip()
-        return {
-            'type': q_type,
-            'question_text': question_text,
-            'options': options,
-            'include_other': True,
-        }, clean
-
-    # Match [TRUE_FALSE] block
-    tf_pattern = re.compile(
-        r'(?P<before>[\s\S]*?)'
-        r'\[TRUE_FALSE\]\s*\n'
-        r'(?P<statement>.+?)'
-        r'(?:\n(?P<after>[\s\S]*))?$',
-        re.IGNORECASE,
-    )
-    m = tf_pattern.match(reply)
-    if m:
-        statement = m.group('statement').strip()
-        after = (m.group('after') or '').strip()
-        clean = (m.group('before').rstrip() + ('\n' + after if after else '')).strip()
-        return {
-            'type': 'boolean',
-            'question_text': statement,
-            'options': [
-                {'label': 'True', 'description': ''},
-                {'label': 'False', 'description': ''},
-            ],
-            'include_other': False,
-        }, clean
-
-    # Legacy fallback: 'Choose one:' pattern
-    trigger = r'(?:Choose one|Pick an option|Select one|Which would you prefer)[:\s]*'
-    legacy_pattern = re.compile(
-        r'(?P<before>[\s\S]*?)'
-        rf'(?:{trigger})\s*\n'
-        r'(?P<opts>(?:\s*\d+\.\s+.+\n?){2,})'
-        r'\s*$',
-        re.IGNORECASE,
-    )
-    m = legacy_pattern.match(reply)
-    if m:
-        question_text = ''
-        # Try to grab last line before trigger as question
-        before_text = m.group('before').rstrip()
-        before_lines = before_text.splitlines()
-        if before_lines and before_lines[-1].strip().endswith('?'):
-            question_text = before_lines[-1].strip()
-            before_text = '\n'.join(before_lines[:-1]).rstrip()
-        opts_raw = m.group('opts')
-        options = [
-            _parse_option_line(line)
-            for line in opts_raw.strip().splitlines()
-            if line.strip()
-        ]
-        if options:
-            return {
-                'type': 'single',
-                'question_text': question_text,
-                'options': options,
-                'include_other': True,
-            }, before_text
-
-    return None, reply
-
-
-def _extract_quiz(reply: str):
-    """Extract structured quiz data from LLM reply with [QUIZ_START]...[QUIZ_END] markers.
-
-    Returns (quiz_data_or_None, clean_reply).
-    quiz_data = {title, questions: [{id, type, question_text, options}]}
-    """
-    import re
-
-    quiz_pattern = re.compile(
-        r'(?P<before>[\s\S]*?)'
-        r'\[QUIZ_START\]\s*(?P<title>.*)\n'
-        r'(?P<body>[\s\S]*?)'
-        r'\[QUIZ_END\]'
-        r'(?P<after>[\s\S]*?)$',
-        re.IGNORECASE,
-    )
-    m = quiz_pattern.match(reply)
-    if not m:
-        return None, reply
-
-    title = m.group('title').strip() or 'Quiz'
-    body = m.group('body')
-    clean = (m.group('before').rstrip() + '\n' + m.group('after').strip()).strip()
-
-    # Split by [QUIZ_QN] markers
-    q_parts = re.split(r'\[QUIZ_Q(\d+)\]', body)
-    # q_parts: ['before', '1', 'content1', '2', 'content2', ...]
-    questions = []
-    i = 1
-    while i < len(q_parts) - 1:
-        q_num = q_parts[i]
-        q_content = q_parts[i + 1].strip()
-        i += 2
-
-        q_type = 'single'
-        if re.search(r'\[SINGLE_SELECT\]', q_content, re.IGNORECASE):
-            q_type = 'single'
-            q_content = re.sub(r'\[SINGLE_SELECT\]\s*\n?', '', q_content, flags=re.IGNORECASE)
-        elif re.search(r'\[MULTI_SELECT\]', q_content, re.IGNORECASE):
-            q_type = 'multi'
-            q_content = re.sub(r'\[MULTI_SELECT\]\s*\n?', '', q_content, flags=re.IGNORECASE)
-        elif re.search(r'\[TRUE_FALSE\]', q_content, re.IGNORECASE):
-            q_type = 'boolean'
-            q_content = re.sub(r'\[TRUE_FALSE\]\s*\n?', '', q_content, flags=re.IGNORECASE)
-
-        lines = q_content.strip().splitlines()
-        question_text = ''
-        option_lines = []
-        for line in lines:
-            if re.match(r'\s*\d+\.\s+', line):
-                option_lines.append(line)
-            elif not option_lines:
-                question_text += (' ' + line.strip()) if question_text else line.strip()
-
-        options = [_parse_option_line(ol) for ol in option_lines] if option_lines else []
-        if q_type == 'boolean' and not options:
-            options = [{'label': 'True', 'description': ''}, {'label': 'False', 'description': ''}]
-
-        questions.append({
-            'id': f'q{q_num}',
-            'type': q_type,
-            'question_text': question_text,
-            'options': options,
-        })
-
-    if not questions:
-        return None, reply
-
-    return {'title': title, 'questions': questions}, clean
-
-
 def _classify_complexity(message: str) -> str:
     """Route messages: code/debug/architecture → technical, else casual."""
     technical_keywords = [
@@ -3271,20 +3207,20 @@ def _generate_suggestions(user_message: str, reply: str, module=None):
 
     # Module-aware suggestions
     if module:
-        label = module.label or "this module"
         status = module.status or "active"
 
+        # Module-only prompts come from jada_suggestions.TEMPLATES, which pre-answers them
         if status == "active":
             suggestions.extend([
-                f"What are the key concepts in {label}?",
-                "What project should I build for this module?",
+                jada_suggestions.text("key_concepts", module),
+                jada_suggestions.text("project", module),
                 "Quiz me on what I've learned so far",
             ])
         elif status == "completed":
             suggestions.extend([
                 "What should I learn next?",
                 "How can I improve my project score?",
-                f"Give me advanced tips for {label}",
+                jada_suggestions.text("advanced_tips", module),
             ])
     else:
         suggestions.extend([
@@ -3310,98 +3246,28 @@ def _generate_suggestions(user_message: str, reply: str, module=None):
     return combined[:4]
 
 
-def _build_jada_context(user, module):
-    """Build rich context block for JADA's system prompt including lesson progress."""
-    parts = []
-
-    if module:
-        parts.insert(0,
-            f"IMPORTANT: The user has ALREADY selected their module — '{module.label}'. "
-            f"Do NOT ask them which module they are working on. "
-            f"Start helping immediately based on this module context. "
-            f"You know their module, their progress, and their status — use it."
-        )
-        parts.append(
-            f"User is working on module: {module.label} — {module.description}. "
-            f"Status: {module.status}."
-        )
-
-        # Lesson progress for this module
-        lp_qs = LessonProgress.objects.filter(user=user, roadmap_item=module)
-        done = lp_qs.filter(is_completed=True).count()
-        total = lp_qs.count()
-        if total:
-            parts.append(f"Lesson progress: {done}/{total} lessons completed in this module.")
-            # List incomplete lessons so JADA can nudge
-            incomplete = lp_qs.filter(is_completed=False).values_list('lesson_title', flat=True)[:5]
-            if incomplete:
-                parts.append(f"Remaining lessons: {', '.join(incomplete)}.")
-        else:
-            # Use lesson_outline count from resources
-            outline = (module.resources or {}).get('lesson_outline') or []
-            if outline:
-                parts.append(f"Module has {len(outline)} lessons (none started yet).")
-
-        # Quiz info
-        quiz = getattr(module, 'quiz', None)
-        if quiz:
-            parts.append(
-                f"Module quiz: {'Passed' if quiz.passed else 'Not passed'} "
-                f"(score: {quiz.score}, attempts: {quiz.attempts})."
-            )
-
-        # Project submission
-        if module.project_submission_link:
-            parts.append(f"Project submitted: {module.project_submission_link}")
-        else:
-            parts.append("Project: Not submitted yet.")
-
-        # Tech debt
-        debts = UserTechDebt.objects.filter(user=user, resolved=False)[:3]
-        if debts:
-            topics = ', '.join(d.topic for d in debts)
-            parts.append(f"Skipped topics to revisit: {topics}.")
-
-        # Recent resource clicks
-        clicks = ResourceClick.objects.filter(user=user, module=module).order_by('-clicked_at')[:3]
-        if clicks:
-            titles = ', '.join(c.title[:40] for c in clicks if c.title)
-            if titles:
-                parts.append(f"Recently viewed resources: {titles}.")
-
-    # Global progress
-    completed_count = UserRoadmapItem.objects.filter(user=user, status='completed').count()
-    total_count = UserRoadmapItem.objects.filter(user=user).count()
-    if total_count:
-        parts.append(f"Overall progress: {completed_count}/{total_count} modules completed.")
-
-    return "\n".join(parts)
-
-
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def jada_chat(request):
+def _prepare_jada_turn(user, data):
     """
-    Send a message to JADA. Uses cascade model routing.
-    Supports both authenticated users and guest sessions.
-    Body: { message, conversation_id?, mode?, module_id?, preferred_model?, session_id? }
+    Validate a JADA chat request and assemble everything needed to call the model.
+    Shared by the blocking and streaming endpoints.
+
+    Returns ``(turn, None)`` on success or ``(None, (error_payload, status))``.
     """
     import uuid as _uuid
 
-    user = request.user if request.user.is_authenticated else None
     is_guest = user is None
-    message = request.data.get('message', '').strip()
+    message = (data.get('message') or '').strip()
 
     if not message:
-        return Response({"error": "Message is required"}, status=400)
+        return None, ({"error": "Message is required"}, 400)
     if len(message) > 4000:
-        return Response({"error": "Message too long (max 4000 chars)"}, status=400)
+        return None, ({"error": "Message too long (max 4000 chars)"}, 400)
 
-    mode = request.data.get('mode', 'general')
-    conversation_id = request.data.get('conversation_id')
-    module_id = request.data.get('module_id')
-    preferred_model = request.data.get('preferred_model', 'auto')
-    session_id = request.data.get('session_id')
+    mode = data.get('mode', 'general')
+    conversation_id = data.get('conversation_id')
+    module_id = data.get('module_id')
+    preferred_model = data.get('preferred_model', 'auto')
+    session_id = data.get('session_id')
     if preferred_model not in JADA_ALLOWED_MODELS:
         preferred_model = 'auto'
 
@@ -3410,16 +3276,6 @@ def jada_chat(request):
         mode = 'consultant'
         if not session_id:
             session_id = str(_uuid.uuid4())
-        # Rate-limit guests: max 20 messages per session
-        if conversation_id:
-            msg_count = JadaMessage.objects.filter(
-                conversation_id=conversation_id, role='user'
-            ).count()
-            if msg_count >= 20:
-                return Response({
-                    "error": "Guest message limit reached. Sign up to continue chatting with JADA!",
-                    "limit_reached": True,
-                }, status=429)
 
     # Get or create conversation
     conversation = None
@@ -3430,6 +3286,18 @@ def jada_chat(request):
             ).first()
         else:
             conversation = JadaConversation.objects.filter(id=conversation_id, user=user).first()
+        if conversation:
+            # Resuming an idle conversation brings its messages back from cold storage
+            jada_archive.restore(conversation)
+
+    # Rate-limit guests: max 20 messages per session
+    if is_guest and conversation:
+        msg_count = JadaMessage.objects.filter(conversation=conversation, role='user').count()
+        if msg_count >= 20:
+            return None, ({
+                "error": "Guest message limit reached. Sign up to continue chatting with JADA!",
+                "limit_reached": True,
+            }, 429)
 
     if not conversation:
         # Resolve module context (only for authenticated users)
@@ -3444,18 +3312,32 @@ def jada_chat(request):
             user=user,
             session_id=session_id if is_guest else None,
             context_module=context_module,
+            module_label=context_module.label if context_module else '',
             mode=mode,
         )
     elif module_id and not is_guest:
         # Update module context if explicitly provided on existing conversation
         new_mod = UserRoadmapItem.objects.filter(id=module_id, user=user).first()
-        if new_mod and new_mod != conversation.context_module:
+        if new_mod and new_mod.id != conversation.context_module_id:
             conversation.context_module = new_mod
-            conversation.save(update_fields=['context_module'])
+            conversation.module_label = new_mod.label
+            conversation.save(update_fields=['context_module', 'module_label'])
 
-    # Build message history (last 20 messages for context window)
-    history = list(conversation.messages.order_by('-created_at')[:20])
-    history.reverse()
+    complexity = _classify_complexity(message)
+
+    # A clicked module suggestion that is already answered skips the model entirely
+    if not is_guest and mode != 'consultant':
+        pre_answered = jada_suggestions.lookup(message, conversation.context_module)
+        if pre_answered:
+            return {
+                "message": message,
+                "conversation": conversation,
+                "messages_payload": [],
+                "model_cascade": [],
+                "complexity": complexity,
+                "use_gemini_direct": False,
+                "pre_answered": pre_answered,
+            }, None
 
     # Select system prompt based on mode
     system_prompt = CONSULTANT_SYSTEM_PROMPT if mode == 'consultant' else JADA_SYSTEM_PROMPT
@@ -3463,21 +3345,24 @@ def jada_chat(request):
 
     # Rich context injection (only for authenticated users with roadmap data)
     if not is_guest:
-        ctx = _build_jada_context(user, conversation.context_module)
+        ctx = jada_context.for_conversation(user, conversation)
         if ctx:
             messages_payload.append({"role": "system", "content": ctx})
+        # Catalog lessons/resources relevant to this message, so JADA points to them
+        grounding = catalog_index.grounding(message, module=conversation.module_label or None)
+        if grounding:
+            messages_payload.append({"role": "system", "content": grounding})
 
-    for msg in history:
-        messages_payload.append({
-            "role": "user" if msg.role == "user" else "assistant",
-            "content": msg.content,
-        })
+    # Rolling summary + recent raw messages instead of a long verbatim replay
+    messages_payload.extend(jada_memory.history_messages(conversation))
     messages_payload.append({"role": "user", "content": message})
 
     # Route to appropriate model cascade
-    complexity = _classify_complexity(message)
     model_cascade = list(JADA_TECHNICAL_CASCADE if complexity == "technical" else JADA_CASUAL_CASCADE)
 
+    # Order the cascade by live model health (open circuits are dropped)
+    model_cascade = rank_models(model_cascade)
+
     # User-selected model: 'gemini' goes direct, specific model gets priority in cascade
     use_gemini_direct = preferred_model == 'gemini'
     if preferred_model and preferred_model not in ('auto', 'gemini'):
@@ -3486,72 +3371,258 @@ def jada_chat(request):
             model_cascade.remove(preferred_model)
         model_cascade.insert(0, preferred_model)
 
-    if use_gemini_direct:
+    # Enforce the prompt budget of every model this payload may go to
+    budget_models = model_cascade + ['gemini']
+    messages_payload = jada_memory.fit_to_budget(messages_payload, jada_memory.budget_for(budget_models))
+
+    return {
+        "message": message,
+        "conversation": conversation,
+        "messages_payload": messages_payload,
+        "model_cascade": model_cascade,
+        "complexity": complexity,
+        "use_gemini_direct": use_gemini_direct,
+    }, None
+
+
+JADA_PREVIEW_CHARS = 200
+
+
+def _record_jada_messages(conversation, *messages):
+    """
+    Save *messages* (unsaved ``JadaMessage``s) and bump the conversation's
+    message_count / last_message_preview / last_message_at in the same
+    transaction, so listing conversations never counts or joins.
+    """
+    visible = [m for m in messages if m.role != 'system']
+    fields = {
+        "message_count": F('message_count') + len(messages),
+        "last_message_at": timezone.now(),
+    }
+    if visible:
+        fields["last_message_preview"] = " ".join(visible[-1].content.split())[:JADA_PREVIEW_CHARS]
+    with transaction.atomic():
+        for m in messages:
+            m.conversation = conversation
+            m.save()
+        JadaConversation.objects.filter(pk=conversation.pk).update(**fields)
+
+
+def _finish_jada_turn(turn, reply, model_used, markup=None):
+    """
+    Persist the exchange and build the response payload for a completed reply.
+    *markup* is the ``jada_markup`` parse of *reply*, when it was already parsed while streaming.
+    """
+    conversation = turn["conversation"]
+    message = turn["message"]
+
+    # Extract structured interactive elements from reply
+    quiz_data, interactive_data, clean_reply = markup or jada_markup.parse(reply)
+
+    # Persist messages (store the full original reply)
+    _record_jada_messages(
+        conversation,
+        JadaMessage(role='user', content=message),
+        JadaMessage(role='jada', content=reply, model_used=model_used),
+    )
+    jada_memory.maybe_refresh(conversation)
+
+    # Generate contextual follow-up suggestions
+    suggestions = _generate_suggestions(message, reply, conversation.context_module)
+    jada_suggestions.warm(conversation.context_module, suggestions)
+
+    return {
+        "reply": clean_reply,
+        "conversation_id": conversation.id,
+        "session_id": conversation.session_id,
+        "model_used": model_used,
+        "complexity": turn["complexity"],
+        "module_id": conversation.context_module_id,
+        "module_label": conversation.context_module.label if conversation.context_module else None,
+        "suggestions": suggestions,
+        "interactive": interactive_data,
+        "quiz": quiz_data,
+    }
+
+
+JADA_ERROR_REPLY = "Sorry, I couldn't process that right now. Try rephrasing or ask again shortly."
+JADA_INCOMPLETE_REPLY = "My reply was cut off. Please send your message again."
+
+
+async def _ajada_gemini_reply(messages_payload):
+    from .ai_logic import _acall_gemini_text
+    return await _acall_gemini_text(
+        "\n".join(m["content"] for m in messages_payload),
+        temperature=0.7,
+        timeout=(5, 30),
+    )
+
+
+@async_api_view(['POST'], allow_any=True, throttle_classes=ai_throttles())
+@ai_governor.prioritized("interactive")
+@ai_ledger.tagged("jada_chat")
+async def jada_chat(request):
+    """
+    Send a message to JADA. Uses cascade model routing.
+    Supports both authenticated users and guest sessions.
+    Body: { message, conversation_id?, mode?, module_id?, preferred_model?, session_id? }
+    """
+    user = request.user if request.user.is_authenticated else None
+    turn, error = await sync_to_async(_prepare_jada_turn)(user, request.data)
+    if error:
+        return JsonResponse(error[0], status=error[1])
+    if turn.get("pre_answered"):
+        answer = turn["pre_answered"]
+        return JsonResponse(await sync_to_async(_finish_jada_turn)(turn, answer["reply"], answer["model_used"]))
+
+    messages_payload = turn["messages_payload"]
+    model_cascade = turn["model_cascade"]
+
+    if turn["use_gemini_direct"]:
         try:
-            from .ai_logic import _call_gemini_text
-            reply = _call_gemini_text(
-                "\n".join(m["content"] for m in messages_payload),
-                temperature=0.7,
-                timeout=(5, 30),
-            )
+            reply = await _ajada_gemini_reply(messages_payload)
             model_used = "gemini"
         except Exception as e2:
             print(f"[JADA] Gemini direct failed: {e2}, falling back to cascade")
             try:
-                reply, model_used = chat_completions_cascade(
+                reply, model_used = await achat_completions_cascade(
                     messages=messages_payload, models=model_cascade,
                     temperature=0.7, max_tokens=1024, timeout=45,
+                    hedge_delay=HEDGE_DELAY_SECONDS, adaptive=False,
                 )
             except OpenRouterError:
-                reply = "Sorry, I couldn't process that right now. Try rephrasing or ask again shortly."
+                reply = JADA_ERROR_REPLY
                 model_used = "error"
     else:
         try:
-            reply, model_used = chat_completions_cascade(
+            reply, model_used = await achat_completions_cascade(
                 messages=messages_payload,
                 models=model_cascade,
                 temperature=0.7,
                 max_tokens=1024,
                 timeout=45,
+                hedge_delay=HEDGE_DELAY_SECONDS,
+                adaptive=False,
             )
         except OpenRouterError:
             # Ultimate fallback: Gemini
             try:
-                from .ai_logic import _call_gemini_text
-                reply = _call_gemini_text(
-                    "\n".join(m["content"] for m in messages_payload),
-                    temperature=0.7,
-                    timeout=(5, 30),
-                )
+                reply = await _ajada_gemini_reply(messages_payload)
                 model_used = "gemini-fallback"
             except Exception as e2:
                 print(f"[JADA] All models failed: {e2}")
-                reply = "Sorry, I couldn't process that right now. Try rephrasing or ask again shortly."
+                reply = JADA_ERROR_REPLY
                 model_used = "error"
 
-    # Extract structured interactive elements from reply
-    quiz_data, reply_after_quiz = _extract_quiz(reply)
-    interactive_data, clean_reply = _extract_interactive(reply_after_quiz)
+    return JsonResponse(await sync_to_async(_finish_jada_turn)(turn, reply, model_used))
 
-    # Persist messages (store the full original reply)
-    JadaMessage.objects.create(conversation=conversation, role='user', content=message)
-    JadaMessage.objects.create(conversation=conversation, role='jada', content=reply, model_used=model_used)
 
-    # Generate contextual follow-up suggestions
-    suggestions = _generate_suggestions(message, reply, conversation.context_module)
+def _sse(event, data):
+    """Format one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _replay(text):
+    """A stored reply as a one-chunk stream."""
+    yield text
 
-    return Response({
-        "reply": clean_reply,
-        "conversation_id": conversation.id,
-        "session_id": conversation.session_id,
-        "model_used": model_used,
-        "complexity": complexity,
-        "module_id": conversation.context_module_id,
-        "module_label": conversation.context_module.label if conversation.context_module else None,
-        "suggestions": suggestions,
-        "interactive": interactive_data,
-        "quiz": quiz_data,
-    })
+
+@async_api_view(['POST'], allow_any=True, throttle_classes=ai_throttles())
+async def jada_chat_stream(request):
+    """
+    Streaming variant of ``jada_chat`` over Server-Sent Events.
+    Same body as ``jada_chat``. Emits:
+      event: meta   — conversation/session/module ids and the model that answered
+      event: token  — {"text": delta} for every streamed chunk
+      event: done   — the full ``jada_chat`` payload (clean reply, quiz, interactive, suggestions)
+      event: error  — {"error", "partial": true, "model_used"} if the model's stream broke off
+                      after some tokens; the partial reply is discarded and nothing is saved
+    Must be served through ``asgi.py`` for tokens to reach the client as they arrive.
+    """
+    from django.http import StreamingHttpResponse
+    from .openrouter_async import achat_completions_stream_cascade
+
+    user = request.user if request.user.is_authenticated else None
+    turn, error = await sync_to_async(_prepare_jada_turn)(user, request.data)
+    if error:
+        return JsonResponse(error[0], status=error[1])
+
+    messages_payload = turn["messages_payload"]
+    conversation = turn["conversation"]
+
+    async def _events():
+        # Runs in the server's iteration context, not the view's.
+        ai_ledger.set_call_site("jada_stream")
+        ai_governor.set_priority("interactive")
+        chunks = None
+        model_used = "error"
+
+        if turn.get("pre_answered"):
+            model_used, chunks = turn["pre_answered"]["model_used"], _replay(turn["pre_answered"]["reply"])
+        elif not turn["use_gemini_direct"]:
+            try:
+                model_used, chunks = await achat_completions_stream_cascade(
+                    messages=messages_payload,
+                    models=turn["model_cascade"],
+                    temperature=0.7,
+                    max_tokens=1024,
+                    timeout=45,
+                    adaptive=False,
+                )
+            except OpenRouterError as e:
+                print(f"[JADA] Streaming cascade failed: {e}")
+
+        yield _sse("meta", {
+            "conversation_id": conversation.id,
+            "session_id": conversation.session_id,
+            "model_used": model_used if chunks is not None else None,
+            "complexity": turn["complexity"],
+            "module_id": conversation.context_module_id,
+        })
+
+        parts = []
+        markup = jada_markup.MarkupParser()
+        if chunks is not None:
+            try:
+                async for delta in chunks:
+                    parts.append(delta)
+                    markup.feed(delta)
+                    yield _sse("token", {"text": delta})
+            except OpenRouterError as e:
+                print(f"[JADA] Stream from {model_used} broke off: {e}")
+                if parts:
+                    # The client already shows the partial text; tell it the reply is incomplete
+                    # rather than saving it as a finished answer.
+                    yield _sse("error", {
+                        "error": JADA_INCOMPLETE_REPLY,
+                        "partial": True,
+                        "model_used": f"{model_used} (incomplete)",
+                        "conversation_id": conversation.id,
+                    })
+                    return
+
+        if not parts:
+            # Nothing streamed: same Gemini fallback as the blocking endpoint.
+            try:
+                reply = await _ajada_gemini_reply(messages_payload)
+                model_used = "gemini" if turn["use_gemini_direct"] else "gemini-fallback"
+            except Exception as e2:
+                print(f"[JADA] All models failed: {e2}")
+                reply = JADA_ERROR_REPLY
+                model_used = "error"
+            yield _sse("token", {"text": reply})
+            markup = None
+        else:
+            reply = "".join(parts)
+            markup = markup.close()
+
+        payload = await sync_to_async(_finish_jada_turn)(turn, reply, model_used, markup)
+        yield _sse("done", payload)
+
+    response = StreamingHttpResponse(_events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @api_view(['PATCH'])
@@ -3565,14 +3636,15 @@ def jada_switch_context(request, conversation_id):
         mod = UserRoadmapItem.objects.filter(id=module_id, user=request.user).first()
         if not mod:
             return Response({"error": "Module not found"}, status=404)
+        jada_archive.restore(convo)
         convo.context_module = mod
-        convo.save(update_fields=['context_module'])
+        convo.module_label = mod.label
+        convo.save(update_fields=['context_module', 'module_label'])
 
         # Inject a system message so the conversation history reflects the switch
-        JadaMessage.objects.create(
-            conversation=convo, role='system',
-            content=f"[Context switched to module: {mod.label}]",
-        )
+        _record_jada_messages(convo, JadaMessage(
+            role='system', content=f"[Context switched to module: {mod.label}]",
+        ))
         return Response({
             "module_id": mod.id,
             "module_label": mod.label,
@@ -3603,40 +3675,114 @@ def jada_claim_guest(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def jada_conversations(request):
-    """List user's JADA conversations."""
-    convos = JadaConversation.objects.filter(user=request.user)[:20]
+    """List user's JADA conversations (one query: the summary columns are denormalized)."""
+    convos = JadaConversation.objects.filter(user=request.user).only(
+        'id', 'mode', 'module_label', 'started_at', 'last_message_at', 'message_count', 'last_message_preview',
+    )[:20]
     return Response([
         {
             "id": c.id,
             "mode": c.mode,
-            "module": c.context_module.label if c.context_module else None,
+            "module": c.module_label or None,
             "started_at": c.started_at,
             "last_message_at": c.last_message_at,
-            "message_count": c.messages.count(),
+            "message_count": c.message_count,
+            "last_message_preview": c.last_message_preview,
         }
         for c in convos
     ])
 
 
+JADA_MESSAGES_PAGE = 30
+JADA_MESSAGES_MAX_PAGE = 100
+
+
+def _jada_messages_page(convo, query_params):
+    """
+    One page of *convo*'s messages, newest first, keyed by message id:
+    ``?before=<id>`` continues from ``next_cursor`` of the previous page.
+    Raises ValueError for a non-integer ``limit`` / ``before``.
+    """
+    limit = min(max(int(query_params.get('limit', JADA_MESSAGES_PAGE)), 1), JADA_MESSAGES_MAX_PAGE)
+    before = int(query_params['before']) if query_params.get('before') else None
+
+    # Archived conversations are paged straight from their compressed blob
+    rows = jada_archive.messages_before(convo, before, limit + 1) if convo.archived_at else None
+    if rows is None:
+        qs = JadaMessage.objects.filter(conversation=convo)
+        if before is not None:
+            qs = qs.filter(id__lt=before)
+        rows = list(qs.order_by('-id').values(*jada_archive.FIELDS)[:limit + 1])
+    page = rows[:limit]
+    return {
+        "messages": page,
+        "next_cursor": page[-1]["id"] if len(rows) > limit else None,
+    }
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def jada_conversation_detail(request, conversation_id):
-    """Get all messages in a JADA conversation."""
+    """
+    A JADA conversation with its newest page of messages (newest first);
+    older pages come from ``jada_conversation_messages`` with ``next_cursor``.
+    """
     convo = get_object_or_404(JadaConversation, id=conversation_id, user=request.user)
-    messages = convo.messages.all()
+    try:
+        page = _jada_messages_page(convo, request.query_params)
+    except ValueError:
+        return Response({"error": "limit and before must be integers"}, status=400)
     return Response({
         "id": convo.id,
         "mode": convo.mode,
-        "module": convo.context_module.label if convo.context_module else None,
-        "messages": [
-            {
-                "role": m.role,
-                "content": m.content,
-                "model_used": m.model_used,
-                "created_at": m.created_at,
-            }
-            for m in messages
-        ],
+        "module": convo.module_label or None,
+        "message_count": convo.message_count,
+        **page,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def jada_conversation_messages(request, conversation_id):
+    """
+    Cursor-paginated messages of a JADA conversation, newest first.
+    Query: ``limit`` (default 30, max 100), ``before`` (a ``next_cursor``).
+    """
+    convo = get_object_or_404(
+        JadaConversation.objects.only('id', 'archived_at'), id=conversation_id, user=request.user,
+    )
+    try:
+        return Response(_jada_messages_page(convo, request.query_params))
+    except ValueError:
+        return Response({"error": "limit and before must be integers"}, status=400)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def ai_model_health(request):
+    """
+    Operator view of the shared model health scoreboard: per-model success
+    rate, p50/p95 latency and circuit state, plus the live cascade orders,
+    the AI response cache hit rates, the last 24h of the call ledger and
+    the concurrency governor's slots, quotas and cooldowns.
+    """
+    from . import ai_cache
+    from .ai_logic import GEMINI_MODEL
+
+    known = list(dict.fromkeys(
+        FREE_MODEL_CASCADE + JADA_CASUAL_CASCADE + JADA_TECHNICAL_CASCADE
+        + [m['model'] for m in model_health_snapshot()]
+    ))
+    return Response({
+        "models": model_health_snapshot(known),
+        "cascades": {
+            "free": rank_models(FREE_MODEL_CASCADE),
+            "jada_casual": rank_models(JADA_CASUAL_CASCADE),
+            "jada_technical": rank_models(JADA_TECHNICAL_CASCADE),
+        },
+        "response_cache": ai_cache.stats(),
+        "call_ledger": ai_ledger.summarize(hours=24),
+        "governor": ai_governor.snapshot([("openrouter", m) for m in known] + [("gemini", GEMINI_MODEL)]),
     })
 
 
@@ -3757,6 +3903,7 @@ def join_waitlist(request):
     Join the platform waitlist. Syncs to Loops.so for email campaigns.
     """
     import os
+    from .http_client import http_post
 
     email = request.data.get('email', '').strip().lower()
     name = request.data.get('name', '').strip()
@@ -3777,7 +3924,7 @@ def join_waitlist(request):
     loops_api_key = os.environ.get('LOOPS_API_KEY', '')
     if loops_api_key:
         try:
-            http_requests.post(
+            resp = http_post(
                 "https://app.loops.so/api/v1/contacts/create",
                 headers={
                     "Authorization": f"Bearer {loops_api_key}",
@@ -3791,6 +3938,7 @@ def join_waitlist(request):
                 },
                 timeout=5,
             )
+            resp.raise_for_status()
             waitlist_entry.synced_to_loops = True
             waitlist_entry.save(update_fields=['synced_to_loops'])
         except Exception as e:
@@ -3861,20 +4009,21 @@ def get_lesson_progress(request, item_id):
     ])
 
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def start_lesson_quiz(request, item_id, lesson_id):
+@async_api_view(['POST'], throttle_classes=ai_throttles())
+async def start_lesson_quiz(request, item_id, lesson_id):
     """
     Generate (or return cached) 5-question MCQ for a specific lesson.
     Creates LessonProgress row if needed.
     """
     user = request.user
-    item = get_object_or_404(UserRoadmapItem, id=item_id, user=user)
+    item = await aget_object_or_404(
+        UserRoadmapItem.objects.select_related('lesson_plan'), id=item_id, user=user,
+    )
 
-    # Resolve lesson metadata from lesson_data or lesson_outline
+    # Resolve lesson metadata from the lesson plan or lesson_outline
     lesson_title = ""
     lesson_desc = ""
-    lessons_list = item.lesson_data if isinstance(item.lesson_data, list) else []
+    lessons_list = lessons_for_item(item)
     if not lessons_list:
         lessons_list = (item.resources or {}).get('lesson_outline') or []
 
@@ -3888,19 +4037,21 @@ def start_lesson_quiz(request, item_id, lesson_id):
     if not lesson_title:
         lesson_title = f"Lesson {lesson_id}"
 
-    lp, created = LessonProgress.objects.get_or_create(
+    lp, created = await LessonProgress.objects.aget_or_create(
         user=user, roadmap_item=item, lesson_id=str(lesson_id),
         defaults={"lesson_title": lesson_title},
     )
 
-    # Return cached quiz if exists and has questions
-    if lp.quiz_questions and len(lp.quiz_questions) >= 1:
+    # Return cached quiz if exists and has questions; a rule-based one is
+    # replaced as soon as a generated quiz is available
+    stored = lp.quiz_questions or []
+    if stored and not quiz_engine.is_rule_based(stored):
         # Strip correct answers for the frontend
         safe_qs = [
             {"question": q["question"], "options": q["options"]}
-            for q in lp.quiz_questions
+            for q in stored
         ]
-        return Response({
+        return JsonResponse({
             "lesson_id": lp.lesson_id,
             "lesson_title": lp.lesson_title,
             "questions": safe_qs,
@@ -3908,17 +4059,35 @@ def start_lesson_quiz(request, item_id, lesson_id):
             "attempts": lp.quiz_attempts,
         })
 
-    # Generate quiz
-    quiz_data = generate_lesson_quiz(item.label, lesson_title, lesson_desc)
-    lp.quiz_questions = quiz_data
-    lp.lesson_title = lesson_title
-    lp.save(update_fields=['quiz_questions', 'lesson_title'])
+    # Draw from the question bank, generating live only for custom content:
+    # one batched call covers every lesson of the module, then single-lesson
+    # generation for anything the batch couldn't produce.
+    in_module = any(les.get('title') == lesson_title for les in lessons_list)
+    quiz_data = (
+        await question_bank.apick('lesson', item.label, lesson_title)
+        or await acached_lesson_quiz(item.label, lesson_title, lesson_desc)
+    )
+    if quiz_data is None and stored:
+        quiz_data = stored
+    elif quiz_data is None and in_module and quiz_engine.INSTANT_QUIZZES:
+        # Answer now; the module's AI quizzes are generated in the background
+        quiz_data = quiz_engine.lesson_quiz(item.label, lesson_title, lesson_desc, lessons=lessons_list)
+    if quiz_data is None and in_module:
+        quiz_data = (await agenerate_module_lesson_quizzes(item.label, lessons_list)).get(lesson_title)
+    if quiz_data is None:
+        quiz_data = await agenerate_lesson_quiz(item.label, lesson_title, lesson_desc)
+    if in_module and quiz_engine.is_rule_based(quiz_data):
+        await aon_quiz_served(item, 'lesson')
+    if quiz_data is not stored:
+        lp.quiz_questions = quiz_data
+        lp.lesson_title = lesson_title
+        await lp.asave(update_fields=['quiz_questions', 'lesson_title'])
 
     safe_qs = [
         {"question": q["question"], "options": q["options"]}
         for q in quiz_data
     ]
-    return Response({
+    return JsonResponse({
         "lesson_id": lp.lesson_id,
         "lesson_title": lp.lesson_title,
         "questions": safe_qs,
@@ -3994,7 +4163,7 @@ def submit_lesson_quiz(request, item_id, lesson_id):
         activity.save()
 
         # Check if ALL lessons in this module are now complete
-        outline = item.lesson_data if isinstance(item.lesson_data, list) else []
+        outline = lessons_for_item(item)
         if not outline:
             outline = (item.resources or {}).get('lesson_outline') or []
         total_lessons = len(outline)
@@ -4011,7 +4180,7 @@ def submit_lesson_quiz(request, item_id, lesson_id):
     # Regenerate quiz on fail so next attempt has different questions
     if not passed:
         lesson_desc = ""
-        lessons_list = item.lesson_data if isinstance(item.lesson_data, list) else []
+        lessons_list = lessons_for_item(item)
         if not lessons_list:
             lessons_list = (item.resources or {}).get('lesson_outline') or []
         for les in lessons_list:
@@ -4019,7 +4188,12 @@ def submit_lesson_quiz(request, item_id, lesson_id):
             if str(lid) == str(lesson_id):
                 lesson_desc = les.get('description', '')
                 break
-        new_quiz = generate_lesson_quiz(item.label, lp.lesson_title, lesson_desc)
+        # Next banked variant for catalog lessons; live generation otherwise
+        new_quiz = question_bank.pick('lesson', item.label, lp.lesson_title, variant=lp.quiz_attempts)
+        if new_quiz is None:
+            new_quiz = generate_lesson_quiz(
+                item.label, lp.lesson_title, lesson_desc, variant=lp.quiz_attempts,
+            )
         lp.quiz_questions = new_quiz
         lp.save(update_fields=['quiz_questions'])
 
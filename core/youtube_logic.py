@@ -5,15 +5,19 @@ Accepts a list of module labels from the user's roadmap and issues one
 API call per module (capped) so the returned list is ordered by learning
 progression rather than generic relevance.
 
-Falls back to curated static videos when the API key is absent.
+Falls back to curated static videos when the API key is absent.  Stops
+searching once the request's time budget (``deadlines``) runs out and
+returns the videos found so far.
 """
 
 from __future__ import annotations
 
 import os
-import requests
 from dotenv import load_dotenv
 
+from . import deadlines
+from .http_client import RequestException, http_get
+
 load_dotenv()
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
@@ -62,6 +66,9 @@ def fetch_youtube_for_modules(
     for idx, label in enumerate(module_labels):
         if len(results) >= limit:
             break
+        if deadlines.expired():
+            print(f"[youtube_logic] Out of time, returning {len(results)} videos")
+            break
         videos = _single_search(f"{label} tutorial programming", per_module + 1)
         for vid in videos:
             vid_id = vid['url'].split('v=')[-1] if 'v=' in vid['url'] else vid['url']
@@ -99,7 +106,7 @@ def _single_search(query: str, max_results: int = 3) -> list[dict]:
             "order": "relevance",
         }
 
-        response = requests.get(url, params=params, timeout=10)
+        response = http_get(url, params=params, timeout=10)
         response.raise_for_status()
 
         data = response.json()
@@ -120,7 +127,7 @@ def _single_search(query: str, max_results: int = 3) -> list[dict]:
 
         return videos
 
-    except requests.exceptions.RequestException as e:
+    except RequestException as e:
         print(f"[youtube_logic] API error: {e}")
         return []
     except Exception as e:
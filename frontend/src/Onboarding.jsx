@@ -134,12 +134,22 @@ export default function Onboarding() {
 
   const back = () => { if (step > 0) goTo(step - 1); };
 
+  const waitForRoadmap = async (taskId) => {
+    const deadline = Date.now() + 5 * 60 * 1000;
+    while (Date.now() < deadline) {
+      await new Promise(r => setTimeout(r, 2000));
+      const { data } = await api.get(`/api/roadmap-status/${taskId}/`);
+      if (data?.status === 'complete') return;
+    }
+    throw new Error('Roadmap generation timed out');
+  };
+
   const calibrate = async () => {
     if (calibratingRef.current) return;
     calibratingRef.current = true;
     setError(null);
     try {
-      await api.post('/api/complete-onboarding/', {
+      const started = await api.post('/api/complete-onboarding/', {
         role: form.role === 'other' ? 'custom' : form.role,
         custom_niche: form.role === 'other' ? (form.other_career_path || '').trim() : undefined,
         university_course: form.university_course || 'Self-taught',
@@ -147,6 +157,10 @@ export default function Onboarding() {
         gender: form.gender,
         level: form.level,
       });
+      // Custom roles are generated in the background — poll until the roadmap is loaded
+      if (started.status === 202 && started.data?.task_id) {
+        await waitForRoadmap(started.data.task_id);
+      }
       const res = await api.get('/api/profile/');
       const p = res.data?.profile || res.data;
       if (p?.username) localStorage.setItem('username', p.username);
@@ -156,7 +170,7 @@ export default function Onboarding() {
       navigate('/dashboard');
     } catch (e) {
       console.error('Onboarding failed', e);
-      setError(e?.response?.data?.error || 'Something went wrong. Please try again.');
+      setError(e?.response?.data?.error || e?.response?.data?.message || 'Something went wrong. Please try again.');
       calibratingRef.current = false;
       goTo(2);
     }
@@ -84,6 +84,8 @@ export const jadaClaimGuest = (sessionId) =>
   api.post('/api/jada/claim-guest/', { session_id: sessionId });
 export const jadaConversations = () => api.get('/api/jada/conversations/');
 export const jadaConversationDetail = (id) => api.get(`/api/jada/conversations/${id}/`);
+export const jadaConversationMessages = (id, before) =>
+  api.get(`/api/jada/conversations/${id}/messages/`, { params: before ? { before } : {} });
 export const jadaSwitchContext = (conversationId, moduleId) =>
   api.patch(`/api/jada/conversations/${conversationId}/context/`, { module_id: moduleId });
 
@@ -1,4 +1,4 @@
-import React, { useCallback, useEffect, useRef, useState } from 'react';
+import React, { useCallback, useEffect, useLayoutEffect, useRef, useState } from 'react';
 import { AnimatePresence, motion } from 'framer-motion';
 import { X, RotateCcw, Send, ChevronDown, Bot, Sparkles, Settings2, Maximize2, Minimize2, Copy, Check } from 'lucide-react';
 import ReactMarkdown from 'react-markdown';
@@ -104,12 +104,15 @@ export default function JadaChatSheet() {
     sendMessage, contextModuleLabel, contextModuleId, startNewChat, suggestions,
     preferredModel, setPreferredModel, lastInteractive, setLastInteractive,
     activeQuiz, switchModule, isExpanded, toggleExpand, isGuest,
+    hasOlderMessages, isLoadingOlder, loadOlderMessages,
   } = useJada();
 
   const [input, setInput] = useState('');
   const [showModulePicker, setShowModulePicker] = useState(false);
   const [modules, setModules] = useState(null); // null = not loaded yet
   const messagesEndRef = useRef(null);
+  const messagesRef = useRef(null);
+  const prependHeightRef = useRef(null); // scrollHeight before older messages were prepended
   const textareaRef = useRef(null);
 
   /* ── Fetch modules once when chat opens ──────────────── */
@@ -135,11 +138,33 @@ export default function JadaChatSheet() {
     if (isGuest && showModulePicker) setShowModulePicker(false);
   }, [isGuest, showModulePicker]);
 
+  /* ── Keep the view in place when older messages load ─── */
+  useLayoutEffect(() => {
+    const el = messagesRef.current;
+    if (el && prependHeightRef.current !== null) {
+      el.scrollTop += el.scrollHeight - prependHeightRef.current;
+    }
+  }, [chatMessages]);
+
   /* ── Auto-scroll to bottom on new messages ───────────── */
   useEffect(() => {
+    if (prependHeightRef.current !== null) {
+      prependHeightRef.current = null;
+      return;
+    }
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
   }, [chatMessages, isTyping]);
 
+  /* ── Load older history when scrolled to the top ─────── */
+  const handleMessagesScroll = useCallback((e) => {
+    if (e.currentTarget.scrollTop > 40 || !hasOlderMessages || isLoadingOlder) return;
+    prependHeightRef.current = e.currentTarget.scrollHeight;
+    loadOlderMessages().then((added) => {
+      // Nothing was prepended: don't swallow the next auto-scroll
+      if (!added) prependHeightRef.current = null;
+    });
+  }, [hasOlderMessages, isLoadingOlder, loadOlderMessages]);
+
   /* ── Auto-resize textarea ────────────────────────────── */
   useEffect(() => {
     const ta = textareaRef.current;
@@ -287,7 +312,13 @@ export default function JadaChatSheet() {
             </p>
           </div>
         ) : (
-          <div className="jada-chat-messages" onClick={() => showModulePicker && setShowModulePicker(false)}>
+          <div
+            className="jada-chat-messages"
+            ref={messagesRef}
+            onScroll={handleMessagesScroll}
+            onClick={() => showModulePicker && setShowModulePicker(false)}
+          >
+            {isLoadingOlder && <div className="jada-msg-loading-older">Loading earlier messages…</div>}
             {chatMessages.map((msg, i) => (
               <div key={i} className={`jada-msg ${msg.role}`}>
                 {msg.role === 'assistant' && (
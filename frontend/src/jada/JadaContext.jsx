@@ -1,7 +1,7 @@
 import React, { createContext, useCallback, useContext, useEffect, useMemo, useRef, useState } from 'react';
 import { useLocation } from 'react-router-dom';
 import { emitJadaEvent, onJadaEvent } from './jadaEvents';
-import { jadaChat as jadaChatApi, jadaChatGuest as jadaChatGuestApi, jadaConversationDetail, jadaSwitchContext as jadaSwitchContextApi } from '../api';
+import { jadaChat as jadaChatApi, jadaChatGuest as jadaChatGuestApi, jadaConversationDetail, jadaConversationMessages, jadaSwitchContext as jadaSwitchContextApi } from '../api';
 import { getOrCreateGuestSessionId } from './guestSession';
 
 const JadaContext = createContext(null);
@@ -28,6 +28,14 @@ function clamp(n, min, max) {
   return Math.max(min, Math.min(max, n));
 }
 
+// History pages arrive newest first; the chat renders oldest first.
+function pageToChatMessages(messages) {
+  return (messages || [])
+    .filter((m) => m.role !== 'system')
+    .reverse()
+    .map((m) => ({ role: m.role === 'jada' ? 'assistant' : m.role, content: m.content, created_at: m.created_at }));
+}
+
 export function JadaProvider({ children }) {
   const location = useLocation();
 
@@ -54,6 +62,8 @@ export function JadaProvider({ children }) {
   const [activeQuiz, setActiveQuiz] = useState(null);
   const [isExpanded, setIsExpanded] = useState(false);
   const [isGuest, setIsGuest] = useState(false);
+  const [olderCursor, setOlderCursor] = useState(null);
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
 
   /* ── Route-based avatar positioning ──────────────────────────── */
   useEffect(() => {
@@ -130,16 +140,29 @@ export function JadaProvider({ children }) {
     if (activeConversationId) {
       try {
         const res = await jadaConversationDetail(activeConversationId);
-        setChatMessages(
-          (res.data.messages || [])
-            .filter((m) => m.role !== 'system')
-            .map((m) => ({ role: m.role === 'jada' ? 'assistant' : m.role, content: m.content, created_at: m.created_at }))
-        );
+        setChatMessages(pageToChatMessages(res.data.messages));
+        setOlderCursor(res.data.next_cursor ?? null);
         if (res.data.module) setContextModuleLabel(res.data.module);
       } catch { /* fresh chat */ }
     }
   }, [activeConversationId]);
 
+  const loadOlderMessages = useCallback(async () => {
+    if (!activeConversationId || !olderCursor || isLoadingOlder) return 0;
+    setIsLoadingOlder(true);
+    try {
+      const res = await jadaConversationMessages(activeConversationId, olderCursor);
+      const older = pageToChatMessages(res.data.messages);
+      setChatMessages((prev) => [...older, ...prev]);
+      setOlderCursor(res.data.next_cursor ?? null);
+      return older.length;
+    } catch {
+      return 0; // keep the cursor; scrolling up retries
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  }, [activeConversationId, olderCursor, isLoadingOlder]);
+
   const closeChat = useCallback(() => setIsChatOpen(false), []);
 
   const toggleExpand = useCallback(() => setIsExpanded((v) => !v), []);
@@ -192,6 +215,7 @@ export function JadaProvider({ children }) {
   const startNewChat = useCallback(() => {
     setActiveConversationId(null);
     setChatMessages([]);
+    setOlderCursor(null);
     setSuggestions([]);
     setLastInteractive(null);
     setActiveQuiz(null);
@@ -204,10 +228,10 @@ export function JadaProvider({ children }) {
 
     // Chat state
     isChatOpen, chatMessages, activeConversationId, contextModuleId, contextModuleLabel, isTyping, suggestions, preferredModel, isGuest,
-    lastInteractive, activeQuiz, isExpanded,
+    lastInteractive, activeQuiz, isExpanded, hasOlderMessages: Boolean(olderCursor), isLoadingOlder,
 
     // Chat methods
-    openChat, closeChat, sendMessage, switchModule, startNewChat, setPreferredModel,
+    openChat, closeChat, sendMessage, switchModule, startNewChat, setPreferredModel, loadOlderMessages,
     setLastInteractive, setActiveQuiz, toggleExpand,
 
     setSpeech: (text, tone = 'neutral') => setSpeech(text ? { text, tone } : null),
@@ -236,7 +260,7 @@ export function JadaProvider({ children }) {
       fullscreenOverlayCountRef.current = hidden ? Math.max(1, fullscreenOverlayCountRef.current) : 0;
       setIsHidden(hidden);
     },
-  }), [anchor, isHidden, mode, sizePx, speech, isChatOpen, chatMessages, activeConversationId, contextModuleId, contextModuleLabel, isTyping, preferredModel, isGuest, lastInteractive, activeQuiz, isExpanded, openChat, closeChat, sendMessage, switchModule, startNewChat, toggleExpand]);
+  }), [anchor, isHidden, mode, sizePx, speech, isChatOpen, chatMessages, activeConversationId, contextModuleId, contextModuleLabel, isTyping, preferredModel, isGuest, lastInteractive, activeQuiz, isExpanded, olderCursor, isLoadingOlder, openChat, closeChat, sendMessage, switchModule, startNewChat, toggleExpand, loadOlderMessages]);
 
   return <JadaContext.Provider value={api}>{children}</JadaContext.Provider>;
 }
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'whats_next_backend.settings')
 
 application = get_asgi_application()
+
+# Build the JADA catalog retrieval index now rather than on the first chat turn
+from core import catalog_index  # noqa: E402
+
+catalog_index.get_index()
@@ -48,7 +48,7 @@ INSTALLED_APPS = [
     'corsheaders',
     'django_celery_results',
     'allauth',
-    'allauth.account',
+    'core.apps.AllauthAccountConfig',  # allauth.account with the async-capable middleware
     'allauth.socialaccount',
     'allauth.socialaccount.providers.github',
     'allauth.socialaccount.providers.google',
@@ -56,15 +56,16 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  
+    'core.middleware.RequestDeadlineMiddleware', # Per-request budget for outbound AI/API calls
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware', # Added for Render
+    'core.middleware.AsyncWhiteNoiseMiddleware', # Added for Render (async-capable WhiteNoise)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'allauth.account.middleware.AccountMiddleware', # Required for allauth
+    'core.middleware.AsyncAccountMiddleware', # Required for allauth (async-capable)
 ]
 
 ROOT_URLCONF = 'whats_next_backend.urls'
@@ -83,7 +84,8 @@ REST_FRAMEWORK = {
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/hour',
         'user': '1000/hour',
-        'ai_endpoints': '10/hour',  # Special rate for expensive AI calls
+        # Shared budget for every endpoint that can call a model (core/throttles.py)
+        'ai_endpoints': os.getenv('AI_ENDPOINT_RATE', '120/hour'),
     }
 }
 
@@ -167,6 +169,8 @@ AUTH_USER_MODEL = 'core.User'
 # ==========================================
 # CACHING (Redis → LocMem fallback)
 # ==========================================
+# Redis should run with maxmemory-policy allkeys-lru: ai_cache entries
+# only carry a TTL and rely on LRU eviction for their size bound.
 _REDIS_URL = os.getenv('CELERY_BROKER_URL', '')
 if _REDIS_URL:
     CACHES = {
@@ -196,6 +200,27 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes max for AI tasks
+# Task priorities (0 = highest .. 9 = lowest) on the Redis broker; warm-ahead
+# prefetch runs at 9 so it never delays user-facing jobs.
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'queue_order_strategy': 'priority',
+}
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Periodic jobs (run `celery -A whats_next_backend beat` alongside the worker)
+CELERY_BEAT_SCHEDULE = {
+    'archive-idle-jada-conversations': {
+        'task': 'core.tasks.archive_idle_jada_conversations',
+        'schedule': 24 * 60 * 60,
+        'options': {'priority': 9},
+    },
+    'prune-ai-call-log': {
+        'task': 'core.tasks.prune_ai_call_log',
+        'schedule': 24 * 60 * 60,
+        'options': {'priority': 9},
+    },
+}
 
 # ==========================================
 # POSTHOG ANALYTICS
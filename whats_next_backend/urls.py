@@ -90,10 +90,13 @@ urlpatterns = [
 
     # --- JADA AI ASSISTANT ---
     path('api/jada/chat/', views.jada_chat, name='jada_chat'),
+    path('api/jada/chat/stream/', views.jada_chat_stream, name='jada_chat_stream'),
     path('api/jada/claim-guest/', views.jada_claim_guest, name='jada_claim_guest'),
     path('api/jada/conversations/', views.jada_conversations, name='jada_conversations'),
     path('api/jada/conversations/<int:conversation_id>/', views.jada_conversation_detail, name='jada_conversation_detail'),
+    path('api/jada/conversations/<int:conversation_id>/messages/', views.jada_conversation_messages, name='jada_conversation_messages'),
     path('api/jada/conversations/<int:conversation_id>/context/', views.jada_switch_context, name='jada_switch_context'),
+    path('api/ai/model-health/', views.ai_model_health, name='ai_model_health'),
 
     # --- LESSON PROGRESS & QUIZ GATES ---
     path('api/modules/<int:item_id>/lesson-progress/', views.get_lesson_progress, name='get_lesson_progress'),